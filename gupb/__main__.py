@@ -1,32 +1,21 @@
 from __future__ import annotations, unicode_literals
 from datetime import datetime
-from functools import lru_cache
 import glob
-import importlib
 import importlib.util
 import logging
 import os
 import pathlib
-import pkgutil
 import sys
 from typing import Any, Union
 
 import click
 import questionary
 
-from gupb import controller
 from gupb import runner
+from gupb.controller import registry
 
-# noinspection PyUnresolvedReferences
-@lru_cache()
-def possible_controllers() -> list[controller.Controller]:
-    controllers = []
-    pkg_path = os.path.dirname(controller.__file__)
-    names = [name for _, name, _ in pkgutil.iter_modules(path=[pkg_path], prefix=f"{controller.__name__}.")]
-    for name in names:
-        module = importlib.import_module(name)
-        controllers.extend(module.POTENTIAL_CONTROLLERS)
-    return controllers
+def possible_controllers() -> list[registry.ControllerEntry]:
+    return registry.CONTROLLERS
 
 
 # noinspection PyUnresolvedReferences
@@ -41,7 +30,9 @@ def load_initial_config(config_path: str) -> dict[str, Any]:
 # noinspection PyUnresolvedReferences
 def possible_arenas() -> set[str]:
     paths = glob.glob("resources/arenas/*.gupb")
-    return set(pathlib.Path(path).stem for path in paths)
+    names = set(pathlib.Path(path).stem for path in paths)
+    # the arena written by gupb.scripts.benchmark is not meant to be played on
+    return set(name for name in names if not name.startswith('generated_benchmark_'))
 
 
 def configuration_inquiry(initial_config: dict[str, Any]) -> dict[str, Any]:
@@ -94,7 +85,7 @@ def configuration_inquiry(initial_config: dict[str, Any]) -> dict[str, Any]:
                 {
                     'name': possible_controller.name,
                     'value': possible_controller,
-                    'checked': possible_controller in initial_config['controllers'],
+                    'checked': possible_controller.name in {c.name for c in initial_config['controllers']},
                 }
                 for possible_controller in possible_controllers()
             ],
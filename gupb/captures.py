@@ -0,0 +1,98 @@
+from __future__ import annotations
+import copy
+from dataclasses import dataclass, field
+import gzip
+import os
+import pickle
+from typing import Any, Optional
+
+from gupb import controller
+from gupb.model import arenas
+from gupb.model import characters
+
+
+@dataclass
+class Capture:
+    controller_name: str
+    game_no: int
+    arena_description: arenas.ArenaDescription
+    knowledge: list[characters.ChampionKnowledge] = field(default_factory=list)
+
+    def save(self, path: str) -> None:
+        with gzip.open(path, 'wb') as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str) -> Capture:
+        with gzip.open(path, 'rb') as file:
+            return pickle.load(file)
+
+
+def frozen_knowledge(knowledge: characters.ChampionKnowledge) -> characters.ChampionKnowledge:
+    return characters.ChampionKnowledge(
+        position=knowledge.position,
+        no_of_champions_alive=knowledge.no_of_champions_alive,
+        visible_tiles=dict(knowledge.visible_tiles),
+        observation=copy.deepcopy(knowledge.observation),
+    )
+
+
+class CapturingController(controller.Controller):
+    """
+    Wraps a controller and stores the arguments of its `reset` and every knowledge it receives.
+
+    Observation planes are always requested, so that a capture can be fed to any controller later on.
+    They are handed to the wrapped controller only if it asked for them.
+    """
+
+    observation_planes = True
+    needs_knowledge = True
+
+    def __init__(self, wrapped: controller.Controller, capture_directory: str, capture_prefix: str) -> None:
+        self.wrapped: controller.Controller = wrapped
+        self.capture_directory: str = capture_directory
+        self.capture_prefix: str = capture_prefix
+        self.capture: Optional[Capture] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'wrapped':
+            raise AttributeError(name)
+        return getattr(self.wrapped, name)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CapturingController):
+            return self.wrapped == other.wrapped
+        return self.wrapped == other
+
+    def __hash__(self) -> int:
+        return hash(self.wrapped)
+
+    def decide(self, knowledge: characters.ChampionKnowledge) -> characters.Action:
+        self.capture.knowledge.append(frozen_knowledge(knowledge))
+        if not getattr(self.wrapped, "observation_planes", False):
+            knowledge = knowledge._replace(observation=None)
+        return self.wrapped.decide(knowledge)
+
+    def praise(self, score: int) -> None:
+        self.save_capture()
+        self.wrapped.praise(score)
+
+    def reset(self, game_no: int, arena_description: arenas.ArenaDescription) -> None:
+        self.capture = Capture(self.wrapped.name, game_no, arena_description)
+        self.wrapped.reset(game_no, arena_description)
+
+    def save_capture(self) -> None:
+        os.makedirs(self.capture_directory, exist_ok=True)
+        capture_path = os.path.join(
+            self.capture_directory,
+            f"{self.capture_prefix}__{self.wrapped.name}__game_{self.capture.game_no}.pkl.gz",
+        )
+        self.capture.save(capture_path)
+
+    @property
+    def name(self) -> str:
+        return self.wrapped.name
+
+    @property
+    def preferred_tabard(self) -> characters.Tabard:
+        return self.wrapped.preferred_tabard
@@ -2,12 +2,11 @@ import random
 import traceback
 
 import numpy as np
-from pathfinding.core.grid import Grid
-from pathfinding.finder.a_star import AStarFinder
 from scipy.ndimage import label
 
 from gupb import controller
 from gupb.controller.bupg.knowledge.map import MapKnowledge
+from gupb.controller.bupg.planner import DStarLite
 from gupb.controller.bupg.strategies.find_menhir import MenhirEstimator
 from gupb.controller.bupg.utils import position_change_to_move
 from gupb.model import arenas
@@ -29,16 +28,20 @@ POSSIBLE_ACTIONS = [
 # noinspection PyMethodMayBeStatic
 class BUPGController(controller.Controller):
     WEAPON_PRIORITY = ["axe", "sword", "bow_unloaded", "bow_loaded", "amulet", "scroll", "propheticweapon", "knife"]
+    observation_planes = True
 
     def __init__(self, first_name: str):
         self.first_name: str = first_name
         self.map_knowledge: MapKnowledge | None = None
         self.menhir_estimator = None
         self.grid = None
+        self.weights = None
         self.weapon = None
         self.health = None
         self.facing = None
-        self.pathfinder = AStarFinder()
+        self.planner: DStarLite | None = None
+        self.champion_cells: set[Coords] = set()
+        self.blocked_cells: set[Coords] = set()
         self.position = None
         self.tries = 0
         self.ticks = 0
@@ -65,6 +68,10 @@ class BUPGController(controller.Controller):
         # self.estimate_menhir(knowledge)
 
         self.me = knowledge.visible_tiles[knowledge.position].character
+        self.champion_cells = {
+            Coords(*coords) for coords, tile in knowledge.visible_tiles.items()
+            if tile.character is not None and coords != knowledge.position
+        }
         self.weapon = self.me.weapon
         self.health = self.me.health
         self.facing = self.me.facing
@@ -168,19 +175,27 @@ class BUPGController(controller.Controller):
             end (Coords): The target position (x, y)
             facing (Facing): The current facing direction of the champion.
         """
-        self.grid.cleanup()
-
-        start = self.grid.node(*start)
-        end = self.grid.node(*end)
-
-        path, runs = self.pathfinder.find_path(start, end, self.grid)
-        if len(path) > 1:
+        self.block_champion_cells(end)
+        next_position = self.planner.next_step(start, end)
+        if next_position is not None:
             return position_change_to_move(
-                (path[1].y, path[1].x),
+                (next_position.y, next_position.x),
                 (start.y, start.x),
                 facing
             )
 
+    def block_champion_cells(self, end: Coords):
+        """
+        Makes cells with visible champions unwalkable for the planner, so that only the part of the search
+        around champions that moved is repaired. The target cell is never blocked.
+        """
+        blocked = {coords for coords in self.champion_cells if coords != end and self.weights[coords.y, coords.x] > 0}
+        for coords in self.blocked_cells - blocked:
+            self.planner.set_weight(coords, self.weights[coords.y, coords.x])
+        for coords in blocked - self.blocked_cells:
+            self.planner.set_weight(coords, 0)
+        self.blocked_cells = blocked
+
     def praise(self, score: int) -> None:
         pass
 
@@ -188,6 +203,8 @@ class BUPGController(controller.Controller):
         self.map_knowledge = MapKnowledge(terrain=Arena.load(arena_description.name).terrain)
         self.menhir_estimator = MenhirEstimator(self.map_knowledge)
         self.ticks = 0
+        self.champion_cells = set()
+        self.blocked_cells = set()
         self.create_grid()
 
     def create_grid(self):
@@ -225,7 +242,9 @@ class BUPGController(controller.Controller):
             if tile.loot and self.grid[x, y] > 0:
                 self.grid[x, y] = 3 + self.WEAPON_PRIORITY.index(tile.loot.description().name)
 
-        self.grid = Grid(matrix=self.grid)
+        # The grid itself is marked as tiles are looked at, so the planner's weights are kept separately
+        self.weights = self.grid.copy()
+        self.planner = DStarLite(self.weights)
 
     @property
     def name(self) -> str:
@@ -4,10 +4,13 @@ import numpy as np
 import scipy.ndimage
 
 from gupb.model import characters
+from gupb.model import observations
 from gupb.model.arenas import Terrain, terrain_size
+from gupb.model.consumables import ConsumableDescription
 from gupb.model.coordinates import Coords
 from gupb.model.effects import EffectDescription
 from gupb.model.games import MIST_TTH_PER_CHAMPION
+from gupb.model.weapons import WeaponDescription
 
 
 class MapKnowledge:
@@ -57,6 +60,10 @@ class MapKnowledge:
         return self._mist_radius
 
     def update_terrain(self, knowledge: characters.ChampionKnowledge):
+        if knowledge.observation is not None:
+            self.update_terrain_from_observation(knowledge)
+            return
+
         self.looked_at[knowledge.position[1], knowledge.position[0]] = 0
         for coords, tile in knowledge.visible_tiles.items():
             self.looked_at[coords[1], coords[0]] = 0
@@ -91,6 +98,37 @@ class MapKnowledge:
 
         self.timestamp += 1
 
+    def update_terrain_from_observation(self, knowledge: characters.ChampionKnowledge):
+        observation = knowledge.observation
+        # looked_at is indexed [y, x], while observation planes are indexed [x, y]
+        self.looked_at[knowledge.position[1], knowledge.position[0]] = 0
+        self.looked_at[observation.visible.T] = 0
+
+        for coords in [c for c in self.weapons if observation.visible[c] and not observation.loot[c]]:
+            del self.weapons[coords]
+        for x, y in zip(*np.nonzero(observation.loot)):
+            name = observations.WEAPON_NAMES[observation.loot[x, y] - 1]
+            self.weapons[Coords(int(x), int(y))] = WeaponDescription(name)
+
+        for coords in [c for c in self.consumables if observation.visible[c] and not observation.consumable[c]]:
+            del self.consumables[coords]
+        for x, y in zip(*np.nonzero(observation.consumable)):
+            name = observations.CONSUMABLE_NAMES[observation.consumable[x, y] - 1]
+            self.consumables[Coords(int(x), int(y))] = ConsumableDescription(name)
+
+        for x, y in zip(*np.nonzero(observation.effects & observations.EFFECT_BITS['fire'])):
+            self.fires.add(Coords(int(x), int(y)))
+        for x, y in zip(*np.nonzero(observation.effects & observations.EFFECT_BITS['mist'])):
+            self.mist.add(Coords(int(x), int(y)))
+
+        for x, y in zip(*np.nonzero(observation.tile_type == observations.TILE_TYPE_CODES['menhir'])):
+            self.menhir_location = Coords(int(x), int(y))
+
+        for x, y in zip(*np.nonzero(observation.character_facing)):
+            self.opponents[Coords(int(x), int(y))] = self.timestamp
+
+        self.timestamp += 1
+
 
     def episode_tick(self):
         if self._mist_radius is None:
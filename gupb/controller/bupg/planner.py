@@ -0,0 +1,133 @@
+import heapq
+from math import inf
+
+import numpy as np
+
+from gupb.model.coordinates import Coords
+
+
+class DStarLite:
+    """
+    Incremental shortest paths to a goal on a 4-connected weighted grid (D* Lite).
+
+    The weights are indexed [y, x]; a cell with a positive weight is walkable and entering it costs its weight.
+    Distances to the goal are kept between calls, so when the start moves or a few weights change only the
+    affected part of the search is repaired; a new search is started only when the goal changes.
+    """
+
+    def __init__(self, weights: np.ndarray) -> None:
+        height, width = weights.shape
+        # Cells are flat indices of the grid padded with unwalkable cells, so that neighbours are fixed offsets
+        self.row = width + 2
+        self.steps = (-self.row, 1, self.row, -1)
+        padded = np.pad(np.where(weights > 0, weights, inf).astype(float), 1, constant_values=inf)
+        self.weights: list[float] = padded.ravel().tolist()
+        self.inside: list[bool] = np.pad(np.ones(weights.shape, dtype=bool), 1).ravel().tolist()
+
+        self.goal: int | None = None
+        self.start: int | None = None
+        self.km: float = 0
+        self.g: list[float] = []
+        self.rhs: list[float] = []
+        self.queue: list[tuple[float, float, int]] = []
+        self.keys: dict[int, tuple[float, float]] = {}
+
+    def index(self, coords: Coords) -> int:
+        return (coords[1] + 1) * self.row + coords[0] + 1
+
+    def coords(self, index: int) -> Coords:
+        y, x = divmod(index, self.row)
+        return Coords(x - 1, y - 1)
+
+    def heuristic(self, a: int, b: int) -> int:
+        ay, ax = divmod(a, self.row)
+        by, bx = divmod(b, self.row)
+        return abs(ax - bx) + abs(ay - by)
+
+    def next_step(self, start: Coords, goal: Coords) -> Coords | None:
+        """The cell to enter from the start on a cheapest path to the goal, or None if there is none."""
+        start, goal = self.index(start), self.index(goal)
+        if goal != self.goal:
+            self._initialize(start, goal)
+        else:
+            self.km += self.heuristic(self.start, start)
+            self.start = start
+        self._compute_shortest_path()
+
+        if start == goal:
+            return None
+        cost, step = min((self.weights[start + step] + self.g[start + step], step) for step in self.steps)
+        if cost == inf:
+            return None
+        return self.coords(start + step)
+
+    def set_weight(self, coords: Coords, weight: float) -> None:
+        """Change the cost of entering a cell; non-positive weights make it unwalkable."""
+        cell = self.index(coords)
+        old_weight, self.weights[cell] = self.weights[cell], weight if weight > 0 else inf
+        if self.goal is None:
+            return
+        for step in self.steps:
+            predecessor = cell + step
+            if predecessor == self.goal or not self.inside[predecessor]:
+                continue
+            if self.weights[cell] < old_weight:
+                self.rhs[predecessor] = min(self.rhs[predecessor], self.weights[cell] + self.g[cell])
+            elif self.rhs[predecessor] == old_weight + self.g[cell]:
+                self.rhs[predecessor] = self._lookahead(predecessor)
+            self._update_vertex(predecessor)
+
+    def _initialize(self, start: int, goal: int) -> None:
+        self.goal, self.start, self.km = goal, start, 0
+        self.g = [inf] * len(self.weights)
+        self.rhs = [inf] * len(self.weights)
+        self.queue, self.keys = [], {}
+        self.rhs[goal] = 0
+        self._update_vertex(goal)
+
+    def _key(self, cell: int) -> tuple[float, float]:
+        distance = min(self.g[cell], self.rhs[cell])
+        return distance + self.heuristic(self.start, cell) + self.km, distance
+
+    def _lookahead(self, cell: int) -> float:
+        return min(self.weights[cell + step] + self.g[cell + step] for step in self.steps)
+
+    def _update_vertex(self, cell: int) -> None:
+        if self.g[cell] != self.rhs[cell]:
+            key = self._key(cell)
+            self.keys[cell] = key
+            heapq.heappush(self.queue, (*key, cell))
+        else:
+            self.keys.pop(cell, None)
+
+    def _compute_shortest_path(self) -> None:
+        while self.queue:
+            # Entries whose key was changed or removed since they were pushed are skipped
+            first, second, cell = self.queue[0]
+            if self.keys.get(cell) != (first, second):
+                heapq.heappop(self.queue)
+                continue
+            if (first, second) >= self._key(self.start) and self.rhs[self.start] <= self.g[self.start]:
+                break
+
+            heapq.heappop(self.queue)
+            new_key = self._key(cell)
+            if (first, second) < new_key:
+                self.keys[cell] = new_key
+                heapq.heappush(self.queue, (*new_key, cell))
+            elif self.g[cell] > self.rhs[cell]:
+                self.g[cell] = self.rhs[cell]
+                del self.keys[cell]
+                for step in self.steps:
+                    predecessor = cell + step
+                    if predecessor != self.goal and self.inside[predecessor]:
+                        self.rhs[predecessor] = min(self.rhs[predecessor], self.weights[cell] + self.g[cell])
+                        self._update_vertex(predecessor)
+            else:
+                old_g, self.g[cell] = self.g[cell], inf
+                for predecessor in (cell, *(cell + step for step in self.steps)):
+                    if predecessor == self.goal or not self.inside[predecessor]:
+                        continue
+                    if predecessor == cell or self.rhs[predecessor] == self.weights[cell] + old_g:
+                        self.rhs[predecessor] = self._lookahead(predecessor)
+                    self._update_vertex(predecessor)
@@ -1,10 +1,10 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.optimize import minimize
 
 from gupb.controller.bupg.strategies.base import BaseStrategy
 from gupb.controller.bupg.knowledge.map import MapKnowledge
 from gupb.model import characters
+from gupb.model import observations
+from gupb.model.arenas import terrain_size
 from gupb.model.effects import EffectDescription
 from gupb.model.characters import ChampionKnowledge
 
@@ -26,49 +26,82 @@ class FindMenhirStrategy(BaseStrategy):
 
 
 class MenhirEstimator:
+    """
+    Keeps the tiles where the menhir may stand given the mist seen so far.
+
+    Mist covers the tiles at least the mist radius away from the menhir, so every misty tile rules out
+    the candidates closer than the radius and every clear tile those further away. Each tile is tested
+    only when it tells something new: mist once, and clear tiles again only after the radius shrinks.
+    """
 
     def __init__(self, map_knowledge: MapKnowledge):
         self.map_knowledge = map_knowledge
-        self.mist_coordinates = []
-        self.clear_coordinates = []
+        size = terrain_size(map_knowledge.terrain)
+        self.xs, self.ys = np.indices(size)
+
+        self.candidates = np.zeros(size, dtype=bool)
+        for coords, tile in map_knowledge.terrain.items():
+            self.candidates[coords] = tile.terrain_passable()
+        self.count = int(np.count_nonzero(self.candidates))
+        self.sum_x = int(self.xs[self.candidates].sum())
+        self.sum_y = int(self.ys[self.candidates].sum())
+        self.sum_squares = int((self.xs[self.candidates] ** 2 + self.ys[self.candidates] ** 2).sum())
+
+        self.mist_seen = np.zeros(size, dtype=bool)
+        self.clear_radius = np.full(size, np.iinfo(np.int64).max)
 
     def update_knowledge(self, champion_knowledge: ChampionKnowledge):
-        if self.map_knowledge.mnist_moved:
-            self.mist_coordinates = []
-            self.clear_coordinates = []
-        else:
-            for coord, tile in champion_knowledge.visible_tiles.items():
-                if EffectDescription(type='mist') in tile.effects:
-                    self.mist_coordinates.append(coord)
-                else:
-                    self.clear_coordinates.append(coord)
+        radius = self.map_knowledge.mist_radius
+        visible, misty = self._visible_and_misty(champion_knowledge)
+
+        new_mist = misty & ~self.mist_seen
+        new_clear = visible & ~misty & (self.clear_radius > radius)
+        self.mist_seen |= new_mist
+        self.clear_radius[new_clear] = radius
+
+        for x, y in zip(*np.nonzero(new_mist)):
+            self._restrict((self.xs - x) ** 2 + (self.ys - y) ** 2 >= radius ** 2)
+        for x, y in zip(*np.nonzero(new_clear)):
+            self._restrict((self.xs - x) ** 2 + (self.ys - y) ** 2 < radius ** 2)
+
+    def _visible_and_misty(self, champion_knowledge: ChampionKnowledge) -> tuple[np.ndarray, np.ndarray]:
+        observation = champion_knowledge.observation
+        if observation is not None:
+            return observation.visible, observation.visible & (observation.effects & observations.EFFECT_BITS['mist'] > 0)
+
+        visible = np.zeros(self.candidates.shape, dtype=bool)
+        misty = np.zeros(self.candidates.shape, dtype=bool)
+        for coords, tile in champion_knowledge.visible_tiles.items():
+            if coords not in self.map_knowledge.terrain:
+                continue
+            visible[coords] = True
+            misty[coords] = EffectDescription(type='mist') in tile.effects
+        return visible, misty
+
+    def _restrict(self, allowed: np.ndarray):
+        removed = self.candidates & ~allowed
+        if self.count == np.count_nonzero(removed):
+            return  # contradicts everything seen so far, e.g. because the mist radius is outdated
+
+        self.candidates &= allowed
+        self.count -= int(np.count_nonzero(removed))
+        self.sum_x -= int(self.xs[removed].sum())
+        self.sum_y -= int(self.ys[removed].sum())
+        self.sum_squares -= int((self.xs[removed] ** 2 + self.ys[removed] ** 2).sum())
+
+    @property
+    def centroid(self) -> np.ndarray:
+        return np.array([self.sum_x / self.count, self.sum_y / self.count])
+
+    @property
+    def uncertainty(self) -> float:
+        """Root mean square distance of the remaining candidates from their centroid."""
+        return max(0.0, self.sum_squares / self.count - float(self.centroid @ self.centroid)) ** 0.5
 
     def estimate_menhir(self, champion_knowledge: ChampionKnowledge) -> tuple[np.ndarray, int] | tuple[None, None]:
         self.update_knowledge(champion_knowledge)
 
-        if not self.mist_coordinates:
+        if not self.mist_seen.any():
             return None, None
 
-        result = constraint_solver(self.clear_coordinates, self.mist_coordinates, self.map_knowledge.mist_radius, np.zeros((2,)))
-
-        return result, len(self.mist_coordinates)
-
-
-def constraint_solver(inner_points: list, outer_points: list, radius: int, starting_point: np.ndarray) -> np.ndarray | None:
-    constraints = []
-
-    for x, y in inner_points:
-        constraints.append({'type': 'ineq', 'fun': lambda p, x=x, y=y: radius ** 2 - (x - p[0]) ** 2 - (y - p[1]) ** 2})
-
-    for x, y in outer_points:
-        constraints.append({'type': 'ineq', 'fun': lambda p, x=x, y=y: (x - p[0]) ** 2 + (y - p[1]) ** 2 - radius ** 2})
-
-    constraints.append({'type': 'ineq', 'fun': lambda p: p[0]})
-    constraints.append({'type': 'ineq', 'fun': lambda p: p[1]})
-
-    result = minimize(
-        lambda *args: 0, x0=starting_point,
-        constraints=constraints,
-        method='SLSQP'
-    )
-    return result.x if result.success else None
+        return self.centroid, int(np.count_nonzero(self.mist_seen))
@@ -2,7 +2,8 @@ from gupb import controller
 from gupb.model import arenas
 from gupb.model import characters, tiles
 import random
-import networkx as nx
+from collections import deque
+from typing import Optional
 from gupb.model.coordinates import Coords
 import logging
 import numpy as np
@@ -18,8 +19,34 @@ MOVEMENT_ACTIONS = [
 ATTACK_ACTIONS = [
     characters.Action.ATTACK,
 ]
+UNREACHABLE = -1
 logger = logging.getLogger("verbose")
 
+
+def distance_field(passable: list[bool], row: int, sources: list[int], until: Optional[int] = None) -> list[int]:
+    """
+    Breadth-first distances from the nearest of the sources to every cell, UNREACHABLE where there is no path.
+    Cells are flat indices of a grid padded with impassable cells, so neighbours are the index +/- 1 and +/- row.
+    If `until` is given, the search stops once it is reached and only cells on the way are final.
+    """
+    distances = [UNREACHABLE] * len(passable)
+    queue = deque()
+    for source in sources:
+        if distances[source] == UNREACHABLE:
+            distances[source] = 0
+            queue.append(source)
+    while queue and (until is None or distances[until] == UNREACHABLE):
+        index = queue.popleft()
+        if not passable[index]:
+            continue
+        distance = distances[index] + 1
+        for next_index in (index + row, index - row, index + 1, index - 1):
+            if passable[next_index] and distances[next_index] == UNREACHABLE:
+                distances[next_index] = distance
+                queue.append(next_index)
+    return distances
+
+
 class CamperBotController(controller.Controller):
     def __init__(self, first_name: str):
         self.first_name: str = first_name
@@ -28,14 +55,18 @@ class CamperBotController(controller.Controller):
         self.menhir_cords = None
         self.visited = set()
         self.arena = None
-        self.arena_graph = None
+        self.passable: Optional[np.ndarray] = None
+        self.padded_passable: list[bool] = []
         self.path_to_menhir = None
+        self.menhir_distances: list[int] = []
         self.forrest_tiles_list = []
+        self.forrest_distances: list[int] = []
         self.path_to_forrest = None
         self.go_to_forrest = True
         self.go_to_menhir = False
         self.path_to_potion = None
-        self.seen = set()
+        self.seen = 0
+        self.visibility_bits: dict[tuple[Coords, characters.Facing], int] = {}
 
     def is_mist_arround(self, knowledge: characters.ChampionKnowledge, mist_arround_trehshold: int = 2) -> bool:
         for coords, visible_tile in knowledge.visible_tiles.items():
@@ -54,32 +85,19 @@ class CamperBotController(controller.Controller):
         # print(f"dist: {dist}")
         return dist
 
-    def load_arena_to_graph(self):
-        self.arena_graph = nx.Graph()
+    def load_arena_to_grid(self):
+        self.passable = np.zeros(self.arena.size, dtype=bool)
 
         for coord, tile in self.arena.terrain.items():
-            # Dodajemy każdy wierzchołek, niezależnie od przechodniości
-            self.arena_graph.add_node(coord)
-
-            # Sprawdzamy tylko sąsiadów jeśli pole jest przechodnie
-            if not tile.terrain_passable():
-                continue
+            self.passable[coord] = tile.terrain_passable()
 
-            if tile.description().type == "forest":
+            if tile.terrain_passable() and tile.description().type == "forest":
                 self.forrest_tiles_list.append(coord)
 
-            neighbors = [
-                Coords(coord.x + 1, coord.y),
-                Coords(coord.x - 1, coord.y),
-                Coords(coord.x, coord.y + 1),
-                Coords(coord.x, coord.y - 1),
-            ]
-
-            for neighbor in neighbors:
-                neighbor_tile = self.arena.terrain.get(neighbor)
-                if neighbor_tile and neighbor_tile.terrain_passable():
-                    self.arena_graph.add_edge(coord, neighbor)
-
+        self.padded_passable = np.pad(self.passable, 1).ravel().tolist()
+        self.forrest_distances = distance_field(
+            self.padded_passable, self.arena.size[1] + 2, [self.cell_index(coord) for coord in self.forrest_tiles_list]
+        )
         self.visited = set()
 
     def __eq__(self, other: object) -> bool:
@@ -95,25 +113,45 @@ class CamperBotController(controller.Controller):
             if visible_tile.type == "menhir":
                 self.is_menhir_found = True
                 self.menhir_cords = coords
+        if self.is_menhir_found:
+            self.menhir_distances = distance_field(
+                self.padded_passable, self.arena.size[1] + 2, [self.cell_index(self.menhir_cords)]
+            )
 
-    def find_path(self, source: Coords, target: Coords):
-        try:
-            path = nx.shortest_path(self.arena_graph, source=source, target=target)
-            return path[1:]
-        except nx.NetworkXNoPath:
+    def is_inside(self, coords: Coords) -> bool:
+        return 0 <= coords[0] < self.arena.size[0] and 0 <= coords[1] < self.arena.size[1]
+
+    def path_along(self, distances: list[int], source: Coords):
+        "Steps from the source down the distance field to its nearest origin, or None if there is none"
+        if not self.is_inside(source) or distances[self.cell_index(source)] == UNREACHABLE:
             return None
-        except nx.NodeNotFound as e:
+        row = self.arena.size[1] + 2
+        index = self.cell_index(source)
+        path = []
+        while distances[index] > 0:
+            for next_index in (index + row, index - row, index + 1, index - 1):
+                if distances[next_index] == distances[index] - 1:
+                    break
+            index = next_index
+            x, y = divmod(index, row)
+            path.append(Coords(x - 1, y - 1))
+        return path
+
+    def find_path(self, source: Coords, target: Coords):
+        if not self.is_inside(source) or not self.is_inside(target):
             return None
+        distances = distance_field(
+            self.padded_passable, self.arena.size[1] + 2, [self.cell_index(target)], until=self.cell_index(source)
+        )
+        return self.path_along(distances, source)
 
     def find_path_to_menhir(self, knowledge: characters.ChampionKnowledge):
         current_position = knowledge.position
-        menhir_position = self.menhir_cords
-        self.path_to_menhir = self.find_path(current_position, menhir_position)
+        self.path_to_menhir = self.path_along(self.menhir_distances, current_position)
 
     def find_path_to_forrest(self, knowledge: characters.ChampionKnowledge):
         current_position = knowledge.position
-        closest_forrest = sorted(self.forrest_tiles_list, key=lambda x: self.manhattan_distance(current_position, x))[0]
-        self.path_to_forrest = self.find_path(current_position, closest_forrest)
+        self.path_to_forrest = self.path_along(self.forrest_distances, current_position)
 
     def is_tile_mist(self, tile: tiles.TileDescription) -> bool:
         for elem in tile.effects:
@@ -132,7 +170,7 @@ class CamperBotController(controller.Controller):
 
         character = knowledge.visible_tiles[knowledge.position].character
         facing = character.facing
-        self.seen.update(self.visible_cords(current_position, facing))
+        self.seen |= self.visibility(current_position, facing)
 
         self.visited.add(current_position)
         if not self.is_menhir_found:
@@ -358,6 +396,24 @@ class CamperBotController(controller.Controller):
         champion.facing = facing
         return [coord for coord in self.arena.visible_tiles(champion).keys() if isinstance(coord, Coords)]
 
+    def cell_index(self, coords: Coords) -> int:
+        # Coordinates are shifted by one, as tiles next to the champion may lie just outside the arena.
+        return (coords[0] + 1) * (self.arena.size[1] + 2) + coords[1] + 1
+
+    def cell_bit(self, coords: Coords) -> int:
+        return 1 << self.cell_index(coords)
+
+    def visibility(self, position: Coords, facing: characters.Facing) -> int:
+        "Bitset of coordinates visible from the position, cached for the arena"
+        key = (position, facing)
+        bits = self.visibility_bits.get(key)
+        if bits is None:
+            bits = 0
+            for coords in self.visible_cords(position, facing):
+                bits |= self.cell_bit(coords)
+            self.visibility_bits[key] = bits
+        return bits
+
     def simulate_move(self, position: Coords, facing: characters.Facing, action: characters.Action):
         if action == characters.Action.STEP_BACKWARD:
             next_position, next_facing = position - facing.value, facing
@@ -377,6 +433,7 @@ class CamperBotController(controller.Controller):
     def explore(self, position, facing, depth=3, discount=0.5):
         best_action = None
         best_value = -float("inf")
+        transpositions = {}
 
         for action in TURNING_ACTIONS + MOVEMENT_ACTIONS:
             value = self._estimate_future_gain(
@@ -385,7 +442,8 @@ class CamperBotController(controller.Controller):
                 action,
                 remaining_depth=depth,
                 discount=discount,
-                already_seen=set(self.seen)  # copy
+                already_seen=self.seen,
+                transpositions=transpositions
             )
             if value > best_value:
                 best_value = value
@@ -403,7 +461,8 @@ class CamperBotController(controller.Controller):
         action,
         remaining_depth,
         discount,
-        already_seen
+        already_seen,
+        transpositions
     ):
 
         next_position, next_facing = self.simulate_move(position, facing, action)
@@ -412,14 +471,20 @@ class CamperBotController(controller.Controller):
         if not self.arena.terrain.get(next_position, None) or not self.arena.terrain[next_position].passable:
             return 0
 
-        visible_now = set(self.visible_cords(next_position, next_facing))
-        new_here = visible_now - already_seen
-        gain_here = len(new_here)
+        # The gain only depends on the state reached and what was seen on the way,
+        # so sequences like turning left and then right are evaluated once.
+        state = (next_position, next_facing, remaining_depth, already_seen)
+        if state in transpositions:
+            return transpositions[state]
+
+        visible_now = self.visibility(next_position, next_facing)
+        gain_here = (visible_now & ~already_seen).bit_count()
 
         if remaining_depth <= 1:
+            transpositions[state] = gain_here
             return gain_here
 
-        already_seen_next = already_seen.union(new_here)
+        already_seen_next = already_seen | visible_now
         best_future = 0.0
 
         for next_action in TURNING_ACTIONS + MOVEMENT_ACTIONS:
@@ -429,12 +494,14 @@ class CamperBotController(controller.Controller):
                 next_action,
                 remaining_depth=remaining_depth - 1,
                 discount=discount,
-                already_seen=already_seen_next
+                already_seen=already_seen_next,
+                transpositions=transpositions
             )
             if future_gain > best_future:
                 best_future = future_gain
 
-        return gain_here + discount * best_future
+        transpositions[state] = gain_here + discount * best_future
+        return transpositions[state]
 
     def praise(self, score: int) -> None:
         pass
@@ -446,12 +513,17 @@ class CamperBotController(controller.Controller):
         self.visited = set()
         self.arena = arenas.Arena.load(arena_description.name)
         self.path_to_menhir = None
-        self.arena_graph = None
+        self.menhir_distances = []
+        self.passable = None
+        self.padded_passable = []
         self.path_to_forrest = None
         self.forrest_tiles_list = []
+        self.forrest_distances = []
         self.go_to_menhir = False
         self.go_to_forrest = True
-        self.load_arena_to_graph()
+        self.seen = 0
+        self.visibility_bits = {}
+        self.load_arena_to_grid()
 
     @property
     def name(self) -> str:
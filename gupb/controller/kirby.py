@@ -1,13 +1,15 @@
+import heapq
 import os
 from collections import defaultdict
+from functools import lru_cache
 from itertools import chain, product
-from queue import Queue
-from typing import Callable, Iterator
+from typing import Callable, Iterator, Optional
 
 import numpy as np
 import torch
 from gupb.controller.kirby_neural_networks import ActorLoss, ActorNet, CriticNet
-from gupb.model import arenas, characters
+from gupb.controller.kirby_numpy_networks import NumpyActorNet, PRECISIONS
+from gupb.model import arenas, characters, observations
 from gupb.model.arenas import Arena
 
 from gupb.model.characters import Facing, ChampionDescription
@@ -116,19 +118,6 @@ directions_values: dict[Facing, tuple[int, int]] = {
     Facing.RIGHT: (1, 1),
 }
 
-directions_to_rotations = {
-    Facing.UP: lambda x: x,
-    Facing.DOWN: lambda x: torch.rot90(x, 2),
-    Facing.LEFT: lambda x: torch.rot90(x, 3),
-    Facing.RIGHT: lambda x: torch.rot90(x, 1),
-}
-
-dir_to_coords_change = {
-    Facing.UP: lambda x, y: (-x, y),
-    Facing.DOWN: lambda x, y: (x, -y),
-    Facing.LEFT: lambda x, y: (-y, -x),
-    Facing.RIGHT: lambda x, y: (y, x),
-}
 neighbourhood_coords_list = [
     (-2, 0),
     (-1, 0),
@@ -146,11 +135,116 @@ neighbourhood_coords_list = [
     (2, 0),
 ]
 
+NEIGHBOURHOOD_WEIGHTS = np.zeros((2 * MAP_PADDING + 1, 2 * MAP_PADDING + 1))
+np.add.at(
+    NEIGHBOURHOOD_WEIGHTS,
+    tuple(np.array(neighbourhood_coords_list).T + MAP_PADDING),
+    1,
+)
+
+# front, right, back and left, relative to the centre of a 5x5 window
+NEAR_SIDES = (np.array([1, 2, 3, 2]), np.array([2, 3, 2, 1]))
+FAR_SIDES = (np.array([0, 2, 4, 2]), np.array([2, 4, 2, 0]))
+# front-right, right-back, back-left and left-front, each between the side with the same index and the next one
+CORNERS = (np.array([1, 3, 3, 1]), np.array([3, 3, 1, 1]))
+NEXT_SIDES = np.array([1, 2, 3, 0])
+
+LOOT_HIERARCHY = np.array(
+    [0]
+    + [
+        weapons_hierarchy[WeaponDescription(name=name)]
+        for name in observations.WEAPON_NAMES
+    ]
+)
+FOREST_CODE = observations.TILE_TYPE_CODES["forest"]
+MENHIR_CODE = observations.TILE_TYPE_CODES["menhir"]
+
+STATE_AVERAGES = np.array(
+    [
+        5.4893e-01,
+        6.6367e-03,
+        4.0418e-01,
+        4.3768e-01,
+        4.8756e-01,
+        5.0462e-01,
+        6.5315e-01,
+        6.0325e-01,
+        4.4587e-01,
+        2.9541e02,
+        1.1319e-02,
+        4.2241e01,
+        4.2241e01,
+        7.5589e-02,
+        1.1823e00,
+        6.6535e-01,
+        4.9417e00,
+        4.8999e-03,
+        1.6028e-02,
+        1.3070e01,
+        9.0275e00,
+        2.4509e00,
+        5.3455e-02,
+        1.6339e-01,
+    ],
+    dtype=np.float32,
+)
+STATE_STDS = np.array(
+    [
+        2.2256e-01,
+        8.1196e-02,
+        2.2194e-01,
+        2.2358e-01,
+        4.9985e-01,
+        4.9998e-01,
+        1.7997e-01,
+        4.8923e-01,
+        1.8282e-01,
+        2.0630e02,
+        5.9607e-02,
+        7.0683e00,
+        7.0683e00,
+        1.3641e-01,
+        7.6855e-01,
+        1.3493e00,
+        5.4691e00,
+        3.9776e-02,
+        4.7499e-02,
+        2.2869e00,
+        2.1908e00,
+        1.5901e00,
+        2.2494e-01,
+        4.9910e-01,
+    ],
+    dtype=np.float32,
+)
+
 directions_to_indices = {Facing.UP: 0, Facing.LEFT: 1, Facing.DOWN: 2, Facing.RIGHT: 3}
 indices_to_directions = {val: key for key, val in directions_to_indices.items()}
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
+WEIGHTS_PATH = os.path.join("gupb", "controller", "kirby_weights.pth")
+
+
+def load_checkpoint() -> dict:
+    return torch.load(WEIGHTS_PATH, map_location=device, weights_only=False)
+
+
+@lru_cache(maxsize=None)
+def shared_actor() -> ActorNet:
+    """Read-only actor loaded once per process and shared by all Kirby instances that are not training."""
+    actor = ActorNet(action_size=POLICIES_NUM, input_size=STATE_SIZE).to(device)
+    actor.load_state_dict(load_checkpoint()["actor"])
+    actor.eval()
+    actor.requires_grad_(False)
+    return actor
+
+
+@lru_cache(maxsize=None)
+def shared_numpy_actor(precision: str) -> NumpyActorNet:
+    """NumPy export of the actor, shared by all Kirby instances using the same precision."""
+    return NumpyActorNet.from_state_dict(load_checkpoint()["actor"], precision)
+
 
 def weapon_power(weapon_name):
     return getattr(weapons_names_dict[weapon_name].cut_effect(), "damage", 5)
@@ -163,42 +257,117 @@ def neighbourhood_4(position: tuple[int, int]):
     ]  # UP, LEFT, DOWN, RIGHT
 
 
-def distance_x_y(x: tuple[float, float]):
-    return abs(x[0]) + abs(x[1])
+def nonzero_coords(plane: np.ndarray) -> list[tuple[int, int]]:
+    return [tuple(coords) for coords in np.argwhere(plane).tolist()]
+
+
+def shortest_distances(
+    costs: np.ndarray, sources: list[tuple[tuple[int, int], float]]
+) -> np.ndarray:
+    """
+    Multi-source Dijkstra, where `costs[x, y]` is the cost of entering a tile (`inf` if it cannot be entered).
+
+    Sources start with their own, possibly negative, distances; if a tile is given more than once, the last
+    distance is kept, but the tile is expanded from the lowest one.
+    """
+    width, height = costs.shape
+    # The border makes every neighbour of a tile a valid index, without wrapping to another row.
+    row = height + 2
+    padded_costs = np.full((width + 2, row), float("inf"))
+    padded_costs[1:-1, 1:-1] = costs
+    tile_costs = padded_costs.ravel().tolist()
+    distances = [float("inf")] * len(tile_costs)
+    heap = []
+    for (x, y), distance in sources:
+        index = (x + 1) * row + y + 1
+        distances[index] = distance
+        heap.append((distance, index))
+    heapq.heapify(heap)
+    steps = (1, -1, row, -row)
+    while heap:
+        distance, index = heapq.heappop(heap)
+        if distance > distances[index]:
+            continue
+        for step in steps:
+            next_index = index + step
+            next_distance = distance + tile_costs[next_index]
+            if next_distance < distances[next_index]:
+                distances[next_index] = next_distance
+                heapq.heappush(heap, (next_distance, next_index))
+    return np.array(distances).reshape((width + 2, row))[1:-1, 1:-1]
 
 
 class KirbyController:
-    def __init__(self, first_name: str = "Kirby"):
+    observation_planes = True
+
+    def __init__(self, first_name: str = "Kirby", training: bool = False, inference: str = "float32"):
+        """
+        `inference` selects how the actor is evaluated: "torch" or a NumPy precision out of `PRECISIONS`.
+        Training always uses torch.
+        """
+        if inference != "torch" and inference not in PRECISIONS:
+            raise ValueError(f"Unknown Kirby inference backend: {inference}!")
         self.characters_no = None
         self.first_name: str = first_name
-        self.map: torch.Tensor = torch.zeros((0,))
-        self.transparent: torch.Tensor = torch.zeros((0,))
+        self.map: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.transparent: np.ndarray = np.zeros((0, 0), dtype=np.float32)
         self.terrain: dict = {}
-        self.seen: torch.Tensor = torch.zeros((0,))
+        self.seen: np.ndarray = np.zeros((0, 0), dtype=np.float32)
         self.menhir: tuple = (0, 0)
         self.prev_actions: list[int] = [7 for _ in range(5)]
-        self.mist: set[tuple[int, int]] = set()
+        self.mist: np.ndarray = np.zeros((0, 0), dtype=bool)
         self.found_menhir: bool = False
         self.weapon = Knife().description()
 
-        self.consumables: set = set()
-        self.loot: dict[tuple[int, int], WeaponDescription] = {}
-        self.effects: set = set()
-        self.trees: list = []
+        # Planes below are indexed with arena coordinates, like `observations.Observation`.
+        self.xs: np.ndarray = np.zeros((0,), dtype=int)
+        self.ys: np.ndarray = np.zeros((0,), dtype=int)
+        self.inverse_corner_distances: np.ndarray = np.zeros((0, 0))
+        self.consumables: np.ndarray = np.zeros((0, 0), dtype=bool)
+        self.loot: np.ndarray = np.zeros((0, 0), dtype=np.uint8)
+        self.effects: np.ndarray = np.zeros((0, 0), dtype=bool)
+        self.tree_sightings: np.ndarray = np.zeros((0, 0), dtype=int)
+        self.tiles_observation: Optional[observations.Observation] = None
+
+        # Computed lazily and dropped whenever the knowledge is updated.
+        self.hits: Optional[dict[Coords, int]] = None
+        self.costs: Optional[np.ndarray] = None
+        self.distance_fields: dict[str, np.ndarray] = {}
 
         self.characters: dict[str, ChampionDescription] = {}
         self.positions_to_characters: dict = {}
         self.characters_to_positions: dict = {}
 
+        self.training: bool = training
+        self.inference: str = "torch" if training else inference
+        self.actor_B: Optional[ActorNet] = None
+        self.numpy_actor: Optional[NumpyActorNet] = None
+        if self.training:
+            self.setup_training()
+
+        self.time = 0
+
+        self.actor_losses = []
+        self.critic_losses = []
+        self.actor_game_losses = []
+        self.critic_game_losses = []
+        self.scores = []
+        self.times = []
+        self.actions_count = []
+        self.actions = np.zeros((POLICIES_NUM,))
+
+        self.states: list[np.ndarray] = []
+        self.all_states = []
+        self.rewards = []
+
+    def setup_training(self):
         self.actor_A = ActorNet(action_size=POLICIES_NUM, input_size=24).to(device)
         self.actor_B = ActorNet(action_size=POLICIES_NUM, input_size=24).to(device)
         self.actor_A.eval()
         self.actor_B.eval()
-        self.actor_B.load_state_dict(self.actor_A.state_dict())
 
         self.critic_A = CriticNet(input_size=24).to(device)
         self.critic_B = CriticNet(input_size=24).to(device)
-        self.critic_B.load_state_dict(self.critic_A.state_dict())
 
         self.actor_loss_fn = ActorLoss()
         self.critic_loss_fn = torch.nn.MSELoss()
@@ -210,23 +379,7 @@ class KirbyController:
             self.critic_A.parameters(), lr=CRITIC_LR_ARRAY[0]
         )
 
-        self.time = 0
-
-        self.actor_losses = []
-        self.critic_losses = []
-        self.actor_game_losses = []
-        self.critic_game_losses = []
-        self.scores = []
-        self.times = []
-        self.actions_count = []
-        self.actions = np.zeros((POLICIES_NUM,))
-
-        self.states: list[torch.Tensor] = []
-        self.all_states = []
-        self.rewards = []
-        checkpoint = torch.load(
-            os.path.join("gupb", "controller", "kirby_weights.pth"), weights_only=False
-        )
+        checkpoint = load_checkpoint()
         self.actor_A.load_state_dict(checkpoint["actor"])
         self.actor_B.load_state_dict(checkpoint["actor"])
         self.critic_A.load_state_dict(checkpoint["critic"])
@@ -241,39 +394,71 @@ class KirbyController:
         return hash(self.first_name)
 
     def exploration_status(self):
-        return self.seen.sum() / self.map.numel()
-
-    def update_visible_items(
-        self, visible_tiles: dict[Coords, TileDescription], my_position: tuple
-    ):
+        return self.seen.sum() / self.map.size
+
+    def observe_tiles(
+        self, visible_tiles: dict[Coords, TileDescription]
+    ) -> observations.Observation:
+        """Fills the planes used by Kirby from tile descriptions, for knowledge without observation planes."""
+        observation = self.tiles_observation
+        for plane in observation.planes():
+            plane.fill(0)
         for coords, tile in visible_tiles.items():
-            self.seen[coords] = 1
-
-            if tile.type == "menhir":
-                self.menhir = coords
-                self.found_menhir = True
-            elif coords == self.menhir and not self.found_menhir:
-                self.random_menhir()
-
-            if tile.type == "forest":
-                self.trees.append(coords)
-
-            if tile.consumable:
-                self.consumables.add(coords)
-            else:
-                self.consumables.discard(coords)
-
+            observation.visible[coords] = True
+            observation.tile_type[coords] = observations.TILE_TYPE_CODES[tile.type]
             if tile.loot:
-                self.loot[coords] = tile.loot
-            elif coords in self.loot:
-                self.loot.pop(coords)
+                observation.loot[coords] = observations.WEAPON_CODES[tile.loot.name]
+            if tile.consumable:
+                observation.consumable[coords] = observations.CONSUMABLE_CODES[
+                    tile.consumable.name
+                ]
+            if tile.character:
+                observation.character_facing[coords] = observations.FACING_CODES[
+                    tile.character.facing.name
+                ]
+            for effect in tile.effects:
+                observation.effects[coords] |= observations.EFFECT_BITS[effect.type]
+        return observation
 
-            if tile.effects:
-                self.effects.add(coords)
-                if any(effect.type == "mist" for effect in tile.effects):
-                    self.mist.add(coords)
+    def update_visible_items(
+        self,
+        observation: observations.Observation,
+        visible_tiles: dict[Coords, TileDescription],
+        my_position: Coords,
+    ):
+        self.hits = None
+        self.costs = None
+        self.distance_fields = {}
+
+        visible = observation.visible
+        # `seen` has the padded shape, but it is indexed with arena coordinates.
+        np.copyto(self.seen[: visible.shape[0], : visible.shape[1]], 1, where=visible)
+
+        self.tree_sightings += observation.tile_type == FOREST_CODE
+        np.copyto(self.consumables, observation.consumable > 0, where=visible)
+        np.copyto(self.loot, observation.loot, where=visible)
+        self.effects |= observation.effects > 0
+        self.mist |= (observation.effects & observations.EFFECT_BITS["mist"]) > 0
+
+        height = visible.shape[1]
+        menhirs = np.flatnonzero(observation.tile_type == MENHIR_CODE)
+        if len(menhirs):
+            self.menhir = Coords(*divmod(int(menhirs[0]), height))
+            self.found_menhir = True
+        elif visible[self.menhir] and not self.found_menhir:
+            self.random_menhir()
+
+        for coords in list(self.positions_to_characters):
+            if visible[coords] and (
+                not observation.character_facing[coords] or coords == my_position
+            ):
+                character_name = self.positions_to_characters.pop(coords)
+                self.characters_to_positions.pop(character_name)
 
-            if tile.character is not None and coords != my_position:
+        for index in np.flatnonzero(observation.character_facing).tolist():
+            coords = Coords(*divmod(index, height))
+            if coords != my_position:
+                tile = visible_tiles[coords]
                 character_name = tile.character.controller_name
                 self.characters[character_name] = tile.character
                 old_pos = self.characters_to_positions.get(character_name, None)
@@ -281,11 +466,6 @@ class KirbyController:
                 if old_pos and old_pos != coords:
                     self.positions_to_characters.pop(old_pos, None)
                 self.positions_to_characters[coords] = character_name
-            elif (
-                tile.character is None or coords == my_position
-            ) and coords in self.positions_to_characters:
-                character_name = self.positions_to_characters.pop(coords)
-                self.characters_to_positions.pop(character_name)
 
     def random_menhir(self):
         self.menhir = (
@@ -295,72 +475,82 @@ class KirbyController:
         while (
             not self.map[self.menhir[0] + MAP_PADDING, self.menhir[1] + MAP_PADDING]
             or self.seen[self.menhir]
-            or self.menhir in self.mist
+            or self.mist[self.menhir]
         ):
             self.menhir = (
                 np.random.randint(self.map.shape[0] - 2 * MAP_PADDING),
                 np.random.randint(self.map.shape[1] - 2 * MAP_PADDING),
             )
 
-    def a_star_setup(self):
-        return (
-            np.full(
-                (
-                    self.map.shape[0] - 2 * MAP_PADDING,
-                    self.map.shape[1] - 2 * MAP_PADDING,
-                ),
-                fill_value=float("inf"),
-            ),
-            Queue(),
-        )
+    def walkable(self) -> np.ndarray:
+        walkable = (self.map[MAP_PADDING:-MAP_PADDING, MAP_PADDING:-MAP_PADDING] > 0) & ~self.mist
+        # Tiles in the first row and column are never entered.
+        walkable[0, :] = False
+        walkable[:, 0] = False
+        return walkable
+
+    def path_costs(self) -> np.ndarray:
+        """Costs of entering every tile, avoiding effects and tiles hit by opponents; computed once per turn."""
+        if self.costs is None:
+            hits = np.zeros(self.effects.shape)
+            # opponents_hit_dict keeps only coords inside the arena, so none of them wraps around the grid
+            for coord, damage in self.opponents_hit_dict().items():
+                hits[coord] = damage
+            costs = np.where(self.effects, 1000.0, 1.0) + hits * 100
+            walkable = self.walkable()
+            for position in self.positions_to_characters:
+                walkable[position] = False
+            costs[~walkable] = float("inf")
+            self.costs = costs
+        return self.costs
+
+    def distance_field(
+        self, name: str, sources: list[tuple[tuple[int, int], float]]
+    ) -> np.ndarray:
+        """Distances to the sources of the named policy, shared by all policies within a turn."""
+        if name not in self.distance_fields:
+            self.distance_fields[name] = shortest_distances(self.path_costs(), sources)
+        return self.distance_fields[name]
+
+    def travel_distances(self) -> np.ndarray:
+        return self.distance_field("travel", [(self.menhir, 0)])
 
     def travel(
         self, my_position: tuple[int, int], my_direction: Facing
     ) -> characters.Action:
-        distances, queue = self.a_star_setup()
-        distances[self.menhir] = 0
-        queue.put((self.menhir, 0))
-        return self.path_finding(queue, distances, my_position, my_direction)
+        return self.path_finding(self.travel_distances(), my_position, my_direction)
 
     def hide(
         self, my_position: tuple[int, int], my_direction: Facing
     ) -> characters.Action:
-        distances, queue = self.a_star_setup()
-        for tree in self.trees:
-            distances[tree] = 0
-            queue.put((tree, 0))
-        distances[self.menhir] = 1000
-        queue.put((self.menhir, 1000))
-        return self.path_finding(queue, distances, my_position, my_direction)
+        sources = [(tree, 0) for tree in nonzero_coords(self.tree_sightings)]
+        sources.append((self.menhir, 1000))
+        distances = self.distance_field("hide", sources)
+        return self.path_finding(distances, my_position, my_direction)
 
     def bigger_weapons(
         self, my_position: tuple[int, int], my_direction: Facing
     ) -> characters.Action:
-        distances, queue = self.a_star_setup()
-        for coord in self.loot.keys():
-            weapon_value = weapons_hierarchy[self.loot[coord]]
+        sources = []
+        for coord in nonzero_coords(self.loot):
+            weapon_value = int(LOOT_HIERARCHY[self.loot[coord]])
             if (
                 weapon_value >= weapons_hierarchy[self.weapon]
                 and self.weapon.name != "scroll"
             ):
-                distances[coord] = -weapon_value * 10
-                queue.put((coord, -weapon_value * 10))
+                sources.append((coord, -weapon_value * 10))
 
-        distances[self.menhir] = 1000
-        queue.put((self.menhir, 1000))
-
-        return self.path_finding(queue, distances, my_position, my_direction)
+        sources.append((self.menhir, 1000))
+        distances = self.distance_field("bigger_weapons", sources)
+        return self.path_finding(distances, my_position, my_direction)
 
     def get_consumables(
         self, my_position: tuple[int, int], my_direction: Facing
     ) -> characters.Action:
-        distances, queue = self.a_star_setup()
-        for consumable in self.consumables:
-            distances[consumable] = 0
-            queue.put((consumable, 0))
-        distances[self.menhir] = 1000
-        queue.put((self.menhir, 1000))
-        return self.path_finding(queue, distances, my_position, my_direction)
+        sources = [(consumable, 0) for consumable in nonzero_coords(self.consumables)]
+        sources.append((self.menhir, 1000))
+        distances = self.distance_field("get_consumables", sources)
+        return self.path_finding(distances, my_position, my_direction)
 
     def attack(
         self, my_position: tuple[int, int], my_direction: Facing
@@ -381,19 +571,17 @@ class KirbyController:
             if (
                 0 < goal_position[0] < self.map.shape[0] - MAP_PADDING * 2
                 and 0 < goal_position[1] < self.map.shape[1] - MAP_PADDING * 2
-                and character_position not in self.trees
+                and not self.tree_sightings[character_position]
             ):
                 attacking_positions.append(
                     goal_position
                 )  # The position I need to be at in order to attack opponent
 
-        distances, queue = self.a_star_setup()
-        for coord in attacking_positions:
-            distances[coord] = 0
-            queue.put((coord, 0))
-        distances[self.menhir] = 1000
-        queue.put((self.menhir, 1000))
-        return self.path_finding(queue, distances, my_position, my_direction)
+        sources = [(coord, 0) for coord in attacking_positions]
+        sources.append((self.menhir, 1000))
+        # Attacking positions depend on the facing, so they are not shared with other policies.
+        distances = shortest_distances(self.path_costs(), sources)
+        return self.path_finding(distances, my_position, my_direction)
 
     def reconnaissance(
         self,
@@ -404,40 +592,22 @@ class KirbyController:
 
     def run(self, my_position: tuple[int, int], my_direction: Facing):
         truncated_map = self.map[MAP_PADDING:-MAP_PADDING, MAP_PADDING:-MAP_PADDING]
-        distances, queue = self.a_star_setup()
         hits_map = self.opponents_hit_dict()
-        if not any([self.positions_to_characters, hits_map, self.effects]):
-            distances[self.menhir] = 0
-            queue.put((self.menhir, 0))
-            self.path_finding(queue, distances, my_position, my_direction)
-
-        for position in chain(
-            self.positions_to_characters, hits_map.keys(), self.effects
-        ):
-            is_in = (
-                0 < position[0] < truncated_map.shape[0]
-                and 0 < position[1] < truncated_map.shape[1]
-            )
-            if is_in:
-                distances[position] = 0
-                queue.put((position, 0))
-
-        while not queue.empty():
-            tile, distance = queue.get()
-            for dir_vector in ((0, 1), (1, 0), (0, -1), (-1, 0)):
-                next_tile = tile[0] + dir_vector[0], tile[1] + dir_vector[1]
-                is_in = (
-                    0 < next_tile[0] < truncated_map.shape[0]
-                    and 0 < next_tile[1] < truncated_map.shape[1]
+        if not any([self.positions_to_characters, hits_map, self.effects.any()]):
+            distances = self.travel_distances()
+        else:
+            sources = [
+                (position, 0)
+                for position in chain(
+                    self.positions_to_characters,
+                    hits_map.keys(),
+                    nonzero_coords(self.effects),
                 )
-                if (
-                    is_in
-                    and next_tile not in self.mist
-                    and truncated_map[next_tile]
-                    and distances[next_tile] > distance + 1
-                ):
-                    distances[next_tile] = distance + 1
-                    queue.put((next_tile, distance + 1))
+                if 0 < position[0] < truncated_map.shape[0]
+                and 0 < position[1] < truncated_map.shape[1]
+            ]
+            costs = np.where(self.walkable(), 1.0, float("inf"))
+            distances = shortest_distances(costs, sources)
         next_action_id = np.nan_to_num(
             np.array(
                 [
@@ -467,55 +637,34 @@ class KirbyController:
                 case 3:
                     return characters.Action.STEP_RIGHT
 
-    def opponents_hit_dict(self):
-        opponents_hits = [
-            (coord, weapon_power(character.weapon))
-            for character in self.characters.values()
-            if character.controller_name in self.characters_to_positions
-            for coord in weapons_names_dict[character.weapon].cut_positions(
-                self.terrain,
-                Coords(*self.characters_to_positions[character.controller_name]),
-                character.facing,
-            )
-        ]
-        opponents_hits_dict = defaultdict(lambda: 0)
-        for coord, damage in opponents_hits:
-            opponents_hits_dict[coord] += damage
-        return opponents_hits_dict
+    def opponents_hit_dict(self) -> dict[Coords, int]:
+        if self.hits is None:
+            opponents_hits = [
+                (coord, weapon_power(character.weapon))
+                for character in self.characters.values()
+                if character.controller_name in self.characters_to_positions
+                for coord in weapons_names_dict[character.weapon].cut_positions(
+                    self.terrain,
+                    Coords(*self.characters_to_positions[character.controller_name]),
+                    character.facing,
+                )
+            ]
+            # Some weapons reach past the arena edge, and those coords are used as array indices
+            width, height = self.effects.shape
+            opponents_hits_dict = defaultdict(lambda: 0)
+            for coord, damage in opponents_hits:
+                if 0 <= coord[0] < width and 0 <= coord[1] < height:
+                    opponents_hits_dict[coord] += damage
+            self.hits = dict(opponents_hits_dict)
+        return self.hits
 
     def path_finding(
         self,
-        queue: Queue,
         distances: np.ndarray,
         my_position: tuple[int, int],
         my_direction: Facing,
-        additional_impassable=None,
     ):
         truncated_map = self.map[MAP_PADDING:-MAP_PADDING, MAP_PADDING:-MAP_PADDING]
-        hits_map = self.opponents_hit_dict()
-        while not queue.empty():
-            tile, distance = queue.get()
-            for dir_vector in ((0, 1), (1, 0), (0, -1), (-1, 0)):
-                next_tile = tile[0] + dir_vector[0], tile[1] + dir_vector[1]
-                is_in = (
-                    0 < next_tile[0] < truncated_map.shape[0]
-                    and 0 < next_tile[1] < truncated_map.shape[1]
-                )
-                next_tile_effect = 1000 if next_tile in self.effects else 1
-                next_tile_effect += hits_map[next_tile] * 100
-                if (
-                    is_in
-                    and next_tile not in self.mist
-                    and truncated_map[next_tile]
-                    and next_tile not in self.positions_to_characters
-                    and distances[next_tile] > distance + next_tile_effect
-                    and (
-                        additional_impassable is None
-                        or next_tile not in additional_impassable
-                    )
-                ):
-                    distances[next_tile] = distance + next_tile_effect
-                    queue.put((next_tile, distance + next_tile_effect))
         next_action_id = np.array(
             [
                 distances[i, j]
@@ -538,21 +687,15 @@ class KirbyController:
                 case 3:
                     return characters.Action.STEP_RIGHT
 
-    def get_neighbourhood_from(
-        self, my_position: tuple[int, int], my_direction: Facing, my_map: torch.Tensor
-    ) -> torch.Tensor:
-        neighbourhood = my_map[
+    def neighbourhood_sum(self, my_position: tuple[int, int], my_map: np.ndarray) -> float:
+        window = my_map[
             my_position[0] : my_position[0] + 2 * MAP_PADDING + 1,
             my_position[1] : my_position[1] + 2 * MAP_PADDING + 1,
         ]
+        # The neighbourhood is symmetric, so the window does not have to be rotated.
+        return (window * NEIGHBOURHOOD_WEIGHTS).sum()
 
-        neighbourhood = directions_to_rotations[my_direction](neighbourhood)
-        coords_list = [(i + 2, j + 2) for i, j in neighbourhood_coords_list]
-        return torch.tensor([neighbourhood[coords] for coords in coords_list])
-
-    def get_neighbourhood(
-        self, my_position: tuple[int, int], my_direction: Facing
-    ) -> tuple[torch.Tensor, torch.Tensor]:
+    def passable_neighbourhood(self, my_position: tuple[int, int]) -> int:
         """
         ##2##
         #212#
@@ -561,44 +704,22 @@ class KirbyController:
         ##2##
         Używam takiego sąsiedztwa
         """
-        neighbourhood = self.map[
-            my_position[0] : my_position[0] + 2 * MAP_PADDING + 1,
-            my_position[1] : my_position[1] + 2 * MAP_PADDING + 1,
-        ]
-
-        neighbourhood = directions_to_rotations[my_direction](neighbourhood)
-        f1 = neighbourhood[1, 2]
-        f2 = f1 and neighbourhood[0, 2]
-        r1 = neighbourhood[2, 3]
-        r2 = r1 and neighbourhood[2, 4]
-        rf = neighbourhood[1, 3] and (f1 or r1)
-        l1 = neighbourhood[2, 1]
-        l2 = l1 and neighbourhood[2, 0]
-        lf = neighbourhood[1, 1] and (f1 or l1)
-        b1 = neighbourhood[3, 2]
-        b2 = neighbourhood[4, 2] and b1
-        lb = neighbourhood[3, 1] and (b1 or l1)
-        rb = neighbourhood[3, 3] and (b1 or r1)
-        neighbourhood = torch.tensor([f1, f2, l1, l2, lf, r1, r2, rf, b1, b2, lb, rb])
-        return neighbourhood, f1
-
-    def opponents_hits(
-        self, opponents_hits: list[tuple[tuple[int, int], int]]
-    ) -> tuple[float, float]:
-        hit_effects = defaultdict(lambda: 0)
-        for tile in opponents_hits:
-            relative_coord = tile[0]
-            if relative_coord in neighbourhood_coords_list:
-                hit_effects[relative_coord] += tile[1]
-
-        return sum(hit_effects[i] for i in neighbourhood_coords_list) / 40, hit_effects[
-            (0, 0)
-        ] / 8
-
-    def analyse_knoledge(self, knowledge: characters.ChampionKnowledge):
-        relative_coords = lambda x: dir_to_coords_change[my_direction](
-            x[0] - knowledge.position.x, knowledge.position.y - x[1]
+        window = (
+            self.map[
+                my_position[0] : my_position[0] + 2 * MAP_PADDING + 1,
+                my_position[1] : my_position[1] + 2 * MAP_PADDING + 1,
+            ]
+            > 0
         )
+        # The sum of the neighbourhood does not depend on the facing, so the window is not rotated.
+        near = window[NEAR_SIDES]
+        far = window[FAR_SIDES] & near
+        corners = window[CORNERS] & (near | near[NEXT_SIDES])
+        return int(near.sum() + far.sum() + corners.sum())
+
+    def analyse_knoledge(
+        self, knowledge: characters.ChampionKnowledge
+    ) -> tuple[np.ndarray, float]:
         if self.time == 0:
             self.characters_no = knowledge.no_of_champions_alive
         my_position = knowledge.position
@@ -616,51 +737,28 @@ class KirbyController:
             )
         }
         my_weapon_power = weapon_power(self.weapon)
-        my_vector = torch.tensor(
-            [
-                my_health,
-                my_effects,
-                my_position[0] / (self.map.shape[0] - 2 * MAP_PADDING),
-                my_position[1] / (self.map.shape[1] - 2 * MAP_PADDING),
-                *directions_values[my_direction],
-            ]
-        )
 
-        self.update_visible_items(knowledge.visible_tiles, my_position)
+        observation = knowledge.observation
+        if observation is None:
+            observation = self.observe_tiles(knowledge.visible_tiles)
+        self.update_visible_items(observation, knowledge.visible_tiles, my_position)
 
-        closest_consumables = sum(
-            1 / distance_x_y(relative_coords(i))
-            for i in self.consumables
-            if distance_x_y(relative_coords(i)) > 0
-        )
-        closest_effects = sum(
-            1
-            / (
-                distance_x_y(relative_coords(i))
-                if distance_x_y(relative_coords(i)) > 0
-                else 0.4
-            )
-            for i in self.effects
-        )
-        closest_loot = sum(
-            max(1, weapons_hierarchy[self.loot[i]] * 2)
-            / (
-                distance_x_y(relative_coords(i))
-                if distance_x_y(relative_coords(i)) > 0
-                else 0.4
-            )
-            for i in self.loot
-        )
-        closest_trees = sum(
-            1
-            / (
-                distance_x_y(relative_coords(i))
-                if distance_x_y(relative_coords(i)) > 0
-                else 0.4
-            )
-            for i in self.trees
-            if distance_x_y(relative_coords(i)) > 0
+        distances = np.add.outer(
+            np.abs(self.xs - my_position[0]), np.abs(self.ys - my_position[1])
         )
+        near_distances = distances.astype(float)
+        near_distances[my_position] = 0.4
+        inverse_distances = 1 / near_distances
+
+        closest_effects = inverse_distances[self.effects].sum()
+        has_loot = self.loot > 0
+        closest_loot = (
+            np.maximum(1, LOOT_HIERARCHY[self.loot[has_loot]] * 2)
+            / near_distances[has_loot]
+        ).sum()
+        inverse_distances[my_position] = 0
+        closest_consumables = inverse_distances[self.consumables].sum()
+        closest_trees = (self.tree_sightings * inverse_distances).sum()
 
         closest_characters = 0.0
         for i, (character_name, coords) in enumerate(
@@ -670,8 +768,8 @@ class KirbyController:
             closest_characters += (
                 max(1.0, weapons_hierarchy[character.weapon] * 2)
                 * character.health
-                / distance_x_y(relative_coords(coords))
-                if distance_x_y(relative_coords(coords)) > 0
+                / distances[coords]
+                if distances[coords] > 0
                 else 0
             )
         attack_effects = (
@@ -684,33 +782,28 @@ class KirbyController:
             )
             / 8
         )
-        closest_mist = max(
-            [1 / (distance_x_y(i) if distance_x_y(i) > 0 else 0.5) for i in self.mist]
-            + [0]
-        )
-        opponents_hits: list[tuple[tuple[int, int], int]] = [
-            (relative_coords(i), weapon_power(character.weapon))
-            for character in self.characters.values()
-            if character.controller_name in self.characters_to_positions
-            for i in weapons_names_dict[character.weapon].cut_positions(
-                self.terrain,
-                Coords(*self.characters_to_positions[character.controller_name]),
-                character.facing,
-            )
-        ]
+        closest_mist = self.inverse_corner_distances[self.mist].max(initial=0)
 
-        hits_sum_neighbourhood, hits_on_me = torch.tensor(
-            self.opponents_hits(opponents_hits), dtype=torch.float32
+        hits_map = self.opponents_hit_dict()
+        hits_on_me = hits_map.get(my_position, 0)
+        hits_sum_neighbourhood = (
+            sum(
+                damage
+                for coords, damage in hits_map.items()
+                if distances[coords] <= MAP_PADDING
+            )
+            + hits_on_me
         )
 
-        neighbourhood, _ = self.get_neighbourhood(my_position, my_direction)
-
-        local_exploration = self.get_neighbourhood_from(
-            my_position, my_direction, self.seen
-        ).sum()
-        is_hidden = knowledge.visible_tiles[my_position].type == "forest"
-        meta = torch.tensor(
+        local_exploration = self.neighbourhood_sum(my_position, self.seen)
+        is_hidden = my_tile.type == "forest"
+        state = np.array(
             [
+                my_health,
+                my_effects,
+                my_position[0] / (self.map.shape[0] - 2 * MAP_PADDING),
+                my_position[1] / (self.map.shape[1] - 2 * MAP_PADDING),
+                *directions_values[my_direction],  # 6
                 knowledge.no_of_champions_alive / self.characters_no,
                 self.found_menhir,
                 self.exploration_status(),
@@ -722,81 +815,20 @@ class KirbyController:
                 np.sqrt(closest_loot),
                 np.sqrt(closest_effects),
                 np.sqrt(closest_trees),
-                hits_on_me,
-                hits_sum_neighbourhood,
+                hits_on_me / 8,
+                hits_sum_neighbourhood / 40,
                 local_exploration,
-                neighbourhood.sum(),
+                self.passable_neighbourhood(my_position),
                 np.sqrt(closest_characters),
                 is_hidden,
-                closest_mist,
-            ]
-        )
-        result_vector = torch.hstack(
-            [
-                my_vector,  # 6
-                meta,  # 18
-            ],  # 24
+                closest_mist,  # 24
+            ],
+            dtype=np.float32,
         )
-        return result_vector.type(torch.float32), attack_effects
+        return state, attack_effects
 
-    def normalize_state(self, state: torch.Tensor) -> torch.Tensor:
-        avgs = torch.tensor(
-            [
-                5.4893e-01,
-                6.6367e-03,
-                4.0418e-01,
-                4.3768e-01,
-                4.8756e-01,
-                5.0462e-01,
-                6.5315e-01,
-                6.0325e-01,
-                4.4587e-01,
-                2.9541e02,
-                1.1319e-02,
-                4.2241e01,
-                4.2241e01,
-                7.5589e-02,
-                1.1823e00,
-                6.6535e-01,
-                4.9417e00,
-                4.8999e-03,
-                1.6028e-02,
-                1.3070e01,
-                9.0275e00,
-                2.4509e00,
-                5.3455e-02,
-                1.6339e-01,
-            ]
-        )
-        stds = torch.tensor(
-            [
-                2.2256e-01,
-                8.1196e-02,
-                2.2194e-01,
-                2.2358e-01,
-                4.9985e-01,
-                4.9998e-01,
-                1.7997e-01,
-                4.8923e-01,
-                1.8282e-01,
-                2.0630e02,
-                5.9607e-02,
-                7.0683e00,
-                7.0683e00,
-                1.3641e-01,
-                7.6855e-01,
-                1.3493e00,
-                5.4691e00,
-                3.9776e-02,
-                4.7499e-02,
-                2.2869e00,
-                2.1908e00,
-                1.5901e00,
-                2.2494e-01,
-                4.9910e-01,
-            ]
-        )
-        return (state - avgs) / stds
+    def normalize_state(self, state: np.ndarray) -> np.ndarray:
+        return (state - STATE_AVERAGES) / STATE_STDS
 
     def decide(self, knowledge: characters.ChampionKnowledge) -> characters.Action:
         my_position = tuple(knowledge.position)
@@ -815,12 +847,7 @@ class KirbyController:
         new_map, attack_effects = self.analyse_knoledge(knowledge)
         new_map = self.normalize_state(new_map)
 
-        with torch.no_grad():
-            policy_b = self.actor_B(
-                new_map.reshape((1, -1)).to(device)
-            )  # przewidujemy przyszłość
-
-        probs = policy_b.cpu().detach().numpy()[0]
+        probs = self.policy(new_map)
 
         probs /= probs.sum()
         choice_idx = np.random.choice(
@@ -836,21 +863,42 @@ class KirbyController:
 
         return policies[choice_idx](my_position, my_direction)
 
+    def policy(self, state: np.ndarray) -> np.ndarray:
+        if self.numpy_actor is not None:
+            return self.numpy_actor(state.reshape((1, -1)))[0]
+        with torch.no_grad():
+            policy_b = self.actor_B(
+                torch.from_numpy(state).reshape((1, -1)).to(device)
+            )  # przewidujemy przyszłość
+        return policy_b.cpu().detach().numpy()[0]
+
     def praise(self, score: int) -> None:
         pass
 
     def reset(self, game_no: int, arena_description: arenas.ArenaDescription) -> None:
+        if self.inference == "torch" and self.actor_B is None:
+            self.actor_B = shared_actor()
+        elif self.inference != "torch" and self.numpy_actor is None:
+            self.numpy_actor = shared_numpy_actor(self.inference)
         arena = Arena.load(arena_description.name)
         self.terrain = arena.terrain
-        self.map = torch.zeros(arena.size)
-        self.transparent = torch.zeros(arena.size)
+        self.map = np.zeros(arena.size, dtype=np.float32)
+        self.transparent = np.zeros(arena.size, dtype=np.float32)
 
         self.time = 0
 
-        self.consumables = set()
-        self.loot = {}
-        self.effects = set()
-        self.trees = []
+        self.xs, self.ys = np.arange(arena.size[0]), np.arange(arena.size[1])
+        # Mist is weighted by the distance from the corner of the arena.
+        corner_distances = np.add.outer(self.xs, self.ys)
+        self.inverse_corner_distances = 1 / np.where(
+            corner_distances > 0, corner_distances, 0.5
+        )
+        self.consumables = np.zeros(arena.size, dtype=bool)
+        self.loot = np.zeros(arena.size, dtype=np.uint8)
+        self.effects = np.zeros(arena.size, dtype=bool)
+        self.mist = np.zeros(arena.size, dtype=bool)
+        self.tree_sightings = np.zeros(arena.size, dtype=int)
+        self.tiles_observation = observations.Observation(arena.size)
 
         self.characters = {}
         self.characters_to_positions = {}
@@ -860,28 +908,23 @@ class KirbyController:
             self.map[coords] += int(tile.passable)
             self.transparent[coords] += int(tile.transparent)
 
-        self.map = torch.tensor(
-            np.pad(
-                self.map,
-                ((MAP_PADDING, MAP_PADDING), (MAP_PADDING, MAP_PADDING)),
-                "constant",
-                constant_values=(0, 0),
-            )
+        self.map = np.pad(
+            self.map,
+            ((MAP_PADDING, MAP_PADDING), (MAP_PADDING, MAP_PADDING)),
+            "constant",
+            constant_values=(0, 0),
         )
 
-        self.transparent = torch.tensor(
-            np.pad(
-                self.transparent,
-                ((MAP_PADDING, MAP_PADDING), (MAP_PADDING, MAP_PADDING)),
-                "constant",
-                constant_values=(0, 0),
-            )
+        self.transparent = np.pad(
+            self.transparent,
+            ((MAP_PADDING, MAP_PADDING), (MAP_PADDING, MAP_PADDING)),
+            "constant",
+            constant_values=(0, 0),
         )
-        self.seen = torch.zeros_like(self.map)
+        self.seen = np.zeros_like(self.map)
         self.random_menhir()
         self.found_menhir = False
         self.weapon = Knife().description()
-        self.mist = set()
         self.states = []
 
     @property
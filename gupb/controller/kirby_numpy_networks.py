@@ -0,0 +1,91 @@
+from typing import Any, Mapping, Optional
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+LAYER_NORM_EPS = 1e-5
+
+ACTOR_LINEAR_KEYS = ("shared.0", "shared.4", "shared.8", "actor_head.0")
+ACTOR_LAYER_NORM_KEYS = ("shared.3", "shared.7", "shared.11")
+
+
+def _to_numpy(value: Any) -> np.ndarray:
+    if hasattr(value, "detach"):
+        value = value.detach().cpu().numpy()
+    return np.asarray(value, dtype=np.float64)
+
+
+class NumpyLinear:
+    """
+    Linear layer with weights stored in the chosen precision.
+
+    float16 and int8 weights take 2 and 4 times less memory and are multiplied in the stored dtype:
+    einsum casts them to float32 one buffer at a time, so no full float32 copy is ever allocated.
+    int8 weights are quantised symmetrically with one scale per output feature, applied to the product.
+    """
+
+    def __init__(self, weight: np.ndarray, bias: np.ndarray, precision: str = "float32") -> None:
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}!")
+        self.bias: np.ndarray = bias.astype(np.float32)
+        self.scale: Optional[np.ndarray] = None
+        if precision == "int8":
+            scale = np.abs(weight).max(axis=1) / 127
+            scale[scale == 0] = 1
+            self.weight: np.ndarray = np.round(weight / scale[:, None]).astype(np.int8)
+            self.scale = scale.astype(np.float32)
+        else:
+            self.weight = weight.astype(precision)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        if self.weight.dtype == np.float32:
+            y = x @ self.weight.T
+        else:
+            y = np.einsum("...j,kj->...k", x, self.weight, dtype=np.float32, casting="unsafe")
+        if self.scale is not None:
+            y *= self.scale
+        y += self.bias
+        return y
+
+
+class NumpyActorNet:
+    """
+    Eval-mode `ActorNet` computed with NumPy only.
+
+    Dropout is an identity in eval mode and is left out, and the affine part of every `LayerNorm`
+    is folded into the linear layer that follows it, so only the normalisation itself remains.
+    """
+
+    def __init__(self, layers: list[NumpyLinear], eps: float = LAYER_NORM_EPS) -> None:
+        self.layers: list[NumpyLinear] = layers
+        self.eps: float = eps
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        h = np.asarray(x, dtype=np.float32)
+        for layer in self.layers[:-1]:
+            h = layer(h)
+            np.maximum(h, 0, out=h)
+            h -= h.mean(axis=-1, keepdims=True)
+            h /= np.sqrt((h * h).mean(axis=-1, keepdims=True) + self.eps)
+        logits = self.layers[-1](h)
+        logits -= logits.max(axis=-1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=-1, keepdims=True)
+        return logits
+
+    @staticmethod
+    def from_state_dict(state_dict: Mapping[str, Any], precision: str = "float32") -> "NumpyActorNet":
+        layers = []
+        gamma, beta = None, None
+        for i, linear_key in enumerate(ACTOR_LINEAR_KEYS):
+            weight = _to_numpy(state_dict[f"{linear_key}.weight"])
+            bias = _to_numpy(state_dict[f"{linear_key}.bias"])
+            if gamma is not None:
+                # W (n * gamma + beta) + b == (W * gamma) n + (W beta + b)
+                bias = bias + weight @ beta
+                weight = weight * gamma[None, :]
+            layers.append(NumpyLinear(weight, bias, precision))
+            if i < len(ACTOR_LAYER_NORM_KEYS):
+                gamma = _to_numpy(state_dict[f"{ACTOR_LAYER_NORM_KEYS[i]}.weight"])
+                beta = _to_numpy(state_dict[f"{ACTOR_LAYER_NORM_KEYS[i]}.bias"])
+        return NumpyActorNet(layers)
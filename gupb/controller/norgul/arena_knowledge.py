@@ -1,15 +1,36 @@
-from gupb.controller.norgul.misc import manhattan_dist
-
 from gupb.model import arenas
 from gupb.model import characters
 from gupb.model import coordinates
+from gupb.model import consumables
+from gupb.model import effects
+from gupb.model import observations
 from gupb.model import tiles
 from gupb.model import weapons
 
-from math import inf
+import numpy as np
+
 from typing import Dict, Set
 
 
+# ------------------------------
+# Arena knowledge - plane codes
+# ------------------------------
+
+# Tile types and effects use the same codes as observation planes
+# - Tile type 0 represents an unseen tile
+TILE_CODES = observations.TILE_TYPE_CODES
+EFFECT_BITS = observations.EFFECT_BITS
+
+# Loot codes, 0 represents no loot
+# - NOTE: Unlike in observations, "bow" is included, since that's how bows are named in arena files
+LOOT_NAMES = ("knife", "sword", "axe", "bow", "bow_unloaded", "bow_loaded", "amulet", "scroll")
+LOOT_CODES = {name: code for code, name in enumerate(LOOT_NAMES, start=1)}
+
+TILE_NAMES = {code: name for name, code in TILE_CODES.items()}
+
+NEVER_SEEN = -1
+
+
 # ---------------------
 # Arena knowledge class
 # ---------------------
@@ -23,100 +44,110 @@ class ArenaKnowledge:
         self.height = 0
 
         # Detailed arena map
-        # - Using a dictionary instead of list allows to disregard arena shape and simplify the code
-        self._arena: dict[coordinates.Coords, tiles.TileDescription] = {}
+        # - Every property of a tile is kept in a separate plane of the arena shape, indexed as plane[x, y]
+        # - This allows whole-map queries (e.g. "is there any mist around?") to be answered with array operations
+        self._allocate()
 
         # Helper structures
-        # - Save most important arena tiles and properties to separate variables/structures to allow for quick search for given type of thing
+        # - Players are few, so their full descriptions are kept in a dictionary (the plane only marks their positions)
         self.obelisk_pos = None
-        self.forest: Set[coordinates.Coords] = set()
-        self.weapons: Dict[coordinates.Coords, weapons.WeaponDescription] = {}
-        self.potions: Set[coordinates.Coords] = set()
         self.players: Dict[coordinates.Coords, characters.ChampionDescription] = {}
+        self.character_ids: Dict[str, int] = {}
         self.any_mist = False
 
+    def _allocate(self) -> None:
+        ''' Creates empty planes for the current arena size '''
+
+        size = (self.width, self.height)
+
+        self.tile_type = np.zeros(size, dtype=np.uint8)
+        self.loot = np.zeros(size, dtype=np.uint8)
+        self.potion = np.zeros(size, dtype=bool)
+        self.effects = np.zeros(size, dtype=np.uint8)
+        self.seen_time = np.full(size, NEVER_SEEN, dtype=np.int32)
+        self.character = np.zeros(size, dtype=np.uint8)
+
     # -------------------------------
     # Arena knowledge - static update
     # -------------------------------
 
     def clear(self) -> None:
         ''' Resets any obtained knowledge '''
-        self._arena.clear()
+
+        self.width = 0
+        self.height = 0
+        self._allocate()
 
         self.obelisk_pos = None
-        self.forest.clear()
-        self.weapons.clear()
-        self.potions.clear()
         self.players.clear()
+        self.character_ids.clear()
         self.any_mist = False
-    
+
     def load(self, arena_path: str) -> None:
         ''' Loads and saves given arena state from a file'''
 
         # Reset previous arena state
         self.clear()
 
-        # Load new state
+        # Read the file first, since planes need to know the arena size
         with open(arena_path, "r", encoding="utf-8") as file:
-            for i, line in enumerate(file):
-                for j, tile in enumerate(line):
-                    if str.isspace(tile):
-                        continue
+            lines = file.readlines()
 
-                    coords = coordinates.Coords(j, i)
-                    tile_type = arenas.TILE_ENCODING[tile] if not str.isalpha(tile) else tiles.Land
-                    tile_name = tile_type.__name__.lower()
-                    weapon_name = arenas.WEAPON_ENCODING[tile].__name__.lower() if str.isalpha(tile) else None
+        for i, line in enumerate(lines):
+            for j, tile in enumerate(line):
+                if not str.isspace(tile):
+                    self.width = j + 1
+            self.height = i + 1
 
-                    self._arena[coords] = tiles.TileDescription(tile_name, weapon_name, None, None, [])  # TODO sieci sie, nie ma byc [] ?
+        self._allocate()
 
-                    # Update helper structures
-                    if tile_name == "forest":
-                        self.forest.add(coords)
-                    
-                    if weapon_name is not None:
-                        self.weapons[coords] = weapons.WeaponDescription(weapon_name)
+        # Load new state
+        for i, line in enumerate(lines):
+            for j, tile in enumerate(line):
+                if str.isspace(tile):
+                    continue
+
+                tile_type = arenas.TILE_ENCODING[tile] if not str.isalpha(tile) else tiles.Land
+                self.tile_type[j, i] = TILE_CODES[tile_type.__name__.lower()]
+
+                if str.isalpha(tile):
+                    self.loot[j, i] = LOOT_CODES[arenas.WEAPON_ENCODING[tile].__name__.lower()]
 
-                    self.width = j + 1
-                
-                self.height = i + 1
-    
     # --------------------------------
     # Arena knowledge - dynamic update
     # --------------------------------
 
-    def update(self, knowledge: characters.ChampionKnowledge) -> None:
+    def update(self, knowledge: characters.ChampionKnowledge, time: int) -> None:
         ''' Performs arena state update based on recently observed tiles'''
 
         for coord, tile_info in knowledge.visible_tiles.items():
-            self._arena[coord] = tile_info
+            self.seen_time[coord] = time
 
             # Tile type
+            self.tile_type[coord] = TILE_CODES[tile_info.type]
             if tile_info.type == "menhir":
                 self.obelisk_pos = coord
-            elif tile_info.type == "forest" and coord not in self.forest:
-                self.forest.add(coord)
 
             # Weapons & potions
-            if tile_info.loot is not None:
-                self.weapons[coord] = tile_info.loot
-            elif coord in self.weapons:
-                self.weapons.pop(coord)
-            
-            if tile_info.consumable is not None:
-                self.potions.add(coord)
-            elif coord in self.potions:
-                self.potions.remove(coord)
-        
+            self.loot[coord] = LOOT_CODES[tile_info.loot.name] if tile_info.loot is not None else 0
+            self.potion[coord] = tile_info.consumable is not None
+
             # Effects
-            if self._arena[coord].effects and ("mist",) in self._arena[coord].effects:
+            bits = 0
+            for effect in tile_info.effects:
+                bits |= EFFECT_BITS[effect.type]
+            self.effects[coord] = bits
+
+            if bits & EFFECT_BITS["mist"]:
                 self.any_mist = True
 
             # Other players
             if tile_info.character is not None:
                 self.players[coord] = tile_info.character
+                self.character[coord] = self.character_ids.setdefault(tile_info.character.controller_name, len(self.character_ids) + 1)
             elif coord in self.players:
                 self.players.pop(coord)
+                self.character[coord] = 0
 
     # --------------------------------
     # Arena knowledge - simple getters
@@ -129,9 +160,9 @@ class ArenaKnowledge:
         ''' Returns true if given tile lies inside the arena bounds, and false otherwise '''
 
         return 0 <= tile[0] < self.width and 0 <= tile[1] < self.height
-    
+
     # Getters - tile info
-    # - NOTE: It's recommended to use this method instead of directly accessing the arena dictionary
+    # - NOTE: Builds a description from the planes, so prefer reading planes directly in time-critical code
     def __getitem__(self, coord: coordinates.Coords) -> tiles.TileDescription | None:
         ''' A safe getter - performs bound checks and returns tile description (or None if tile is unseen).
 
@@ -140,13 +171,41 @@ class ArenaKnowledge:
         # Perform bound checks
         if not self.__contains__(coord):
             raise ValueError(f"Invalid coordinate: {coord}")
-        
+
         # Unseen tile
-        if coord not in self._arena:
+        if self.tile_type[coord] == 0:
             return None
-        
-        return self._arena[coord]
-    
+
+        loot = self.loot[coord]
+        bits = self.effects[coord]
+
+        return tiles.TileDescription(
+            TILE_NAMES[self.tile_type[coord]],
+            weapons.WeaponDescription(LOOT_NAMES[loot - 1]) if loot else None,
+            self.players.get(coord),
+            consumables.ConsumableDescription("potion") if self.potion[coord] else None,
+            [effects.EffectDescription(name) for name, bit in EFFECT_BITS.items() if bits & bit]
+        )
+
+    # Getters - items
+    # - NOTE: Those are built on each call, so save the result when using it multiple times
+    @property
+    def forest(self) -> Set[coordinates.Coords]:
+        return self._coords_where(self.tile_type == TILE_CODES["forest"])
+
+    @property
+    def weapons(self) -> Dict[coordinates.Coords, weapons.WeaponDescription]:
+        xs, ys = np.nonzero(self.loot)
+        return {coordinates.Coords(int(x), int(y)): weapons.WeaponDescription(LOOT_NAMES[self.loot[x, y] - 1]) for x, y in zip(xs, ys)}
+
+    @property
+    def potions(self) -> Set[coordinates.Coords]:
+        return self._coords_where(self.potion)
+
+    @staticmethod
+    def _coords_where(mask: np.ndarray) -> Set[coordinates.Coords]:
+        return {coordinates.Coords(int(x), int(y)) for x, y in zip(*np.nonzero(mask))}
+
     # Getters - adjacent squares
     def adjacent(self, sq_from: coordinates.Coords) -> list[coordinates.Coords]:
         ''' Returns all adjacent squares (which can be accessed in one move from sq_from)'''
@@ -154,7 +213,7 @@ class ArenaKnowledge:
         squares = [sq_from + dir.value for dir in characters.Facing]
 
         return [sq for sq in squares if 0 <= sq[0] < self.height and 0 <= sq[1] < self.width]
-    
+
     # ----------------------------------
     # Arena knowledge - advanced getters
     # ----------------------------------
@@ -163,14 +222,19 @@ class ArenaKnowledge:
     def nearest_forest(self, sq_from: coordinates.Coords) -> coordinates.Coords:
         ''' Returns coordinates of the nearest forest tile (in manhattan metric) NOT OCCUPIED by any player '''
 
-        min_distance = inf
-        nearest_sq = None
+        xs, ys = np.nonzero((self.tile_type == TILE_CODES["forest"]) & (self.character == 0))
+        if len(xs) == 0:
+            return None
+
+        nearest = np.argmin(np.abs(xs - sq_from[0]) + np.abs(ys - sq_from[1]))
+
+        return coordinates.Coords(int(xs[nearest]), int(ys[nearest]))
+
+    # Getters - effects in the neighbourhood
+    def effect_near(self, sq: coordinates.Coords, radius: int, effect: str = "mist") -> bool:
+        ''' Returns true if given effect was seen within a (2 * radius + 1) square centered at sq '''
 
-        for sq in self.forest:
-            distance = manhattan_dist(sq_from, sq)
+        x, y = sq
+        window = self.effects[max(0, x - radius):x + radius + 1, max(0, y - radius):y + radius + 1]
 
-            if self._arena[sq].type == "forest" and self._arena[sq].character is None and distance < min_distance:
-                min_distance = distance
-                nearest_sq = sq
-        
-        return nearest_sq
\ No newline at end of file
+        return bool((window & EFFECT_BITS[effect]).any())
@@ -32,8 +32,8 @@ class Brain:
         # Brain components
         self.navigator = Navigator(self.memory)
         self.motor = MotorCortex(self.memory)
-        self.explorator = Explorator(self.memory)
-        self.collector = Collector(self.memory)
+        self.explorator = Explorator(self.memory, self.navigator)
+        self.collector = Collector(self.memory, self.navigator)
         self.combat = CombatEngine(self.memory, self.navigator, self.motor)
 
         # Hyperparameters
@@ -49,7 +49,8 @@ class Brain:
     def decide(self) -> characters.Action | None:
         target = self.collector.best_pickup()
 
-        if target is None or not self.navigator.find_path(self.memory.pos, target)[1]:
+        # Collector only picks reachable pickups, so there is no need to check the path here
+        if target is None:
             # Try to fight someone
             avoid_mnist = True
             if self.memory.arena.obelisk_pos is not None and max_dist(self.memory.pos, self.memory.arena.obelisk_pos) < 8:
@@ -95,10 +96,4 @@ class Brain:
             return characters.Action.ATTACK
     
     def mist_close(self) -> bool:
-        for i in range(-2, 3):
-            for j in range(-2, 3):
-                tile = coordinates.Coords(self.memory.pos[0] + i, self.memory.pos[1] + j)
-                if tile in self.memory.arena and ("mist",) in self.memory.arena[tile].effects:
-                    return True
-        
-        return False
\ No newline at end of file
+        return self.memory.arena.effect_near(self.memory.pos, 2, "mist")
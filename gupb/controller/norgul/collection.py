@@ -1,11 +1,20 @@
+from gupb.controller.norgul.arena_knowledge import LOOT_NAMES
 from gupb.controller.norgul.memory import Memory
-from gupb.controller.norgul.misc import manhattan_dist
+from gupb.controller.norgul.navigation import Navigator, POTION_COST
 from gupb.controller.norgul.config import WEAPON_VALUES, POTION_VALUE, COLLECTION_BASE_FACTOR, COLLECTION_ENEMY_FACTOR
 
 from gupb.model import characters
 from gupb.model import coordinates
 from gupb.model import weapons
 
+import numpy as np
+
+from math import inf
+
+
+# Values of weapons indexed by loot codes
+LOOT_VALUES = np.array([0.0] + [WEAPON_VALUES[name] for name in LOOT_NAMES])
+
 
 # ---------------
 # Collector class
@@ -15,8 +24,9 @@ from gupb.model import weapons
 # - Picks up good weapons and potions
 class Collector:
 
-    def __init__(self, memory: Memory):
+    def __init__(self, memory: Memory, navigator: Navigator):
         self.memory = memory
+        self.navigator = navigator
     
     # ----------------------------------
     # Collector - search for best pickup
@@ -25,50 +35,59 @@ class Collector:
     def best_pickup(self) -> coordinates.Coords:
         ''' Returns coordinates of best pickup within current knowledge '''
 
-        # For each pickup, we use a probabilistic formula to evaluate it's priority considering character's state
-        max_priority = 0.0
-        best_pickup = None
+        arena = self.memory.arena
+
+        # Candidate pickups with their values
+        # - Consider weapons only if you don't have an axe, and only those we do not lose anything on
+        # - We always consider potions
+        squares = [np.empty((0, 2), dtype=int)]
+        values = [np.empty(0)]
 
-        # Consider weapons only if you don't have an axe
         if self.memory.weapon_name != "axe":
-            curr_weapon_value = WEAPON_VALUES[self.memory.weapon_name]
-
-            for sq, weapon in self.memory.arena.weapons.items():
-                value_gain = WEAPON_VALUES[weapon.name] - curr_weapon_value
-
-                # If we do not gain anything by picking up given weapon, we can skip following calculations
-                if value_gain < 0:
-                    continue
-
-                our_dist = manhattan_dist(self.memory.pos, sq)
-
-                priority = value_gain * COLLECTION_BASE_FACTOR * COLLECTION_ENEMY_FACTOR ** min(50, our_dist - 1)
-
-                # Consider all enemies that are closer to given pickup than our character
-                # - NOTE: This is unefficient, but since there are only 13 players at most, we can get away with that
-                for e_sq, enemy in self.memory.arena.players.items():
-                    enemy_dist = manhattan_dist(e_sq, sq)
-                    if enemy_dist <= our_dist:
-                        priority *= COLLECTION_ENEMY_FACTOR ** min(10, our_dist - enemy_dist + 1)
-                
-                if priority > max_priority:
-                    max_priority = priority
-                    best_pickup = sq
-        
-        # We always consider potions
-        for sq in self.memory.arena.potions:
-            our_dist = manhattan_dist(self.memory.pos, sq)
-
-            priority = POTION_VALUE * COLLECTION_BASE_FACTOR * COLLECTION_ENEMY_FACTOR ** min(50, our_dist - 1)
-
-            # We do the same as for weapons
-            for e_sq, enemy in self.memory.arena.players.items():
-                enemy_dist = manhattan_dist(e_sq, sq)
-                if enemy_dist <= our_dist:
-                    priority *= COLLECTION_ENEMY_FACTOR ** min(10, our_dist - enemy_dist + 1)
-                
-            if priority > max_priority:
-                max_priority = priority
-                best_pickup = sq
-        
-        return best_pickup
+            # Weapons are taken row by row (as listed in arena files), which decides between equally good pickups
+            ys, xs = np.nonzero(arena.loot.T)
+            value_gains = LOOT_VALUES[arena.loot[xs, ys]] - WEAPON_VALUES[self.memory.weapon_name]
+
+            gainful = value_gains >= 0
+            squares.append(np.column_stack((xs[gainful], ys[gainful])))
+            values.append(value_gains[gainful])
+
+        xs, ys = np.nonzero(arena.potion)
+        squares.append(np.column_stack((xs, ys)))
+        values.append(np.full(len(xs), POTION_VALUE))
+
+        squares = np.concatenate(squares)
+        values = np.concatenate(values)
+
+        if len(squares) == 0:
+            return None
+
+        # Only pickups we can reach are considered, and our distance is the cost of the quickest path
+        # - All candidates are scored from the single distance field of this turn
+        # - Entering a potion square costs almost nothing, so that step is added back to keep distances in steps
+        our_dist = self.navigator.distances_from(self.memory.pos)[squares[:, 0], squares[:, 1]]
+        our_dist = our_dist + np.where(arena.potion[squares[:, 0], squares[:, 1]], 1.0 - POTION_COST, 0.0)
+        reachable = our_dist < inf
+        squares, values, our_dist = squares[reachable], values[reachable], our_dist[reachable]
+
+        if len(squares) == 0:
+            return None
+
+        # For each pickup, we use a probabilistic formula to evaluate it's priority considering character's state
+        priority = values * COLLECTION_BASE_FACTOR * COLLECTION_ENEMY_FACTOR ** np.minimum(50, our_dist - 1)
+
+        # Consider all enemies that are closer to given pickup than our character
+        # - Enemies' distances are estimated in manhattan metric
+        # - All pickups are compared with all players at once (there are only 13 players at most)
+        if arena.players:
+            enemies = np.array(list(arena.players.keys()))
+            enemy_dist = np.abs(squares[:, None, :] - enemies[None, :, :]).sum(axis=2)
+            closer = enemy_dist <= our_dist[:, None]
+            exponents = np.where(closer, np.minimum(10, our_dist[:, None] - enemy_dist + 1), 0)
+            priority *= np.prod(COLLECTION_ENEMY_FACTOR ** exponents, axis=1)
+
+        best = np.argmax(priority)
+        if priority[best] <= 0.0:
+            return None
+
+        return coordinates.Coords(int(squares[best][0]), int(squares[best][1]))
@@ -1,7 +1,8 @@
+from gupb.controller.norgul.arena_knowledge import TILE_CODES, LOOT_NAMES, LOOT_CODES
 from gupb.controller.norgul.memory import Memory
 from gupb.controller.norgul.movement import MotorCortex
-from gupb.controller.norgul.navigation import Navigator
-from gupb.controller.norgul.misc import manhattan_dist, max_dist, get_weapon
+from gupb.controller.norgul.navigation import Navigator, IMPASSABLE_CODES
+from gupb.controller.norgul.misc import manhattan_dist, get_weapon
 from gupb.controller.norgul.config import COMBAT_MAX_DIST, WEAPON_VS_WEAPON_CHANCES
 
 from gupb.model import arenas
@@ -9,8 +10,62 @@ from gupb.model import characters
 from gupb.model import coordinates
 from gupb.model import weapons
 
+import numpy as np
+
 from math import inf
-from typing import Set, Tuple
+from typing import Dict, FrozenSet, Set, Tuple
+
+
+# Chances of weapon1 winning against weapon2, indexed by loot codes
+# - NOTE: Use WEAPON_CHANCES[LOOT_CODES[weapon1.name], LOOT_CODES[weapon2.name]]
+WEAPON_CHANCES = np.array([[0.0] * (len(LOOT_NAMES) + 1)] + [
+    [0.0] + [WEAPON_VS_WEAPON_CHANCES[f"{ours}_vs_{theirs}"] for theirs in LOOT_NAMES]
+    for ours in LOOT_NAMES
+])
+
+
+# Weapons attacking along a line of sight
+LINE_WEAPON_NAMES = frozenset(name for name in LOOT_NAMES if isinstance(get_weapon(name), weapons.LineWeapon))
+
+
+# ------------------
+# Attack reach class
+# ------------------
+
+# Squares reached by attacks on a given terrain, for every (weapon, square, facing) combination
+# - Weapon reach depends only on the static terrain, so the table is filled once per arena (lazily, as combinations come up)
+class AttackReach:
+
+    def __init__(self, terrain: arenas.Terrain):
+        self.terrain = terrain
+        self.table: Dict[Tuple[str, coordinates.Coords, characters.Facing], FrozenSet[coordinates.Coords]] = {}
+
+    def __call__(self, weapon_name: str, sq: coordinates.Coords, facing: characters.Facing) -> FrozenSet[coordinates.Coords]:
+        ''' Returns squares attacked with given weapon by a player standing on sq and facing given direction '''
+
+        key = (weapon_name, sq, facing)
+        if key not in self.table:
+            self.table[key] = frozenset(get_weapon(weapon_name).cut_positions(self.terrain, sq, facing))
+
+        return self.table[key]
+
+    def attackers(self, weapon_name: str, target: coordinates.Coords) -> Set[Tuple[coordinates.Coords, characters.Facing]]:
+        ''' Returns all (square, facing) pairs inside the arena from which given weapon reaches the target square '''
+
+        attackers = set()
+
+        for facing in characters.Facing:
+            if weapon_name in LINE_WEAPON_NAMES:
+                # Lines are symmetric: a line from sq reaches the target exactly when a line from the target
+                # in the opposite direction reaches sq (both require only the squares between them to be transparent)
+                candidates = self(weapon_name, target, facing.opposite())
+            else:
+                # Other weapons reach at most 2 squares away in each axis
+                candidates = [target + (dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)]
+
+            attackers.update((sq, facing) for sq in candidates if sq in self.terrain and target in self(weapon_name, sq, facing))
+
+        return attackers
 
 
 # -------------------
@@ -24,7 +79,9 @@ class CombatEngine:
         self.memory = memory
         self.navigator = navigator
         self.motor = motor
-    
+
+        self.reach = AttackReach({})
+
     # -------------------------------------
     # Combat engine - searching for targets
     # -------------------------------------
@@ -32,9 +89,9 @@ class CombatEngine:
     # Tries to find a suitable target for Norgul to kill
     # - Can be customized with additional arguments (for example, whether to attack enemies near mist or not)
     def find_target(self, avoid_mist: bool = True) -> Tuple[coordinates.Coords, float] | None:
-        ''' Returns a tuple of the best target to attack as well as evaluation of chances. 
+        ''' Returns a tuple of the best target to attack as well as evaluation of chances.
 
-            If there are no suitable targets, it returns a single None.
+            If there are no suitable targets, it returns (None, 0.0).
         '''
 
         # For each player, we consider 3 factors:
@@ -42,44 +99,42 @@ class CombatEngine:
         # - HP ratio: our_hp / enemy_hp defines chances of winning the fight
         # - Weapon difference: each weapon vs weapon combination defines a static chance of winning the fight
 
-        best_target = None
-        best_eval = 0.0
-
-        # Iterate over all seen characters
-        for sq, enemy in self.memory.arena.players.items():
-            # Do not consider fighting with yourself ;)
-            if sq == self.memory.pos:
-                continue
-
-            # Check conditions for even considering player as a target
-            # - Omit players hiding in the forest (they are immortal)
-            # - Decide whether to attack players near mist
-            if self.memory.arena[sq].type == "forest":
-                continue
-            
-            nearby = [coordinates.Coords(sq[0] + i, sq[1] + j) for i in range(-1, 2) for j in range(-1, 2)]
-            if avoid_mist and any(tile in self.memory.arena and ("mist",) in self.memory.arena[tile].effects for tile in nearby):
-                continue
-
-            eval = 1.0
-
-            # Consider distance between players
-            dist = manhattan_dist(self.memory.pos, sq)
-            eval *= max(0.01, (COMBAT_MAX_DIST - dist + 1) / COMBAT_MAX_DIST)
-
-            # Consider HP ratio
-            eval *= max(enemy.health / 10, self.memory.hp) / max(self.memory.hp / 10, enemy.health)
-
-            # Consider weapon difference
-            weapon_vs_weapon = f"{self.memory.weapon_name}_vs_{enemy.weapon.name}"
-            eval *= WEAPON_VS_WEAPON_CHANCES[weapon_vs_weapon]
-
-            if eval > best_eval:
-                best_eval = eval
-                best_target = sq
-        
-        return best_target, best_eval
-    
+        # Check conditions for even considering player as a target
+        # - Do not consider fighting with yourself ;)
+        # - Omit players hiding in the forest (they are immortal)
+        # - Decide whether to attack players near mist
+        arena = self.memory.arena
+        targets = [
+            (sq, enemy) for sq, enemy in arena.players.items()
+            if sq != self.memory.pos
+            and arena.tile_type[sq] != TILE_CODES["forest"]
+            and not (avoid_mist and arena.effect_near(sq, 1, "mist"))
+        ]
+
+        if not targets:
+            return None, 0.0
+
+        # Evaluate all targets at once
+        squares = np.array([sq for sq, _ in targets])
+        health = np.array([enemy.health for _, enemy in targets], dtype=float)
+        enemy_weapons = np.array([LOOT_CODES[enemy.weapon.name] for _, enemy in targets])
+
+        # Consider distance between players
+        dist = np.abs(squares - np.array(self.memory.pos)).sum(axis=1)
+        eval = np.maximum(0.01, (COMBAT_MAX_DIST - dist + 1) / COMBAT_MAX_DIST)
+
+        # Consider HP ratio
+        eval *= np.maximum(health / 10, self.memory.hp) / np.maximum(self.memory.hp / 10, health)
+
+        # Consider weapon difference
+        eval *= WEAPON_CHANCES[LOOT_CODES[self.memory.weapon_name], enemy_weapons]
+
+        best = int(np.argmax(eval))
+        if eval[best] <= 0.0:
+            return None, 0.0
+
+        return targets[best][0], float(eval[best])
+
     # ------------------------------
     # Combat engine - combat control
     # ------------------------------
@@ -87,29 +142,34 @@ class CombatEngine:
     # Produces an optimal action in order to defeat given player
     def fight_control(self, enemy_sq: coordinates.Coords,
                       safe_mode: bool = False) -> characters.Action:
-        # Fist of all, let's identify the player we want to attack
-        enemy = self.memory.arena[enemy_sq].character
+        # Attack reach depends on the arena, so start a new table whenever it changes
+        if self.reach.terrain is not self.memory.terrain:
+            self.reach = AttackReach(self.memory.terrain)
 
-        # And obtain some information about us and enemy
-        our_weapon = get_weapon(self.memory.weapon_name)
-        enemy_weapon = get_weapon(enemy.weapon.name)
-        our_attack_area = our_weapon.cut_positions(self.memory.terrain, self.memory.pos, self.memory.dir)
-        enemy_attack_area = enemy_weapon.cut_positions(self.memory.terrain, enemy_sq, enemy.facing)
+        # Fist of all, let's identify the player we want to attack
+        enemy = self.memory.arena.players[enemy_sq]
 
         # Case 1 - we can already attack the enemy
         # - Let's smash him hard...
         # - TODO: Might cancel out "safe" fight strategy in some cases
-        if enemy_sq in our_attack_area:
+        if enemy_sq in self.reach(self.memory.weapon_name, self.memory.pos, self.memory.dir):
             return characters.Action.ATTACK
 
         # Safe spots are square from which we can attack enemy, but he cannot attack us
         # - Only considered if safe_mode flag is set to True
+        # - If there are no safe spots, we just go for the enemy
         target_spots: Set[coordinates.Coords] = set()
 
         if safe_mode:
-            # TODO: Implement that
-            pass
-        else:
+            target_spots = self.safe_spots(enemy_sq, enemy)
+
+            # Case 2 - we are on a safe spot already, but we need to turn towards the enemy
+            if self.memory.pos in target_spots:
+                for facing in characters.Facing:
+                    if enemy_sq in self.reach(self.memory.weapon_name, self.memory.pos, facing):
+                        return self.motor.move(facing)
+
+        if not target_spots:
             target_spots.add(enemy_sq)
 
         # Reach the closest target spot
@@ -118,10 +178,10 @@ class CombatEngine:
 
         for spot in target_spots:
             dist = manhattan_dist(self.memory.pos, spot)
-            if spot in self.memory.arena and self.memory.arena[spot].type not in ["sea", "wall"] and dist < min_dist:
+            if spot in self.memory.arena and self.memory.arena.tile_type[spot] not in IMPASSABLE_CODES and dist < min_dist:
                 min_dist = dist
                 best_spot = spot
-        
+
         # Move towards best spot
         # - If you are close enough to the enemy, you can try quick moves
         # quick = bool(max_dist(self.memory.pos, best_spot) <= 2)
@@ -130,4 +190,30 @@ class CombatEngine:
         next_sq, _ = self.navigator.find_path(self.memory.pos, best_spot)
         action = self.motor.move_to(next_sq, quick=quick)
 
-        return action
\ No newline at end of file
+        return action
+
+    # ------------------------------
+    # Combat engine - safe positions
+    # ------------------------------
+
+    def safe_spots(self, enemy_sq: coordinates.Coords, enemy: characters.ChampionDescription) -> Set[coordinates.Coords]:
+        ''' Returns reachable squares from which we can attack the enemy, but he cannot attack us.
+
+            The enemy can turn in a single action, so squares reached by him in any direction are avoided.
+            If there are no such squares, only his current facing is considered.
+        '''
+
+        our_spots = {sq for sq, _ in self.reach.attackers(self.memory.weapon_name, enemy_sq)}
+
+        arena = self.memory.arena
+        distances = self.navigator.distances_from(self.memory.pos)
+        our_spots = {
+            sq for sq in our_spots
+            if sq in arena and distances[sq] < inf and (not arena.character[sq] or sq == self.memory.pos)
+        }
+
+        enemy_attack_area = set()
+        for facing in characters.Facing:
+            enemy_attack_area |= self.reach(enemy.weapon.name, enemy_sq, facing)
+
+        return (our_spots - enemy_attack_area) or (our_spots - self.reach(enemy.weapon.name, enemy_sq, enemy.facing))
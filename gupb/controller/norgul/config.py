@@ -2,6 +2,8 @@
 # Norgul hyperparameters - exploration
 # ------------------------------------
 
+EXPLORATION_AREA_SIZE = 3
+EXPLORATION_TILES_SEEN_RATIO = 1 / 3
 EXPLORATION_MAX_TIME_DIFF = 50
 EXPLORATION_TIME_FACTOR = 1.3
 EXPLORATION_DISTANCE_FACTOR = 0.5
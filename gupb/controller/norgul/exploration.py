@@ -1,13 +1,16 @@
-from gupb.controller.norgul.exploration_knowledge import ExplorationKnowledge, Area
+from gupb.controller.norgul.exploration_knowledge import ExplorationKnowledge
 from gupb.controller.norgul.memory import Memory
-from gupb.controller.norgul.misc import manhattan_dist
+from gupb.controller.norgul.navigation import Navigator
 from gupb.controller.norgul.config import EXPLORATION_MAX_TIME_DIFF, EXPLORATION_TIME_FACTOR, EXPLORATION_DISTANCE_FACTOR
 
 from gupb.model import arenas
 from gupb.model import characters
 from gupb.model import coordinates
 
+import numpy as np
+
 from collections import namedtuple
+from math import inf
 from typing import Any
 
 
@@ -18,8 +21,9 @@ from typing import Any
 # Represents an exploration module which constantly picks an area to explore
 class Explorator:
 
-    def __init__(self, memory: Memory):
+    def __init__(self, memory: Memory, navigator: Navigator):
         self.memory = memory
+        self.navigator = navigator
         self.explor_knowledge = memory.exploration
 
     # ----------------------------
@@ -30,28 +34,24 @@ class Explorator:
     def pick_area(self) -> coordinates.Coords:
         ''' Returns the center of most appealing area to explor '''
 
-        # Iterate over all unexplored areas and find the most appealing one. Key rules:
+        # Evaluate all areas at once and find the most appealing one. Key rules:
         # - The earlier an area was visited, the greater priority it has (exponential relationship)
         # - The further an area is from the bot, the lower priority it has (exponential relationship)
-        max_priority = 0.0
-        best_area = None
-
-        for area, explor_data in self.explor_knowledge.areas.items():
-            # Calculate time difference since last exploration of an area
-            # - Limit time_diff to prevent overflow
-            time_diff = self.memory.time - explor_data.explor_time
-            time_diff = min(time_diff, EXPLORATION_MAX_TIME_DIFF)
-
-            # Calculate distance between areas
-            # - In this case, distance unit is an area (distance in tiles divided by 3)
-            curr_area = Area(self.memory.pos)
-            dist = max(1, manhattan_dist(curr_area.center, area.center) // 3)
-
-            # Final formula for priority
-            priority = EXPLORATION_TIME_FACTOR ** time_diff * EXPLORATION_DISTANCE_FACTOR ** dist
-
-            if priority > max_priority:
-                max_priority = priority
-                best_area = area
-        
-        return best_area.center if best_area is not None else None
\ No newline at end of file
+        # - Areas that cannot be reached are skipped
+
+        # Calculate time difference since last exploration of an area
+        # - Limit time_diff to prevent overflow
+        time_diff = np.minimum(self.memory.time - self.explor_knowledge.explor_time, EXPLORATION_MAX_TIME_DIFF)
+
+        # Calculate distance to the area
+        # - Cost of the quickest path to any of its tiles, in area units (distance divided by area size)
+        dist = self.explor_knowledge.area_reduce(self.navigator.distances_from(self.memory.pos), inf, np.min)
+        reachable = self.explor_knowledge.valid & (dist < inf)
+        dist = np.maximum(1, np.where(reachable, dist, 0).astype(int) // self.explor_knowledge.area_size)
+
+        # Final formula for priority
+        priority = np.where(reachable, EXPLORATION_TIME_FACTOR ** time_diff * EXPLORATION_DISTANCE_FACTOR ** dist, 0.0)
+
+        best_area = np.unravel_index(np.argmax(priority), priority.shape) if priority.size else None
+
+        return self.explor_knowledge.center(best_area) if best_area is not None and priority[best_area] > 0.0 else None
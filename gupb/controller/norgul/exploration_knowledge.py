@@ -1,119 +1,123 @@
-from gupb.controller.norgul.arena_knowledge import ArenaKnowledge
+from gupb.controller.norgul.arena_knowledge import ArenaKnowledge, TILE_CODES, EFFECT_BITS
+from gupb.controller.norgul.config import EXPLORATION_AREA_SIZE, EXPLORATION_TILES_SEEN_RATIO
 
 from gupb.model import arenas
 from gupb.model import characters
 from gupb.model import coordinates
 
-from dataclasses import dataclass, field
-from typing import Any, Set
-
-
-# --------------------------------------
-# Exploration knowledge - helper defines
-# --------------------------------------
-
-# Area class - represents a (at most) 3x3 area of map
-# - Can be created using any contained tile in init() method
-# - Serves as a hash index for ExplorationKnowledge table
-# - TODO: Refactor to allow different area sizes (instead of hardcoded size = 3)
-class Area:
-
-    def __init__(self, sample_sq: coordinates.Coords):
-        x, y = sample_sq
-
-        # Calculate middle
-        self.center = coordinates.Coords(x - x % 3 + 1, y - y % 3 + 1)
-    
-    def __eq__(self, other: Any) -> bool:
-        if isinstance(other, Area):
-            return self.center == other.center
-        return False
-    
-    def __hash__(self) -> int:
-        return hash(self.center)
-    
-    def __contains__(self, sq: coordinates.Coords) -> bool:
-        return abs(self.center[0] - sq[0]) <= 1 and abs(self.center[1] - sq[1]) <= 1
-
-    # Returns an effective size of the area with respect to arena bounds
-    # - Anti-pattern, but should do the job for now
-    def size(self, arena: ArenaKnowledge) -> int:
-        return max(0, min(3, arena.width - self.center[0] + 1)) * max(0, min(3, arena.height - self.center[1] + 1))
-
-# Area exploration data tuple
-# - explor_time: last time area was explored (at least 4 tiles seen)
-# - tiles_saw: tiles which have been already seen - cleared every time an area is explored
-@dataclass
-class AreaExplorData:
-    explor_time: float
-    tiles_saw: Set
+import numpy as np
 
 
 # ---------------------------
 # Exploration knowledge class
 # ---------------------------
 
-# Exploration dynamic data structures 
+# Exploration dynamic data structures
+# - The arena is split into square areas of EXPLORATION_AREA_SIZE tiles (those at the arena bounds may be cut-off)
+# - Area data is kept in coarse grids indexed as grid[x // size, y // size]
 class ExplorationKnowledge:
 
-    def __init__(self):
-        # Main data container - a dictionary for 3x3 area data
-        self.areas : dict[Area, AreaExplorData] = {}
+    def __init__(self, area_size: int = EXPLORATION_AREA_SIZE):
+        self.area_size = area_size
+        # Number of tiles which have to be seen for an area to count as explored (a fixed part of the area)
+        self.tiles_seen = max(1, round(EXPLORATION_TILES_SEEN_RATIO * area_size ** 2))
+        self.arena: ArenaKnowledge | None = None
+
+        # Main data containers
+        # - valid: areas worth exploring (not cut-off too much, with enough accessible tiles and no mist)
+        # - explor_time: last time area was explored (at least tiles_seen tiles seen)
+        # - tiles_saw: tiles which have been already seen (full resolution) - cleared every time an area is explored
+        self.valid = np.zeros((0, 0), dtype=bool)
+        self.explor_time = np.zeros((0, 0), dtype=np.int32)
+        self.tiles_saw = np.zeros((0, 0), dtype=bool)
 
     # --------------------------------------
     # Exploration knowledge - static loading
     # --------------------------------------
 
+    def clear(self) -> None:
+        ''' Resets any obtained knowledge '''
+
+        self.valid = np.zeros((0, 0), dtype=bool)
+        self.explor_time = np.zeros((0, 0), dtype=np.int32)
+        self.tiles_saw = np.zeros((0, 0), dtype=bool)
+
     def load(self, arena: ArenaKnowledge) -> None:
-        ''' Prepares self.areas dict by inserting all the keys depending on arena size '''
-
-        # Reset previous state
-        self.areas.clear()
-
-        # Initialize counters and sets for every area (except those, which are cut-off and very small)
-        for i in range(0, arena.width, 3):
-            for j in range(0, arena.height, 3):
-                area = Area(coordinates.Coords(i, j))
-
-                accessable_tiles = 0
-                for k in range(3):
-                    for l in range(3):
-                        sq = coordinates.Coords(i + k, j + l)
-                        if sq in arena and arena[sq].type != "wall" and arena[sq].type != "sea":
-                            accessable_tiles += 1
-
-                if area.size(arena) >= 6 and accessable_tiles >= 3:
-                    self.areas[area] = AreaExplorData(0, set())
-    
+        ''' Prepares area grids depending on arena size '''
+
+        self.arena = arena
+
+        # Count accessible tiles and tiles inside the arena bounds for every area
+        accessible = ~np.isin(arena.tile_type, (TILE_CODES["wall"], TILE_CODES["sea"]))
+        accessible_tiles = self.area_sums(accessible)
+        area_tiles = self.area_sums(np.ones(accessible.shape, dtype=bool))
+
+        # Consider every area except those, which are cut-off and very small
+        self.valid = (3 * area_tiles >= 2 * self.area_size ** 2) & (3 * accessible_tiles >= self.area_size ** 2)
+        self.explor_time = np.zeros(self.valid.shape, dtype=np.int32)
+        self.tiles_saw = np.zeros(accessible.shape, dtype=bool)
+
     # ---------------------------------------
     # Exploration knowledge - dynamic loading
     # ---------------------------------------
 
     def update(self, knowledge: characters.ChampionKnowledge, time: int) -> None:
-        ''' Updates area counters based on recently observed tiles'''
+        ''' Updates area counters based on recently observed tiles
 
-        # An extra set to save explored ares and reset their data later, after checking all visible tiles
-        # - Prevents weird behavior which would occur if data was reset inside visible tiles loop
-        explored = set()
+            NOTE: Observed tiles are read from the arena knowledge, so it has to be updated first.
+        '''
 
         # We don't need any extra info about tiles, just the fact that they were observed
-        for coord, tile_info in knowledge.visible_tiles.items():
-            area = Area(coord)
-
-            if ("mist",) in tile_info.effects and area in self.areas:
-                self.areas.pop(area)
-                if area in explored:
-                    explored.remove(area)
-
-            if area in self.areas:
-                if area == Area(knowledge.position):
-                    explored.add(area)
-                else:
-                    self.areas[area].tiles_saw.add(coord)
-                    if len(self.areas[area].tiles_saw) >= 3:    # TODO: use the appropriate hyperparameter from config file
-                        explored.add(area)
-        
+        visible = self.arena.seen_time == time
+        misty = visible & (self.arena.effects & EFFECT_BITS["mist"] > 0)
+
+        # Areas covered by mist are no longer worth exploring
+        self.valid &= ~(self.area_sums(misty) > 0)
+
+        # An area is explored once enough of its tiles are seen, or when we stand in it
+        self.tiles_saw |= visible
+        explored = self.area_sums(self.tiles_saw) >= self.tiles_seen
+        explored[self.area_of(knowledge.position)] = True
+        explored &= self.valid
+
         # Now we can safely update data for the explored areas
-        for area in explored:
-            self.areas[area].explor_time = time
-            self.areas[area].tiles_saw.clear()
+        self.explor_time[explored] = time
+        self.tiles_saw &= ~self.to_tiles(explored)
+
+    # --------------------------------
+    # Exploration knowledge - helpers
+    # --------------------------------
+
+    def area_of(self, sq: coordinates.Coords) -> tuple[int, int]:
+        ''' Returns the index of the area containing given tile '''
+
+        return sq[0] // self.area_size, sq[1] // self.area_size
+
+    def center(self, area: tuple[int, int]) -> coordinates.Coords:
+        ''' Returns the middle tile of given area (kept inside the arena bounds) '''
+
+        x = min(area[0] * self.area_size + self.area_size // 2, self.arena.width - 1)
+        y = min(area[1] * self.area_size + self.area_size // 2, self.arena.height - 1)
+
+        return coordinates.Coords(x, y)
+
+    def area_reduce(self, plane: np.ndarray, fill, reduction) -> np.ndarray:
+        ''' Reduces a full resolution plane into the area grid, filling cut-off areas with the given value '''
+
+        width, height = plane.shape
+        size = self.area_size
+
+        padded = np.full((-(-width // size) * size, -(-height // size) * size), fill, dtype=plane.dtype)
+        padded[:width, :height] = plane
+
+        return reduction(padded.reshape(padded.shape[0] // size, size, padded.shape[1] // size, size), axis=(1, 3))
+
+    def area_sums(self, plane: np.ndarray) -> np.ndarray:
+        return self.area_reduce(plane.astype(np.int32), 0, np.sum)
+
+    def to_tiles(self, area_plane: np.ndarray) -> np.ndarray:
+        ''' Expands an area grid into a full resolution plane '''
+
+        tiles = np.repeat(np.repeat(area_plane, self.area_size, axis=0), self.area_size, axis=1)
+
+        return tiles[:self.tiles_saw.shape[0], :self.tiles_saw.shape[1]]
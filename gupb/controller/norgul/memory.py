@@ -42,7 +42,7 @@ class Memory:
         self.weapon_name = "knife"
 
         self.arena.clear()
-        self.exploration.areas.clear()
+        self.exploration.clear()
 
         self.time = 0
         self.terrain = {}
@@ -60,5 +60,5 @@ class Memory:
         self.hp = knowledge.visible_tiles[self.pos].character.health
         self.weapon_name = knowledge.visible_tiles[self.pos].character.weapon.name
 
-        self.arena.update(knowledge)
+        self.arena.update(knowledge, self.time)
         self.exploration.update(knowledge, self.time)
\ No newline at end of file
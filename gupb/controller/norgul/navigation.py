@@ -1,14 +1,23 @@
+from gupb.controller.norgul.arena_knowledge import TILE_CODES, LOOT_NAMES, EFFECT_BITS
 from gupb.controller.norgul.memory import Memory
-from gupb.controller.norgul.misc import manhattan_dist
+from gupb.controller.norgul.planning import PathPlanner
 from gupb.controller.norgul.config import WEAPON_VALUES
 
 from gupb.model import coordinates
 
 import heapq
 
-from collections import defaultdict
+import numpy as np
+
 from math import inf
-from typing import Tuple
+from typing import Dict, Tuple
+
+
+IMPASSABLE_CODES = (TILE_CODES["sea"], TILE_CODES["wall"])
+
+# Potions are almost free to walk through
+# - Every square has to cost something to enter, otherwise path planners may stop before reaching the start
+POTION_COST = 0.01
 
 
 # ---------------
@@ -21,134 +30,239 @@ class Navigator:
     def __init__(self, memory: Memory):
         self.memory = memory
         self.arena = memory.arena
-    
+
+        # Cost of entering each square, indexed as costs[x, y]
+        # - Only squares seen since the last refresh are recalculated (everything is recalculated when the weapon changes)
+        self.costs = np.zeros((0, 0))
+        self.costs_time = 0
+        self.costs_weapon = None
+
+        # The same costs as a flat list shared with path planners
+        # - Squares are flat indices of the arena padded with impassable squares, so that neighbours are fixed offsets
+        self.row = 0
+        self.steps: Tuple[int, ...] = ()
+        self.flat_costs: list[float] = []
+        self.inside: list[bool] = []
+
+        # Incremental searches towards find_path targets, kept between turns as long as the target is being queried
+        # - Questions about many squares at once are answered by the distance field instead
+        self.planners: Dict[coordinates.Coords, PathPlanner] = {}
+        self.planners_used: Dict[coordinates.Coords, int] = {}
+
+        # Distance field from a single source, reused by all queries in a given turn
+        self.field_key = None
+        self.distances: list[float] = []
+        self.previous: list[int] = []
+        self.reachable = None
+        self.reachable_distances = None
+        self.distance_grid = None
+
     # ------------------------
     # Navigator - path finding
     # ------------------------
 
-    # Djikstra algorithm
-    # - NOTE: Uses A* extension for speed-up
     def find_path(self, sq_from: coordinates.Coords, sq_to: coordinates.Coords) -> Tuple[coordinates.Coords, bool]:
         '''
-            Performs Djikstra algorithm to find the best (defined by connection weights) path from sq_from to sq_to.
+            Finds the best (defined by connection weights) path from sq_from to sq_to.
 
             Returns next square on the quickest path from sq_from to sq_to.
             Alternatively, if sq_to is unreachable, returns next square on the quickest path to square that is closest to sq_to (and False as 2nd).
         '''
 
         if sq_from == sq_to:
-            return sq_to
+            return sq_to, True
 
-        # Initialize distances to each square
-        distances = defaultdict(lambda: inf)
-        distances[sq_from] = 0
+        next_sq = self._planner(sq_to).next_step(self._index(sq_from))
+        if next_sq is not None:
+            return self._coords(next_sq), True
 
-        # Priority queue representation
-        # - First value is a distance to given square
-        heap = []
-        heapq.heappush(heap, (0, sq_from))
+        # No path from sq_from to sq_to
+        # - In this case we want to return a path to square which is as close to sq_to as possible
+        self._update_field(sq_from)
 
-        # Save previously searched squares to reconstruct the best path
-        previous = defaultdict(lambda: None)
-        closest_alternative = None
-        closest_dist = inf
+        source = self._index(sq_from)
+        current = self._closest_reachable(sq_to)
+        if current == source:
+            return sq_from, False
 
-        visited = set()
+        while self.previous[current] != source:
+            current = self.previous[current]
 
-        while heap:
-            dist, sq = heapq.heappop(heap)
+        return self._coords(current), False
 
-            if sq in visited:
-                continue
+    def distances_from(self, sq_from: coordinates.Coords) -> np.ndarray:
+        ''' Returns costs of the quickest paths from sq_from to every square (infinity for unreachable ones), indexed as [x, y] '''
+
+        self._update_field(sq_from)
+
+        if self.distance_grid is None:
+            self.distance_grid = np.array(self.distances).reshape(-1, self.row)[1:-1, 1:-1].T
+
+        return self.distance_grid
+
+    def _index(self, sq: coordinates.Coords) -> int:
+        return (sq[1] + 1) * self.row + sq[0] + 1
+
+    def _coords(self, index: int) -> coordinates.Coords:
+        y, x = divmod(index, self.row)
+        return coordinates.Coords(x - 1, y - 1)
+
+    # -------------------------
+    # Navigator - path planners
+    # -------------------------
+
+    # Planners are searching backwards from their targets, so they stay valid while Norgul is moving
+    # - Only squares whose costs changed are repaired on the following turns
+    def _planner(self, sq_to: coordinates.Coords) -> PathPlanner:
+        ''' Returns the incremental search towards sq_to, starting a new one if needed '''
+
+        self._update_costs()
+
+        if sq_to not in self.planners:
+            self.planners[sq_to] = PathPlanner(self.flat_costs, self.inside, self.steps, self._index(sq_to))
+        self.planners_used[sq_to] = self.memory.time
+
+        return self.planners[sq_to]
+
+    # --------------------------
+    # Navigator - distance field
+    # --------------------------
+
+    # Djikstra algorithm over the whole map
+    # - Computed at most once per turn for a given source
+    def _update_field(self, sq_from: coordinates.Coords) -> None:
+        ''' Calculates distances and previous squares on the quickest paths from sq_from to every square '''
+
+        self._update_costs()
+
+        if self.field_key == (self.memory.time, sq_from):
+            return
 
-            if sq == sq_to:
-                break
+        self.field_key = (self.memory.time, sq_from)
+        self.reachable = None
+        self.distance_grid = None
 
-            for neighbor in self.arena.adjacent(sq):
-                cost = self._connection_cost(sq, neighbor)
+        costs = self.flat_costs
 
-                new_dist = dist + cost
+        distances = [inf] * len(costs)
+        previous = [-1] * len(costs)
+
+        source = self._index(sq_from)
+        distances[source] = 0.0
+        heap = [(0.0, source)]
+
+        while heap:
+            dist, sq = heapq.heappop(heap)
+            if dist > distances[sq]:
+                continue
+
+            for step in self.steps:
+                neighbor = sq + step
+                new_dist = dist + costs[neighbor]
                 if new_dist < distances[neighbor]:
                     distances[neighbor] = new_dist
                     previous[neighbor] = sq
+                    heapq.heappush(heap, (new_dist, neighbor))
 
-                    # Add heuristic distance estimation (A*)
-                    heapq.heappush(heap, (new_dist + manhattan_dist(neighbor, sq_to), neighbor))
-            
-            # Update closest alternative path
-            # - Manhattan metric
-            metric_value = manhattan_dist(sq, sq_to)
-            if dist < inf and metric_value < closest_dist:
-                closest_alternative = sq
-                closest_dist = metric_value
-            
-            visited.add(sq)
+        self.distances = distances
+        self.previous = previous
 
-        # Reconstruct the path
-        current_sq = sq_to
+    def _closest_reachable(self, sq_to: coordinates.Coords) -> int:
+        ''' Returns the reachable square closest to sq_to (in manhattan metric), preferring the quicker to reach ones '''
 
-        can_achieve_to = True
+        if self.reachable is None:
+            distances = np.array(self.distances)
+            self.reachable = np.flatnonzero(distances < inf)
+            self.reachable_distances = distances[self.reachable]
+
+        ys, xs = np.divmod(self.reachable, self.row)
+        metric_values = np.abs(xs - 1 - sq_to[0]) + np.abs(ys - 1 - sq_to[1])
+
+        return int(self.reachable[np.lexsort((self.reachable_distances, metric_values))[0]])
 
-        # No path from sq_from to sq_to
-        # - In this case we want to return a path to square which is as close to sq_to as possible
-        if previous[current_sq] is None:
-            current_sq = closest_alternative
-            can_achieve_to = False
-            if closest_alternative == sq_from:
-                return sq_from, False
-   
-        while previous[current_sq] != sq_from:
-            current_sq = previous[current_sq]
-        
-        return current_sq, can_achieve_to
-    
     # --------------------------------------
     # Navigator - connection cost estimation
     # --------------------------------------
-    
-    def _connection_cost(self, sq_from: coordinates.Coords, sq_to: coordinates.Coords) -> float:
-        ''' Calculates and returns heuristic cost of moving from square sq_from to square sq_to.
-        
-            In other words, it returns a weight of an edge between sq_from and sq_to or 
-            infinity if sq_from and sq_to are not directly connected.
+
+    def _update_costs(self) -> None:
+        ''' Recalculates the cost of entering squares which changed since the last update (at most once per turn) '''
+
+        if self.costs_time == self.memory.time:
+            return
+
+        if self.costs.shape != self.arena.tile_type.shape or self.memory.time < self.costs_time:
+            # New arena or new game
+            self._reset_costs()
+            return
+
+        if self.memory.weapon_name != self.costs_weapon:
+            # New weapon
+            self.costs_weapon = self.memory.weapon_name
+            changed = np.ones(self.costs.shape, dtype=bool)
+        else:
+            changed = self.arena.seen_time > self.costs_time
+
+        self.costs[changed] = self._square_costs(changed)
+        self.costs_time = self.memory.time
+
+        # Forget planners which were not used in the previous turn
+        for sq_to in [sq_to for sq_to, time in self.planners_used.items() if time < self.memory.time - 1]:
+            self.planners.pop(sq_to)
+            self.planners_used.pop(sq_to)
+
+        # Pass squares whose costs actually changed to the remaining planners
+        padded = np.pad(self.costs.T, 1, constant_values=inf).ravel()
+        for sq in np.flatnonzero(padded != np.array(self.flat_costs)).tolist():
+            old_cost, self.flat_costs[sq] = self.flat_costs[sq], float(padded[sq])
+            for planner in self.planners.values():
+                planner.update_cost(sq, old_cost)
+
+    def _reset_costs(self) -> None:
+        ''' Calculates costs of all squares from scratch and drops all the planners '''
+
+        self.costs = np.zeros(self.arena.tile_type.shape)
+        self.costs_weapon = self.memory.weapon_name
+        self.costs[...] = self._square_costs(np.ones(self.costs.shape, dtype=bool)).reshape(self.costs.shape)
+        self.costs_time = self.memory.time
+
+        self.row = self.arena.width + 2
+        self.steps = (-self.row, 1, self.row, -1)
+        self.flat_costs = np.pad(self.costs.T, 1, constant_values=inf).ravel().tolist()
+        self.inside = np.pad(np.ones(self.costs.T.shape, dtype=bool), 1).ravel().tolist()
+
+        self.planners.clear()
+        self.planners_used.clear()
+        self.field_key = None
+
+    def _square_costs(self, squares: np.ndarray) -> np.ndarray:
+        ''' Calculates and returns heuristic costs of entering squares selected by a mask.
+
+            In other words, it returns weights of edges leading to those squares or
+            infinity for squares which cannot be entered.
         '''
 
-        if sq_from == sq_to:
-            return 0.0
-        
-        # Squares not connected
-        if abs(sq_from[0] - sq_to[0]) + abs(sq_from[1] - sq_to[1]) != 1:
-            return inf
-        
-        # Stone or sea on target square
-        if self.arena[sq_to].type in ["sea", "wall"]:
-            return inf
-        
-        # Forest occupied by other (immortal) player
-        if self.arena[sq_to].type == "forest" and self.arena[sq_to].character is not None:
-            return inf
-        
-        cost = 1.0
-
-        # Some other character blocking the pass
-        # if self.arena[sq_to].character is not None:
-        #     cost += 3.0
-        
+        tile_type = self.arena.tile_type[squares]
+        loot = self.arena.loot[squares]
+        effects = self.arena.effects[squares]
+
         # Weapons
-        if sq_to in self.arena.weapons:
-            if self.arena.weapons[sq_to].name in ["scroll", "amulet"]:
-                cost += 100.0
-            else:
-                cost += max(0, WEAPON_VALUES[self.memory.weapon_name] - WEAPON_VALUES[self.arena.weapons[sq_to].name])
-        
+        # - Scrolls and amulets are avoided, other weapons cost as much as we would lose by picking them up
+        loot_costs = np.array([0.0] + [
+            100.0 if name in ["scroll", "amulet"] else max(0, WEAPON_VALUES[self.memory.weapon_name] - WEAPON_VALUES[name])
+            for name in LOOT_NAMES
+        ])
+        costs = 1.0 + loot_costs[loot]
+
         # Potions
-        if self.arena[sq_to].consumable is not None and self.arena[sq_to].consumable == "potion":
-            cost = 0.0
+        costs[self.arena.potion[squares]] = POTION_COST
 
         # Penalize walking through mist or fire
-        if self.arena[sq_to].effects and ("mist",) in self.arena[sq_to].effects:
-            cost += 10.0
-        if self.arena[sq_to].effects and ("fire",) in self.arena[sq_to].effects:
-            cost += 50.0
+        costs += np.where(effects & EFFECT_BITS["mist"], 10.0, 0.0)
+        costs += np.where(effects & EFFECT_BITS["fire"], 50.0, 0.0)
+
+        # Stone or sea
+        # - Forest occupied by other (immortal) player is also impassable
+        costs[np.isin(tile_type, IMPASSABLE_CODES)] = inf
+        costs[(tile_type == TILE_CODES["forest"]) & (self.arena.character[squares] > 0)] = inf
 
-        return cost
\ No newline at end of file
+        return costs
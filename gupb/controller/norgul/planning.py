@@ -0,0 +1,121 @@
+import heapq
+
+from math import inf
+
+
+# ------------------
+# Path planner class
+# ------------------
+
+# Incremental search of the quickest paths to a single target square
+# - It's Lifelong Planning A* run backwards from the target, so that it stays valid when the start square changes
+# - No heuristic is used, since entering a square may cost almost nothing (potions), so it works like a resumable Djikstra algorithm
+# - Squares are flat indices of a padded grid shared with the Navigator, where costs[sq] is the cost of entering sq
+# - NOTE: Costs have to be positive, squares costing nothing could leave outdated distances behind
+class PathPlanner:
+
+    def __init__(self, costs: list[float], inside: list[bool], steps: tuple[int, ...], target: int):
+        self.costs = costs
+        self.inside = inside
+        self.steps = steps
+        self.target = target
+
+        # g - settled distance to the target, rhs - one step lookahead distance
+        self.g = [inf] * len(costs)
+        self.rhs = [inf] * len(costs)
+        self.rhs[target] = 0.0
+
+        # Priority queue with lazy deletion
+        # - Entries whose key differs from the one saved in self.keys are outdated
+        self.heap = [(0.0, target)]
+        self.keys = {target: 0.0}
+
+    # ---------------------
+    # Path planner - queries
+    # ---------------------
+
+    def distance(self, start: int) -> float:
+        ''' Returns the cost of the quickest path from start to the target (infinity if it's unreachable) '''
+
+        self._search(start)
+
+        return self.g[start]
+
+    def next_step(self, start: int) -> int | None:
+        ''' Returns the square to enter from start on the quickest path to the target (or None if there is none) '''
+
+        if start == self.target or self.distance(start) == inf:
+            return None
+
+        return min((self.costs[start + step] + self.g[start + step], start + step) for step in self.steps)[1]
+
+    # -----------------------------
+    # Path planner - cost changes
+    # -----------------------------
+
+    def update_cost(self, sq: int, old_cost: float) -> None:
+        ''' Repairs the lookahead distances of squares leading to sq after the cost of entering it has changed '''
+
+        new_cost = self.costs[sq]
+
+        for step in self.steps:
+            predecessor = sq + step
+            if predecessor == self.target or not self.inside[predecessor]:
+                continue
+
+            if new_cost < old_cost:
+                self.rhs[predecessor] = min(self.rhs[predecessor], new_cost + self.g[sq])
+            elif self.rhs[predecessor] == old_cost + self.g[sq]:
+                self.rhs[predecessor] = self._lookahead(predecessor)
+
+            self._update(predecessor)
+
+    # ----------------------------
+    # Path planner - search itself
+    # ----------------------------
+
+    def _lookahead(self, sq: int) -> float:
+        return min(self.costs[sq + step] + self.g[sq + step] for step in self.steps)
+
+    def _update(self, sq: int) -> None:
+        if self.g[sq] != self.rhs[sq]:
+            key = min(self.g[sq], self.rhs[sq])
+            self.keys[sq] = key
+            heapq.heappush(self.heap, (key, sq))
+        else:
+            self.keys.pop(sq, None)
+
+    def _search(self, start: int) -> None:
+        ''' Settles squares until the distance from start is known '''
+
+        while self.heap:
+            key, sq = self.heap[0]
+
+            if self.keys.get(sq) != key:
+                heapq.heappop(self.heap)
+                continue
+
+            # Squares with the same key as the start may still change its distance, so they are processed too
+            if key > min(self.g[start], self.rhs[start]) and self.rhs[start] == self.g[start]:
+                break
+
+            heapq.heappop(self.heap)
+            del self.keys[sq]
+
+            if self.g[sq] > self.rhs[sq]:
+                # Distance decreased (or was settled for the first time)
+                self.g[sq] = self.rhs[sq]
+                for step in self.steps:
+                    predecessor = sq + step
+                    if predecessor != self.target and self.inside[predecessor]:
+                        self.rhs[predecessor] = min(self.rhs[predecessor], self.costs[sq] + self.g[sq])
+                        self._update(predecessor)
+            else:
+                # Distance increased, so squares that relied on it have to be reconsidered
+                old_g, self.g[sq] = self.g[sq], inf
+                for predecessor in (sq, *(sq + step for step in self.steps)):
+                    if predecessor == self.target or not self.inside[predecessor]:
+                        continue
+                    if predecessor == sq or self.rhs[predecessor] == self.costs[sq] + old_g:
+                        self.rhs[predecessor] = self._lookahead(predecessor)
+                    self._update(predecessor)
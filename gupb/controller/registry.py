@@ -0,0 +1,60 @@
+from __future__ import annotations
+from functools import lru_cache
+import importlib
+from typing import Any, NamedTuple, Union
+
+from gupb import controller
+
+
+class ControllerEntry(NamedTuple):
+    """
+    Describes how to create a controller without importing its module.
+
+    The name is only metadata and has to match the name reported by the created controller.
+    """
+    name: str
+    module: str
+    factory: str
+    args: tuple[Any, ...] = ()
+
+    def load(self) -> controller.Controller:
+        return _load(self)
+
+
+@lru_cache(maxsize=None)
+def _load(entry: ControllerEntry) -> controller.Controller:
+    module = importlib.import_module(entry.module)
+    return getattr(module, entry.factory)(*entry.args)
+
+
+def resolve(controller_or_entry: Union[controller.Controller, ControllerEntry]) -> controller.Controller:
+    if isinstance(controller_or_entry, ControllerEntry):
+        return controller_or_entry.load()
+    return controller_or_entry
+
+
+CONTROLLERS: list[ControllerEntry] = [
+    ControllerEntry("RandomControllerAlice", "gupb.controller.random", "RandomController", ("Alice",)),
+    ControllerEntry("RandomControllerBob", "gupb.controller.random", "RandomController", ("Bob",)),
+    ControllerEntry("RandomControllerCecilia", "gupb.controller.random", "RandomController", ("Cecilia",)),
+    ControllerEntry("RandomControllerDarius", "gupb.controller.random", "RandomController", ("Darius",)),
+    ControllerEntry("KeyboardController", "gupb.controller.keyboard", "KeyboardController"),
+    ControllerEntry("BUPG Minion", "gupb.controller.bupg.bupg", "BUPGController", ("Minion",)),
+    ControllerEntry("CamperBotV2", "gupb.controller.camperbot.camperbot", "CamperBotController", ("V2",)),
+    ControllerEntry("G.A.R.E.K. The Great", "gupb.controller.garek", "GarekController", ("The Great",)),
+    ControllerEntry("G.A.R.E.K. Exterminator", "gupb.controller.garek", "GarekController", ("Exterminator",)),
+    ControllerEntry("G.A.R.E.K. The Conqueror", "gupb.controller.garek", "GarekController", ("The Conqueror",)),
+    ControllerEntry(
+        "Keramzytowy Mocarz Hudoka", "gupb.controller.Keramzytowy_mocarz", "Keramzytowy_mocarz", ("Hudoka",)
+    ),
+    ControllerEntry("Kim Dzong Neat v_1", "gupb.controller.neat.kim_dzong_neat_jr", "KimDzongNeatJuniorController"),
+    ControllerEntry("Kim Dzong Neat v_2", "gupb.controller.neat.kim_dzong_neat_mid", "KimDzongNeatMidController"),
+    ControllerEntry("Kirby", "gupb.controller.kirby", "KirbyController", ("Kirby",)),
+    ControllerEntry("Norgul", "gupb.controller.norgul.norgul", "NorgulController", ("Norgul",)),
+    ControllerEntry("PiratPirat", "gupb.controller.pirat.pirat", "PiratController", ("Pirat",)),
+    ControllerEntry(
+        "ReinforcedRogueControllerRogue", "gupb.controller.reinforced_rogue", "ReinforcedRogueController", ("Rogue",)
+    ),
+    ControllerEntry("Roomba", "gupb.controller.roomba", "RoombaController", ("Roomba",)),
+    ControllerEntry("RustlerRustler", "gupb.controller.rustler", "Rustler", ("Rustler",)),
+]
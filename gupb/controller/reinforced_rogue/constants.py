@@ -1,3 +1,5 @@
+import os
+
 from gupb.model import effects
 from gupb.model import weapons
 from gupb.model import characters
@@ -56,6 +58,8 @@ EPSILON = 0.4
 GAMMA = 0.5
 ENEMY_CLEANUP_TIME = 4
 
+LANDMARKS_CACHE_DIRECTORY = os.path.join(".cache", "reinforced_rogue")
+
 LANDMARKS = {
     "archipelago": {
         coordinates.Coords(x=6, y=17),
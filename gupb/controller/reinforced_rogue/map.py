@@ -1,9 +1,14 @@
+import os
+import json
+import hashlib
 import logging
 
 from math import inf
-from typing import Optional
+from typing import Callable, Iterable, Optional
 from queue import PriorityQueue
-from collections import defaultdict
+from collections import defaultdict, deque
+
+import numpy as np
 
 from gupb.model import tiles
 from gupb.model import arenas
@@ -17,12 +22,22 @@ from .utils import manhattan_dist
 
 logger = logging.getLogger("verbose")
 
+# Number of set bits in every byte value, for counting tiles in packed bitsets
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
 
 class Map:
     def __init__(self, arena_description: arenas.ArenaDescription):
         self._arena = arenas.Arena.load(name := arena_description.name)
         self._enemy_coords: dict[str, coordinates.Coords] = {}
 
+        # Distance fields are kept on the arena padded with impassable tiles and flattened,
+        # so that neighbours are fixed index offsets; they are valid until the next update.
+        self._row: int = self._arena.size[1] + 2
+        self._terrain_passable: list[bool] = [False] * ((self._arena.size[0] + 2) * self._row)
+        self._passable: Optional[list[bool]] = None
+        self._distance_fields: dict[tuple, list[float]] = {}
+
         self.menhir: Optional[coordinates.Coords] = None
         self.landmarks_visited: dict[coordinates.Coords, bool] = {}
 
@@ -49,12 +64,16 @@ class Map:
                 self.weapons[position] = weapon.description()
             if consumable := tile.consumable:
                 self.consumables[position] = consumable.description()
+            self._terrain_passable[self._index(position)] = tile.passable
 
     def update(
         self,
         position: coordinates.Coords,
         visible_tiles: dict[coordinates.Coords, tiles.TileDescription],
     ) -> None:
+        self._passable = None
+        self._distance_fields.clear()
+
         self._update_menhir(visible_tiles)
         self._update_landmarks(position)
         self._update_loot(visible_tiles)
@@ -71,7 +90,11 @@ class Map:
 
     def _update_landmarks(self, position: coordinates.Coords) -> None:
         for landmark, visited in self.landmarks_visited.copy().items():
-            if not visited and self.dist(position, landmark) <= LANDMARK_RADIUS:
+            if (
+                not visited
+                and manhattan_dist(position, landmark) <= LANDMARK_RADIUS
+                and self.dist(position, landmark) <= LANDMARK_RADIUS
+            ):
                 self.landmarks_visited[landmark] = True
             if effects.EffectDescription("mist") in self.tiles[landmark].effects:
                 del self.landmarks_visited[landmark]
@@ -129,28 +152,52 @@ class Map:
             self.tiles[coords] = tile
 
     def _compute_landmarks(self, max_landmarks: int = 8) -> list[coordinates.Coords]:
+        cache_path = self._landmarks_cache_path(max_landmarks)
+        if os.path.exists(cache_path):
+            with open(cache_path) as file:
+                return [coordinates.Coords(*landmark) for landmark in json.load(file)]
+
         terrain = self._arena.terrain
-        not_seen = set(terrain)
+        cells = {coords: i for i, coords in enumerate(terrain)}
+        candidates = [coords for coords in terrain if terrain[coords].passable]
+
+        # Row i is a bitset of the tiles seen from candidates[i] when looking around with a knife,
+        # packed 8 tiles per byte along the tile axis
+        visibility = np.zeros((len(candidates), (len(cells) + 7) // 8), dtype=np.uint8)
+        seen = np.zeros(len(cells), dtype=bool)
+        for i, candidate in enumerate(candidates):
+            seen[:] = False
+            for facing in characters.Facing:
+                for coords in self.get_visible_coords(candidate, facing, weapons.Knife().description()):
+                    if coords in cells:
+                        seen[cells[coords]] = True
+            visibility[i] = np.packbits(seen)
+
+        # Greedy cover, taking the first of equally good candidates and stopping when nothing new is seen
+        not_seen = np.packbits(np.ones(len(cells), dtype=bool))
         landmarks = []
         for _ in range(max_landmarks):
-            if len(not_seen) == 0:
+            gains = POPCOUNT[visibility & not_seen].sum(axis=1, dtype=np.int64)
+            best = int(np.argmax(gains))
+            if gains[best] == 0:
                 break
+            not_seen &= ~visibility[best]
+            landmarks.append(candidates[best])
+
+        try:
+            os.makedirs(LANDMARKS_CACHE_DIRECTORY, exist_ok=True)
+            with open(cache_path, "w") as file:
+                json.dump([list(landmark) for landmark in landmarks], file)
+        except OSError:
+            pass  # the landmarks are only recomputed in the next process
 
-            best_landmark, best_visible = None, set()
-            for landmark in terrain:
-                if terrain[landmark].passable:
-                    visible = set()
-                    for facing in characters.Facing:
-                        visible |= self.get_visible_coords(landmark, facing, weapons.Knife().description())
-
-                    if len(not_seen & visible) > len(not_seen & best_visible):
-                        best_landmark = landmark
-                        best_visible = visible
-            not_seen -= best_visible
-            landmarks.append(best_landmark)
-            
         return landmarks
 
+    def _landmarks_cache_path(self, max_landmarks: int) -> str:
+        tile_types = sorted((coords, tile.description().type) for coords, tile in self._arena.terrain.items())
+        layout_hash = hashlib.sha1(repr((max_landmarks, tile_types)).encode()).hexdigest()
+        return os.path.join(LANDMARKS_CACHE_DIRECTORY, f"{self._arena.name}__{layout_hash[:16]}.json")
+
     def get_enemies(self) -> dict[coordinates.Coords, characters.ChampionDescription]:
         return {
             coords: self.tiles[coords].character
@@ -199,48 +246,97 @@ class Map:
 
         return g_score[t]
 
+    def _index(self, position: coordinates.Coords) -> int:
+        return (position[0] + 1) * self._row + position[1] + 1
+
+    def _passable_cells(self) -> list[bool]:
+        if self._passable is None:
+            self._passable = self._terrain_passable.copy()
+            for coords in self._enemy_coords.values():
+                if self.tiles[coords].character:
+                    self._passable[self._index(coords)] = False
+        return self._passable
+
+    def distance_field(self, targets: Iterable[coordinates.Coords]) -> list[float]:
+        """
+        Distances from every tile to the nearest target, indexed like `_index`, found with a single BFS.
+        As in `dist`, paths pass through passable tiles only, but may start and end anywhere.
+        """
+        passable = self._passable_cells()
+        distances = [inf] * len(passable)
+        queue = deque()
+        for target in targets:
+            index = self._index(target)
+            if distances[index] == inf:
+                distances[index] = 0
+                queue.append(index)
+
+        while queue:
+            index = queue.popleft()
+            if distances[index] > 0 and not passable[index]:
+                continue
+            for neighbor in (index + self._row, index - self._row, index + 1, index - 1):
+                if distances[neighbor] == inf and (passable[index] or passable[neighbor]):
+                    distances[neighbor] = distances[index] + 1
+                    queue.append(neighbor)
+
+        return distances
+
+    def _min_dist(
+        self,
+        key: tuple,
+        targets: Callable[[], Iterable[coordinates.Coords]],
+        position: coordinates.Coords,
+    ) -> int:
+        if key not in self._distance_fields:
+            self._distance_fields[key] = self.distance_field(targets())
+        return self._distance_fields[key][self._index(position)]
+
     def get_min_dist_menhir(self, position: coordinates.Coords) -> int:
         if not self.menhir:
             return inf
-        return self.dist(position, self.menhir)
+        return self._min_dist(("menhir",), lambda: [self.menhir], position)
 
     def get_min_dist_loot(self, position: coordinates.Coords, weapon: weapons.WeaponDescription) -> int:
-        dist_weapons = inf
-        for target_position, target_weapon in self.weapons.items():
-            if target_weapon and WEAPON_ORDER.index(target_weapon.name) > WEAPON_ORDER.index(weapon.name):
-                dist_weapons = min(dist_weapons, self.dist(position, target_position))
-
-        dist_consumable = inf
-        for target_position, target_consumable in self.consumables.items():
-            if target_consumable:
-                dist_consumable = min(dist_consumable, self.dist(position, target_position))
-
-        return min(dist_weapons, dist_consumable)
+        def targets() -> list[coordinates.Coords]:
+            better_weapons = [
+                target_position
+                for target_position, target_weapon in self.weapons.items()
+                if target_weapon and WEAPON_ORDER.index(target_weapon.name) > WEAPON_ORDER.index(weapon.name)
+            ]
+            consumables = [
+                target_position
+                for target_position, target_consumable in self.consumables.items()
+                if target_consumable
+            ]
+            return better_weapons + consumables
+
+        return self._min_dist(("loot", weapon.name), targets, position)
 
     def get_min_dist_landmark(self, position: coordinates.Coords) -> int:
         if self.menhir:
             return inf
 
-        dist_landmark = inf
-        for landmark, visited in self.landmarks_visited.items():
-            if not visited:
-                dist_landmark = min(dist_landmark, self.dist(position, landmark))
+        def targets() -> list[coordinates.Coords]:
+            return [landmark for landmark, visited in self.landmarks_visited.items() if not visited]
 
-        return dist_landmark
+        return self._min_dist(("landmark",), targets, position)
 
     def get_min_dist_prey(self, position: coordinates.Coords, health: int, weapon: weapons.WeaponDescription) -> int:
         # TODO
-        dist_prey = inf
-        for enemy_position, enemy in self.get_enemies().items():
-            if (
-                DAMAGE_DICT[weapon.name] > 0
-                and DAMAGE_DICT[enemy.weapon.name] > 0
-                and enemy.health / DAMAGE_DICT[weapon.name] < health / DAMAGE_DICT[enemy.weapon.name]
-                and self.tiles[enemy_position].type != "forest"
-            ):
-                dist_prey = min(dist_prey, self.dist(position, enemy_position))
-
-        return dist_prey
+        def targets() -> list[coordinates.Coords]:
+            return [
+                enemy_position
+                for enemy_position, enemy in self.get_enemies().items()
+                if (
+                    DAMAGE_DICT[weapon.name] > 0
+                    and DAMAGE_DICT[enemy.weapon.name] > 0
+                    and enemy.health / DAMAGE_DICT[weapon.name] < health / DAMAGE_DICT[enemy.weapon.name]
+                    and self.tiles[enemy_position].type != "forest"
+                )
+            ]
+
+        return self._min_dist(("prey", health, weapon.name), targets, position)
 
     def get_visible_coords(
         self,
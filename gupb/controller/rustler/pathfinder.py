@@ -1,144 +1,112 @@
-import heapq
-
-MATRIX_STR = """========================
-=####.##=C...====....===
-==#A...#==....====..=@@=
-==.S....==...@==......@=
-==#....#===..@@@.=.....=
-=##....#====..@..#.#...=
-=####.##====......M#=..=
-==.....=====.....#.....=
-==.###.@.#.==..#.#.#...=
-===#.#....@==....#.#...=
-=....#...@@.......===..=
-=###..B...@.=...====.=.=
-=#...##.##..===...==...=
-=#...#==.#.===........#=
-=#..S#=.....==........@=
-=#...#==...===##.###...=
-=#.###=..#..==#....#==.=
-=....=.......=#BA...====
-==..==....@........#====
-==.....@.@#@..##.###====
-=====..#@@#....M..======
-=.....@###....##.#======
-=C====@@....=.....======
-========================"""
+import collections
+import functools
+
+import numpy as np
+
+from gupb.model import arenas
+
+# Moves are ordered by name, as the first move of the alphabetically first shortest path is taken.
+MOVES = ["DOWN", "LEFT", "RIGHT", "UP"]
+MOVE_VECTORS = [(0, 1), (-1, 0), (1, 0), (0, -1)]  # (dx, dy)
+UNREACHABLE = np.iinfo(np.uint16).max
+# Distance rows kept per arena; Rustler queries from its own position and its neighbours, so few are in use at once.
+ROWS_CACHE_SIZE = 64
+ARENAS_CACHE_SIZE = 4
+
+LETTERS = {weapon: letter for letter, weapon in arenas.WEAPON_ENCODING.items()}
 
 
 class PathFinder:
 
-    def __init__(self):
-        """Initialize the PathFinder with x as column and y as row."""
-        self.matrix = self.parse_matrix(MATRIX_STR)
-        self.directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # Up, Down, Left, Right (dx, dy)
-        self.moves = ["UP", "DOWN", "LEFT", "RIGHT"]
-        self.hash_map = self.generate_hash_map()  # Precompute hash map
-        self.letter_positions = self.find_letters_positions()  # Precompute letter positions
+    def __init__(self, arena: arenas.Arena):
+        """Initialize the PathFinder for the arena, with x as column and y as row."""
+        from scipy.sparse import coo_matrix
+
+        self.arena_name = arena.name
+        self.valid = np.zeros(arena.size, dtype=bool)
+        for coords, tile in arena.terrain.items():
+            self.valid[coords] = tile.terrain_passable()
+        self.cells = np.full(arena.size, -1, dtype=np.int32)
+        self.cells[self.valid] = np.arange(np.count_nonzero(self.valid))
+        self.letter_positions = self.find_letters_positions(arena)  # Precompute letter positions
+
+        cells_count = np.count_nonzero(self.valid)
+        xs, ys = np.nonzero(self.valid)
+        self.neighbours = []
+        for dx, dy in MOVE_VECTORS:
+            next_xs, next_ys = xs + dx, ys + dy
+            inside = (0 <= next_xs) & (next_xs < self.valid.shape[0]) & (0 <= next_ys) & (next_ys < self.valid.shape[1])
+            move_neighbours = np.full(cells_count, -1)
+            move_neighbours[inside] = self.cells[next_xs[inside], next_ys[inside]]
+            self.neighbours.append(move_neighbours)
+        sources = np.concatenate([np.flatnonzero(n >= 0) for n in self.neighbours])
+        targets = np.concatenate([n[n >= 0] for n in self.neighbours])
+        self.graph = coo_matrix((np.ones(len(sources)), (sources, targets)), shape=(cells_count, cells_count)).tocsr()
+        self.rows = collections.OrderedDict()
 
     @staticmethod
-    def parse_matrix(matrix_str):
-        """Convert the textual representation into a 2D matrix."""
-        return [list(row) for row in matrix_str.strip().split("\n")]
+    def find_letters_positions(arena: arenas.Arena, blacklisted=[]):
+        """Find positions of weapons lying on the arena at the start, stored as (x, y) = (column, row)."""
+        letter_positions = {}
+        for x, y in sorted(arena.terrain, key=lambda coords: (coords[1], coords[0])):
+            loot = arena.terrain[(x, y)].loot
+            if loot is not None and LETTERS[type(loot)] not in blacklisted:
+                letter_positions.setdefault(LETTERS[type(loot)], []).append((x, y))
+        return letter_positions
 
     def is_valid_move(self, x, y):
         """Check if (x, y) is a valid move (column, row)."""
-        if 0 <= y < len(self.matrix):
-            row = self.matrix[y]
-            if 0 <= x < len(row):
-                return row[x] not in ('=', '#')
-        return False
-
-    def compute_distances_and_moves(self, start):
-        """Compute shortest distance and initial move from 'start' (x, y) to all valid points."""
-        distances = {}
-        initial_moves = {}
-        heap = [(0, start, None)]  # (distance, (x, y), initial_move)
-        visited = set()
-
-        while heap:
-            current_distance, (current_x, current_y), initial_move = heapq.heappop(heap)
-
-            if (current_x, current_y) in visited:
-                continue
-
-            visited.add((current_x, current_y))
-            distances[(current_x, current_y)] = current_distance
-
-            if initial_move is not None:
-                initial_moves[(current_x, current_y)] = initial_move
-
-            for i, (dx, dy) in enumerate(self.directions):
-                next_x, next_y = current_x + dx, current_y + dy
-                if self.is_valid_move(next_x, next_y) and (next_x, next_y) not in visited:
-                    next_move = self.moves[i] if initial_move is None else initial_move
-                    heapq.heappush(heap, (current_distance + 1, (next_x, next_y), next_move))
-
-        return distances, initial_moves
-
-    def generate_hash_map(self):
-        """Generate hash map for all valid (x,y) to (dx,dy) with distance and first move."""
-        hash_map = {}
-        for y in range(len(self.matrix)):
-            row = self.matrix[y]
-            for x in range(len(row)):
-                if self.is_valid_move(x, y):
-                    distances, initial_moves = self.compute_distances_and_moves((x, y))
-                    for (dx, dy) in distances:
-                        if (dx, dy) == (x, y):
-                            hash_map[(x, y, dx, dy)] = (0, "STAY")
-                        elif (dx, dy) in initial_moves:
-                            hash_map[(x, y, dx, dy)] = (distances[(dx, dy)], initial_moves[(dx, dy)])
-        return hash_map
-
-    def find_letters_positions(self, blacklisted=[]):
-        """Find positions of letters, stored as (x, y) = (column, row)."""
-        letter_positions = {}
-        for y, row in enumerate(self.matrix):
-            for x, char in enumerate(row):
-                if char.isalpha() and (char not in blacklisted):
-                    if char not in letter_positions:
-                        letter_positions[char] = []
-                    letter_positions[char].append((x, y))
-        return letter_positions
+        return 0 <= x < self.valid.shape[0] and 0 <= y < self.valid.shape[1] and bool(self.valid[x, y])
+
+    def distances_from(self, cell):
+        """Shortest distances from the cell to all valid cells, with a BFS computed on the first query."""
+        from scipy.sparse.csgraph import shortest_path
+
+        cell = int(cell)
+        if cell in self.rows:
+            self.rows.move_to_end(cell)
+            return self.rows[cell]
+        distances = shortest_path(self.graph, directed=True, unweighted=True, indices=cell)
+        distances[~np.isfinite(distances)] = UNREACHABLE
+        row = distances.astype(np.uint16)
+        self.rows[cell] = row
+        if len(self.rows) > ROWS_CACHE_SIZE:
+            self.rows.popitem(last=False)
+        return row
 
     def letters_position(self, Xx, Xy, blacklisted=[]):
         """Get distances to all letters from (Xx, Xy)."""
         if not self.is_valid_move(Xx, Xy):
             return "Invalid starting position!"
+        distances = self.distances_from(self.cells[Xx, Xy])
         result = []
         for letter, positions in self.letter_positions.items():
             if letter in blacklisted:
                 continue
             for (x, y) in positions:
-                key = (Xx, Xy, x, y)
-                if key in self.hash_map:
-                    distance, move = self.hash_map[key]
-                    result.append((x, y, distance, letter))
+                distance = distances[self.cells[x, y]]
+                if distance != UNREACHABLE:
+                    result.append((x, y, int(distance), letter))
         return sorted(result, key=lambda x: x[2])
 
     def shortest_path(self, Xx, Xy, Yx, Yy):
-        key = (Xx, Xy, Yx, Yy)
-        return self.hash_map.get(key, None)
-
-    def validate_hash_map_for_target(self, target_x, target_y):
-        """Validate hash_map entries for paths to (target_x, target_y)."""
-        if not self.is_valid_move(target_x, target_y):
-            print(f"Target ({target_x}, {target_y}) is invalid.")
-            return False
-        errors = []
-        for y in range(len(self.matrix)):
-            row = self.matrix[y]
-            for x in range(len(row)):
-                if not self.is_valid_move(x, y) or (x == target_x and y == target_y):
-                    continue
-                distances, _ = self.compute_distances_and_moves((x, y))
-                if (target_x, target_y) in distances:
-                    key = (x, y, target_x, target_y)
-                    if key not in self.hash_map:
-                        errors.append((x, y))
-        if errors:
-            print(f"Found {len(errors)} missing entries for target ({target_x}, {target_y}).")
-            return False
-        print(f"All entries for target ({target_x}, {target_y}) are valid.")
-        return True
+        """Distance and the first move from (Xx, Xy) to (Yx, Yy), or None if there is no path."""
+        if not self.is_valid_move(Xx, Xy) or not self.is_valid_move(Yx, Yy):
+            return None
+        start, target = self.cells[Xx, Xy], self.cells[Yx, Yy]
+        distance = self.distances_from(start)[target]
+        if distance == UNREACHABLE:
+            return None
+        if start == target:
+            return 0, "STAY"
+        # The graph is undirected, so a neighbour's own distances tell whether it lies on a shortest path
+        for move, neighbours in zip(MOVES, self.neighbours):
+            neighbour = neighbours[start]
+            if neighbour >= 0 and self.distances_from(neighbour)[target] == distance - 1:
+                return int(distance), move
+
+
+@functools.lru_cache(maxsize=ARENAS_CACHE_SIZE)
+def shared_path_finder(arena_name: str) -> PathFinder:
+    """PathFinder shared by all Rustlers playing on the arena; distance rows are computed as they are queried."""
+    return PathFinder(arenas.Arena.load(arena_name))
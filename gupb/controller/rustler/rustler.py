@@ -6,7 +6,7 @@ import numpy as np
 from gupb import controller
 from gupb.controller.rustler import utils
 from gupb.controller.rustler.goal import Goal
-from gupb.controller.rustler.pathfinder import PathFinder
+from gupb.controller.rustler.pathfinder import PathFinder, shared_path_finder
 from gupb.controller.rustler.weapon_util import get_attack_positions
 from gupb.model import arenas, characters, coordinates, tiles, weapons
 
@@ -132,7 +132,7 @@ class Rustler(controller.Controller):
             coordinates.Coords(x, y) for x, y in HIDING_SPOTS
         ]
 
-        self.path_finder: PathFinder = PathFinder()
+        self.path_finder: PathFinder | None = None
 
         self.menhir: coordinates.Coords | None = None
         self.mist: coordinates.Coords | None = None
@@ -766,6 +766,7 @@ class Rustler(controller.Controller):
         self.prev_weapon = None
         self.previous_position = None
         self.misted_set = set()
+        self.path_finder = shared_path_finder(arena_description.name)
 
     def register(self, key) -> None:
         pass
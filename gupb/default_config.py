@@ -1,47 +1,43 @@
-from gupb.controller import keyboard
-from gupb.controller import random
-from gupb.controller.neat.kim_dzong_neat_mid import KimDzongNeatMidController
-from gupb.controller.camperbot import camperbot
-from gupb.controller.neat import kim_dzong_neat_jr
-from gupb.controller import kirby
-from gupb.controller import norgul
-from gupb.controller import reinforced_rogue
-from gupb.controller import garek
-from gupb.controller import rustler
-from gupb.controller.bupg import bupg
-from gupb.controller.pirat import pirat
-from gupb.controller import roomba
-from gupb.controller import Keramzytowy_mocarz
-
-
-keyboard_controller = keyboard.KeyboardController()
+from gupb.controller.registry import ControllerEntry
 
 CONFIGURATION = {
     'arenas': [
         'ordinary_chaos'
     ],
     'controllers': [
-        random.RandomController("Alice"),
-        random.RandomController("Bob"),
-        random.RandomController("Cecilia"),
-        random.RandomController("Darius"),
-        KimDzongNeatMidController(),
-        camperbot.CamperBotController("Camper"),
-        kim_dzong_neat_jr.KimDzongNeatJuniorController(),
-        kirby.KirbyController("Kirby"),
-        norgul.NorgulController("Norgul"),
-        reinforced_rogue.ReinforcedRogueController("ReinforcedRogue"),
-        garek.GarekController("Garek"),
-        rustler.Rustler("Rustler"),
-        bupg.BUPGController("BUPG"),
-        roomba.RoombaController("Roomba"),
-        pirat.PiratController("Pirat"),
-        Keramzytowy_mocarz.Keramzytowy_mocarz("KERAMZYTOWY_MOCARZ"),
+        ControllerEntry("RandomControllerAlice", "gupb.controller.random", "RandomController", ("Alice",)),
+        ControllerEntry("RandomControllerBob", "gupb.controller.random", "RandomController", ("Bob",)),
+        ControllerEntry("RandomControllerCecilia", "gupb.controller.random", "RandomController", ("Cecilia",)),
+        ControllerEntry("RandomControllerDarius", "gupb.controller.random", "RandomController", ("Darius",)),
+        ControllerEntry("Kim Dzong Neat v_2", "gupb.controller.neat.kim_dzong_neat_mid", "KimDzongNeatMidController"),
+        ControllerEntry("CamperBotCamper", "gupb.controller.camperbot.camperbot", "CamperBotController", ("Camper",)),
+        ControllerEntry("Kim Dzong Neat v_1", "gupb.controller.neat.kim_dzong_neat_jr", "KimDzongNeatJuniorController"),
+        ControllerEntry("Kirby", "gupb.controller.kirby", "KirbyController", ("Kirby",)),
+        ControllerEntry("Norgul", "gupb.controller.norgul.norgul", "NorgulController", ("Norgul",)),
+        ControllerEntry(
+            "ReinforcedRogueControllerReinforcedRogue",
+            "gupb.controller.reinforced_rogue",
+            "ReinforcedRogueController",
+            ("ReinforcedRogue",),
+        ),
+        ControllerEntry("G.A.R.E.K. Garek", "gupb.controller.garek", "GarekController", ("Garek",)),
+        ControllerEntry("RustlerRustler", "gupb.controller.rustler", "Rustler", ("Rustler",)),
+        ControllerEntry("BUPG BUPG", "gupb.controller.bupg.bupg", "BUPGController", ("BUPG",)),
+        ControllerEntry("Roomba", "gupb.controller.roomba", "RoombaController", ("Roomba",)),
+        ControllerEntry("PiratPirat", "gupb.controller.pirat.pirat", "PiratController", ("Pirat",)),
+        ControllerEntry(
+            "Keramzytowy Mocarz KERAMZYTOWY_MOCARZ",
+            "gupb.controller.Keramzytowy_mocarz",
+            "Keramzytowy_mocarz",
+            ("KERAMZYTOWY_MOCARZ",),
+        ),
     ],
     'start_balancing': False,
     'visualise': False,
     'show_sight': False,
     'runs_no': 1000,
     'profiling_metrics': [],
+    'replay_directory': None,
+    'capture_directory': None,
+    'memory_tracking': False,
 }
-
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import collections
+from dataclasses import dataclass
+import gc
+import importlib
+import logging
+import os
+import tracemalloc
+from typing import Optional
+
+from gupb import controller
+from gupb.logger import core as logger_core
+
+verbose_logger = logging.getLogger('verbose')
+
+DEFAULT_GROWTH_THRESHOLD_KIB = 64.0
+WARM_UP_GAMES = 1
+TRACEBACK_FRAMES = 32
+
+
+def controller_location(tracked_controller: controller.Controller) -> str:
+    """Path pattern covering the files of the controller's top-level module or package under `gupb.controller`."""
+    tracked_controller = getattr(tracked_controller, 'wrapped', tracked_controller)
+    module_name = type(tracked_controller).__module__
+    top_level_name = '.'.join(module_name.split('.')[:3])
+    top_level_module = importlib.import_module(top_level_name)
+    package_paths = getattr(top_level_module, '__path__', None)
+    if package_paths:
+        return os.path.join(list(package_paths)[0], '*')
+    return top_level_module.__file__
+
+
+def growth_per_game(retained: list[int]) -> float:
+    xs = range(len(retained))
+    x_mean = sum(xs) / len(retained)
+    y_mean = sum(retained) / len(retained)
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, retained))
+    variance = sum((x - x_mean) ** 2 for x in xs)
+    return covariance / variance
+
+
+class MemoryTracker:
+    """
+    Snapshots memory traced by `tracemalloc` after every game and attributes what is still allocated
+    to the controller modules, to find controllers that retain more and more memory across games.
+    """
+
+    def __init__(
+            self,
+            controllers: list[controller.Controller],
+            growth_threshold_kib: Optional[float] = None,
+            limit_kib: Optional[float] = None,
+    ) -> None:
+        self.growth_threshold_kib: float = \
+            growth_threshold_kib if growth_threshold_kib is not None else DEFAULT_GROWTH_THRESHOLD_KIB
+        self.limit_kib: Optional[float] = limit_kib
+        self.locations: dict[str, list[str]] = collections.defaultdict(list)
+        for tracked_controller in controllers:
+            self.locations[controller_location(tracked_controller)].append(tracked_controller.name)
+        self.retained: dict[str, list[int]] = collections.defaultdict(list)
+
+    def start(self) -> None:
+        tracemalloc.start(TRACEBACK_FRAMES)
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+
+    def track(self, game_no: int) -> None:
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        for location, names in self.locations.items():
+            location_snapshot = snapshot.filter_traces([tracemalloc.Filter(True, location, all_frames=True)])
+            retained = sum(trace.size for trace in location_snapshot.traces)
+            self.retained[location].append(retained)
+            ControllerMemoryReport(game_no, names, retained).log(logging.DEBUG)
+            if self.limit_kib is not None and retained > self.limit_kib * 1024:
+                verbose_logger.warning(
+                    f"Controllers {', '.join(names)} retain {retained / 1024:.1f} KiB after game number {game_no + 1},"
+                    f" above the limit of {self.limit_kib:.1f} KiB."
+                )
+
+    def leaking(self) -> list[tuple[str, float]]:
+        leaks = []
+        for location, retained in self.retained.items():
+            retained = retained[WARM_UP_GAMES:]
+            if len(retained) < 2:
+                continue
+            growth = growth_per_game(retained)
+            if growth > self.growth_threshold_kib * 1024:
+                leaks.append((location, growth))
+        return sorted(leaks, key=lambda leak: leak[1], reverse=True)
+
+    def print_report(self) -> None:
+        leaks = self.leaking()
+        for location, growth in leaks:
+            names, retained = self.locations[location], self.retained[location]
+            leak_line = (f"Controllers {', '.join(names)} retain {growth / 1024:.1f} KiB more after every game"
+                         f" ({retained[0] / 1024:.1f} KiB after the first one, {retained[-1] / 1024:.1f} KiB now).")
+            verbose_logger.warning(leak_line)
+            print(leak_line)
+            ControllerMemoryGrowthReport(names, growth).log(logging.WARN)
+        if not leaks:
+            print(f"No controller retains more than {self.growth_threshold_kib:.1f} KiB more after every game.")
+
+
+@dataclass(frozen=True)
+class ControllerMemoryReport(logger_core.LoggingMixin):
+    game_number: int
+    controller_names: list[str]
+    retained_bytes: int
+
+
+@dataclass(frozen=True)
+class ControllerMemoryGrowthReport(logger_core.LoggingMixin):
+    controller_names: list[str]
+    growth_bytes_per_game: float
@@ -4,7 +4,7 @@ import logging
 import os.path
 import random
 from enum import Enum, member
-from typing import Dict, NamedTuple, Optional
+from typing import Dict, Iterator, Mapping, NamedTuple, Optional
 
 import bresenham
 
@@ -64,6 +64,41 @@ class ArenaDescription(NamedTuple):
     name: str
 
 
+class VisibleTiles(Mapping[coordinates.Coords, tiles.TileDescription]):
+    """
+    A read-only view of the tiles seen by a champion.
+
+    Tile descriptions are built on first access and cached, so a controller pays only for the tiles it reads.
+    Descriptions reflect the arena state at the time of access, so the view should not be kept past `decide`
+    (copy it with `dict(visible_tiles)` if needed).
+    """
+
+    def __init__(self, terrain: Terrain, visible_coords: set[coordinates.Coords]) -> None:
+        self._terrain: Terrain = terrain
+        self._visible_coords: set[coordinates.Coords] = visible_coords
+        self._descriptions: dict[coordinates.Coords, tiles.TileDescription] = {}
+
+    def __getitem__(self, coords: coordinates.Coords) -> tiles.TileDescription:
+        description = self._descriptions.get(coords)
+        if description is None:
+            if coords not in self._visible_coords:
+                raise KeyError(coords)
+            description = self._descriptions[coords] = self._terrain[coords].description()
+        return description
+
+    def __contains__(self, coords: object) -> bool:
+        return coords in self._visible_coords
+
+    def __iter__(self) -> Iterator[coordinates.Coords]:
+        return iter(self._visible_coords)
+
+    def __len__(self) -> int:
+        return len(self._visible_coords)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+
 class Arena:
     def __init__(self, name: str, terrain: Terrain) -> None:
         self.name = name
@@ -142,8 +177,8 @@ class Arena:
             visible.update(champion_left_and_right())
         return visible
 
-    def visible_tiles(self, champion: characters.Champion) -> dict[coordinates.Coords, tiles.TileDescription]:
-        return {coords: self.terrain[coords].description() for coords in self.visible_coords(champion)}
+    def visible_tiles(self, champion: characters.Champion) -> VisibleTiles:
+        return VisibleTiles(self.terrain, self.visible_coords(champion))
 
     def step(self, champion: characters.Champion, step_direction: StepDirection) -> None:
         new_position = champion.position + step_direction.value(champion.facing).value
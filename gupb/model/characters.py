@@ -4,13 +4,14 @@ from enum import Enum
 from functools import partial
 import logging
 import random
-from typing import NamedTuple, Optional, Dict
+from typing import Mapping, NamedTuple, Optional
 
 from gupb import controller
 from gupb.logger import core as logger_core
 from gupb.model import arenas
 from gupb.model import coordinates
 from gupb.model import consumables
+from gupb.model import observations
 from gupb.model import tiles
 from gupb.model import weapons
 
@@ -23,7 +24,8 @@ IDLE_DAMAGE_PENALTY = 1
 class ChampionKnowledge(NamedTuple):
     position: coordinates.Coords
     no_of_champions_alive: int
-    visible_tiles: Dict[coordinates.Coords, tiles.TileDescription]
+    visible_tiles: Mapping[coordinates.Coords, tiles.TileDescription]
+    observation: Optional[observations.Observation] = None
 
 
 class ChampionDescription(NamedTuple):
@@ -72,10 +74,13 @@ class Champion:
         self.previous_facing: Facing = self.facing
         self.previous_position: coordinates.Coords = self.position
         self.time_idle: int = 0
+        self.observation: Optional[observations.Observation] = None
 
     def assign_controller(self, assigned_controller: controller.Controller) -> None:
         self.controller = assigned_controller
         self.tabard = self.controller.preferred_tabard
+        if getattr(self.controller, "observation_planes", False):
+            self.observation = observations.Observation(self.arena.size)
 
     def description(self) -> ChampionDescription:
         return ChampionDescription(self.controller.name, self.health, self.weapon.description(), self.facing)
@@ -83,7 +88,7 @@ class Champion:
     def verbose_name(self) -> str:
         return self.controller.name if self.controller else "NULL_CONTROLLER"
 
-    def act(self) -> None:
+    def act(self) -> Optional[Action]:
         if self.alive:
             verbose_logger.debug(f"Champion {self.verbose_name()} starts acting.")
             self.store_previous_state()
@@ -93,6 +98,8 @@ class Champion:
             action(self)
             self.arena.stay(self)
             self.assess_idle_penalty()
+            return action
+        return None
 
     def store_previous_state(self) -> None:
         self.previous_position = self.position
@@ -111,8 +118,7 @@ class Champion:
     # noinspection PyBroadException
     def pick_action(self) -> Action:
         if self.controller:
-            visible_tiles = self.arena.visible_tiles(self)
-            knowledge = ChampionKnowledge(self.position, self.arena.no_of_champions_alive, visible_tiles)
+            knowledge = self.knowledge() if getattr(self.controller, "needs_knowledge", True) else None
             try:
                 action = self.controller.decide(knowledge)
                 if action is None:
@@ -129,6 +135,13 @@ class Champion:
             controller.ControllerExceptionReport(self.verbose_name(), "controller non-existent").log(logging.WARN)
             return Action.DO_NOTHING
 
+    def knowledge(self) -> ChampionKnowledge:
+        visible_coords = self.arena.visible_coords(self)
+        visible_tiles = arenas.VisibleTiles(self.arena.terrain, visible_coords)
+        if self.observation is not None:
+            self.observation.update(self.arena.terrain, visible_coords)
+        return ChampionKnowledge(self.position, self.arena.no_of_champions_alive, visible_tiles, self.observation)
+
     def turn_left(self) -> None:
         self.facing = self.facing.turn_left()
         verbose_logger.debug(f"Champion {self.controller.name} is now facing {self.facing}.")
@@ -33,13 +33,19 @@ class Game(statemachine.StateMachine):
             to_spawn: list[controller.Controller],
             menhir_position: Optional[coordinates.Coords] = None,
             initial_champion_positions: Optional[list[coordinates.Coords]] = None,
+            initial_champion_facings: Optional[list[characters.Facing]] = None,
+            record_actions: bool = False,
     ) -> None:
         self.game_no: int = game_no
         self.arena: arenas.Arena = arenas.Arena.load(arena_name)
         self.arena.spawn_menhir(menhir_position)
         self._prepare_controllers(to_spawn)
         self.initial_champion_positions: Optional[list[coordinates.Coords]] = initial_champion_positions
+        self.initial_champion_facings: Optional[list[characters.Facing]] = initial_champion_facings
         self.champions: list[characters.Champion] = self._spawn_champions(to_spawn)
+        self.recorded_actions: Optional[dict[characters.Champion, list[characters.Action]]] = (
+            {champion: [] for champion in self.champions} if record_actions else None
+        )
         self.action_queue: list[characters.Champion] = []
         self.episode: int = 0
         self.episodes_since_mist_increase: int = 0
@@ -74,13 +80,16 @@ class Game(statemachine.StateMachine):
             self.initial_champion_positions = random.sample(self.arena.empty_coords(), len(to_spawn))
         if len(to_spawn) != len(self.initial_champion_positions):
             raise RuntimeError("Unable to spawn champions: not enough positions!")  # TODO: remove if works
-        for controller_to_spawn, coords in zip(to_spawn, self.initial_champion_positions):
+        for i, (controller_to_spawn, coords) in enumerate(zip(to_spawn, self.initial_champion_positions)):
             champion = self.arena.spawn_champion_at(coords)
+            if self.initial_champion_facings is not None:
+                champion.facing = self.initial_champion_facings[i]
             champion.assign_controller(controller_to_spawn)
             champions.append(champion)
             verbose_logger.debug(f"{champion.tabard.value} champion for {controller_to_spawn.name}"
                                  f" spawned at {coords} facing {champion.facing}.")
             ChampionSpawnedReport(controller_to_spawn.name, coords, champion.facing.value).log(logging.DEBUG)
+        self.initial_champion_facings = [champion.facing for champion in champions]
         return champions
 
     def _environment_action(self) -> None:
@@ -120,7 +129,9 @@ class Game(statemachine.StateMachine):
 
     def _champion_action(self) -> None:
         champion = self.action_queue.pop()
-        champion.act()
+        action = champion.act()
+        if action is not None and self.recorded_actions is not None:
+            self.recorded_actions[champion].append(action)
 
     @staticmethod
     def _fibonacci() -> Iterator[int]:
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import Iterable
+
+import numpy as np
+
+from gupb.model import arenas
+from gupb.model import coordinates
+
+# Codes are 1-based, so that 0 always means "nothing" (or "not visible" for tile types).
+TILE_TYPES: tuple[str, ...] = ('sea', 'land', 'forest', 'wall', 'menhir')
+WEAPON_NAMES: tuple[str, ...] = ('knife', 'sword', 'axe', 'bow_unloaded', 'bow_loaded', 'amulet', 'scroll')
+CONSUMABLE_NAMES: tuple[str, ...] = ('potion',)
+FACINGS: tuple[str, ...] = ('UP', 'RIGHT', 'DOWN', 'LEFT')
+
+TILE_TYPE_CODES: dict[str, int] = {name: code for code, name in enumerate(TILE_TYPES, start=1)}
+WEAPON_CODES: dict[str, int] = {name: code for code, name in enumerate(WEAPON_NAMES, start=1)}
+CONSUMABLE_CODES: dict[str, int] = {name: code for code, name in enumerate(CONSUMABLE_NAMES, start=1)}
+FACING_CODES: dict[str, int] = {name: code for code, name in enumerate(FACINGS, start=1)}
+
+EFFECT_BITS: dict[str, int] = {
+    'mist': 1,
+    'weaponcut': 2,
+    'fire': 4,
+}
+
+_TILE_TYPE_CODES_BY_CLASS: dict[type, int] = {}
+_EFFECT_BITS_BY_CLASS: dict[type, int] = {}
+
+
+def _tile_type_code(tile_class: type) -> int:
+    code = _TILE_TYPE_CODES_BY_CLASS.get(tile_class)
+    if code is None:
+        code = _TILE_TYPE_CODES_BY_CLASS[tile_class] = TILE_TYPE_CODES[tile_class.__name__.lower()]
+    return code
+
+
+def _effect_bit(effect_class: type) -> int:
+    bit = _EFFECT_BITS_BY_CLASS.get(effect_class)
+    if bit is None:
+        bit = _EFFECT_BITS_BY_CLASS[effect_class] = EFFECT_BITS[effect_class.__name__.lower()]
+    return bit
+
+
+class Observation:
+    """
+    A champion's sight encoded as preallocated NumPy planes, rewritten in place before every decision.
+
+    Every plane has the shape of the arena and is indexed as `plane[x, y]`, so `plane[coords]` works
+    for any `Coords`. Cells outside of the champion's sight are zeroed on each update.
+    """
+
+    def __init__(self, size: tuple[int, int]) -> None:
+        self.size: tuple[int, int] = size
+        self.visible: np.ndarray = np.zeros(size, dtype=bool)
+        self.tile_type: np.ndarray = np.zeros(size, dtype=np.uint8)
+        self.loot: np.ndarray = np.zeros(size, dtype=np.uint8)
+        self.consumable: np.ndarray = np.zeros(size, dtype=np.uint8)
+        self.character_facing: np.ndarray = np.zeros(size, dtype=np.uint8)
+        self.character_health: np.ndarray = np.zeros(size, dtype=np.int16)
+        self.character_weapon: np.ndarray = np.zeros(size, dtype=np.uint8)
+        self.effects: np.ndarray = np.zeros(size, dtype=np.uint8)
+
+    def planes(self) -> tuple[np.ndarray, ...]:
+        return (
+            self.visible,
+            self.tile_type,
+            self.loot,
+            self.consumable,
+            self.character_facing,
+            self.character_health,
+            self.character_weapon,
+            self.effects,
+        )
+
+    def update(self, terrain: arenas.Terrain, visible_coords: Iterable[coordinates.Coords]) -> None:
+        for plane in self.planes():
+            plane.fill(0)
+        xs, ys, tile_types = [], [], []
+        for coords in visible_coords:
+            tile = terrain[coords]
+            xs.append(coords[0])
+            ys.append(coords[1])
+            tile_types.append(_tile_type_code(tile.__class__))
+            if tile.loot:
+                self.loot[coords] = WEAPON_CODES[tile.loot.description().name]
+            if tile.consumable:
+                self.consumable[coords] = CONSUMABLE_CODES[tile.consumable.description().name]
+            if tile.character:
+                self.character_facing[coords] = FACING_CODES[tile.character.facing.name]
+                self.character_health[coords] = tile.character.health
+                self.character_weapon[coords] = WEAPON_CODES[tile.character.weapon.description().name]
+            if tile.effects:
+                bits = 0
+                for effect in tile.effects:
+                    bits |= _effect_bit(effect.__class__)
+                self.effects[coords] = bits
+        self.visible[xs, ys] = True
+        self.tile_type[xs, ys] = tile_types
@@ -0,0 +1,216 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+import pathlib
+from typing import Optional
+
+import click
+
+from gupb import controller
+from gupb.model import arenas
+from gupb.model import characters
+from gupb.model import coordinates
+from gupb.model import games
+
+REPLAY_FORMAT_VERSION = 1
+
+ACTIONS: list[characters.Action] = list(characters.Action)
+ACTION_CODES: dict[characters.Action, str] = {action: str(i) for i, action in enumerate(ACTIONS)}
+
+
+def arena_digest(arena_name: str) -> str:
+    arena_file_path = os.path.join('resources', 'arenas', f'{arena_name}.gupb')
+    with open(arena_file_path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+@dataclass
+class ChampionReplay:
+    controller_name: str
+    tabard: characters.Tabard
+    position: coordinates.Coords
+    facing: characters.Facing
+    actions: str
+    score: Optional[int] = None
+
+
+@dataclass
+class Replay:
+    game_no: int
+    arena_name: str
+    arena_digest: str
+    menhir_position: coordinates.Coords
+    champions: list[ChampionReplay] = field(default_factory=list)
+
+    @staticmethod
+    def from_game(game: games.Game) -> Replay:
+        if game.recorded_actions is None:
+            raise RuntimeError("Attempted to build a replay of a game that was not recording actions!")
+        scores = {controller.name: score for controller, score in game.score().items()} if game.finished else {}
+        return Replay(
+            game_no=game.game_no,
+            arena_name=game.arena.name,
+            arena_digest=arena_digest(game.arena.name),
+            menhir_position=game.arena.menhir_position,
+            champions=[
+                ChampionReplay(
+                    controller_name=champion.controller.name,
+                    tabard=champion.tabard,
+                    position=position,
+                    facing=facing,
+                    actions=''.join(ACTION_CODES[action] for action in actions),
+                    score=scores.get(champion.controller.name),
+                )
+                for (champion, actions), position, facing in zip(
+                    game.recorded_actions.items(),
+                    game.initial_champion_positions,
+                    game.initial_champion_facings,
+                )
+            ],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            'version': REPLAY_FORMAT_VERSION,
+            'game_no': self.game_no,
+            'arena_name': self.arena_name,
+            'arena_digest': self.arena_digest,
+            'menhir_position': list(self.menhir_position),
+            'champions': [
+                {
+                    'controller_name': champion.controller_name,
+                    'tabard': champion.tabard.name,
+                    'position': list(champion.position),
+                    'facing': champion.facing.name,
+                    'actions': champion.actions,
+                    'score': champion.score,
+                }
+                for champion in self.champions
+            ],
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> Replay:
+        if data['version'] != REPLAY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported replay format version: {data['version']}!")
+        return Replay(
+            game_no=data['game_no'],
+            arena_name=data['arena_name'],
+            arena_digest=data['arena_digest'],
+            menhir_position=coordinates.Coords(*data['menhir_position']),
+            champions=[
+                ChampionReplay(
+                    controller_name=champion['controller_name'],
+                    tabard=characters.Tabard[champion['tabard']],
+                    position=coordinates.Coords(*champion['position']),
+                    facing=characters.Facing[champion['facing']],
+                    actions=champion['actions'],
+                    score=champion['score'],
+                )
+                for champion in data['champions']
+            ],
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, separators=(',', ':'))
+
+    @staticmethod
+    def load(path: str) -> Replay:
+        with open(path) as file:
+            return Replay.from_dict(json.load(file))
+
+
+# noinspection PyUnusedLocal
+class ReplayController(controller.Controller):
+    """Stands in for a recorded controller and repeats its actions, without ever looking at the arena."""
+
+    needs_knowledge = False
+
+    def __init__(self, champion_replay: ChampionReplay) -> None:
+        self.champion_replay: ChampionReplay = champion_replay
+        self.actions_taken: int = 0
+
+    def decide(self, knowledge: Optional[characters.ChampionKnowledge]) -> characters.Action:
+        if self.actions_taken >= len(self.champion_replay.actions):
+            raise RuntimeError("Replay diverged: no more recorded actions!")
+        action = ACTIONS[int(self.champion_replay.actions[self.actions_taken])]
+        self.actions_taken += 1
+        return action
+
+    def praise(self, score: int) -> None:
+        pass
+
+    def reset(self, game_no: int, arena_description: arenas.ArenaDescription) -> None:
+        self.actions_taken = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return self.actions_taken == len(self.champion_replay.actions)
+
+    @property
+    def name(self) -> str:
+        return self.champion_replay.controller_name
+
+    @property
+    def preferred_tabard(self) -> characters.Tabard:
+        return self.champion_replay.tabard
+
+
+def replay_game(replay: Replay) -> games.Game:
+    if arena_digest(replay.arena_name) != replay.arena_digest:
+        raise RuntimeError(f"Arena {replay.arena_name} has changed since the replay was recorded!")
+    controllers = [ReplayController(champion) for champion in replay.champions]
+    return games.Game(
+        game_no=replay.game_no,
+        arena_name=replay.arena_name,
+        to_spawn=controllers,
+        menhir_position=replay.menhir_position,
+        initial_champion_positions=[champion.position for champion in replay.champions],
+        initial_champion_facings=[champion.facing for champion in replay.champions],
+    )
+
+
+def verify(replay: Replay, game: games.Game) -> list[str]:
+    problems = []
+    scores = {controller.name: score for controller, score in game.score().items()}
+    for controller in game.score():
+        if not controller.exhausted:
+            problems.append(f"Controller {controller.name} did not use all of its recorded actions.")
+    for champion in replay.champions:
+        if champion.score is not None and scores[champion.controller_name] != champion.score:
+            problems.append(
+                f"Controller {champion.controller_name} scored {scores[champion.controller_name]} points"
+                f" instead of recorded {champion.score}."
+            )
+    return problems
+
+
+@click.command()
+@click.argument('replay_path', type=click.Path(exists=True))
+@click.option('-v', '--visualise', is_flag=True, help="Whether to show the replayed game.")
+@click.option('-m', '--ms_per_time_unit', default=5, help="Visualisation speed (lower is faster).")
+def main(replay_path: str, visualise: bool, ms_per_time_unit: int) -> None:
+    replay = Replay.load(replay_path)
+    game = replay_game(replay)
+    if visualise:
+        from gupb.view import render
+        render.Renderer(ms_per_time_unit).run(game)
+    else:
+        while not game.finished:
+            game.cycle()
+    if not game.finished:
+        return
+    for controller, score in game.score().items():
+        print(f"{controller.name}: {score}.")
+    problems = verify(replay, game)
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print(f"Replay of {pathlib.Path(replay_path).name} matches the recorded game.")
+
+
+if __name__ == '__main__':
+    main(prog_name='python -m gupb.replays')
@@ -1,56 +1,93 @@
 from __future__ import annotations
 import collections
 from dataclasses import dataclass
+from datetime import datetime
 import logging
+import os
 import random
-from typing import Any, List, Optional
+from typing import Any, List, Optional, TYPE_CHECKING
 
 from tqdm import trange
 
+from gupb import captures
 from gupb import controller
-from gupb.controller import keyboard
+from gupb import memory
+from gupb import replays
+from gupb.controller import registry
 from gupb.model.profiling import PROFILE_RESULTS, print_stats
 from gupb.logger import core as logger_core
 from gupb.model import coordinates
 from gupb.model import games
-from gupb.view import render
+
+if TYPE_CHECKING:
+    from gupb.controller import keyboard
+    from gupb.view import render
 
 verbose_logger = logging.getLogger('verbose')
 
 class Runner:
     def __init__(self, config: dict[str, Any]) -> None:
         self.arenas: list[str] = config['arenas']
-        self.controllers: list[controller.Controller] = config['controllers']
-        self.keyboard_controller: Optional[keyboard.KeyboardController] = next(
-            (c for c in self.controllers if isinstance(c, keyboard.KeyboardController)), None
-        )
-        self.show_sight: Optional[controller.Controller] = config['show_sight'] if 'show_sight' in config else None
-        self.renderer: Optional[render.Renderer] = render.Renderer() if config['visualise'] else None
+        self.controllers: list[controller.Controller] = [registry.resolve(c) for c in config['controllers']]
+        self.show_sight: Optional[controller.Controller] = \
+            registry.resolve(config['show_sight']) if 'show_sight' in config else None
+        self.keyboard_controller: Optional[keyboard.KeyboardController] = None
+        self.renderer: Optional[render.Renderer] = None
+        if config['visualise']:
+            # pygame is imported and initialised only for visualised runs
+            from gupb.controller import keyboard
+            from gupb.view import render
+            self.keyboard_controller = next(
+                (c for c in self.controllers if isinstance(c, keyboard.KeyboardController)), None
+            )
+            self.renderer = render.Renderer()
         self.runs_no: int = config['runs_no']
         self.start_balancing: bool = config['start_balancing']
         self.scores: dict[str, int] = collections.defaultdict(int)
         self.profiling_metrics = config['profiling_metrics'] if 'profiling_metrics' in config else None
+        self.replay_directory: Optional[str] = config['replay_directory'] if 'replay_directory' in config else None
+        self.run_prefix: str = f"gupb__{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}"
+        self.capture_directory: Optional[str] = config['capture_directory'] if 'capture_directory' in config else None
+        if self.capture_directory is not None:
+            self.controllers = [
+                captures.CapturingController(c, self.capture_directory, self.run_prefix) for c in self.controllers
+            ]
+        self.memory_tracker: Optional[memory.MemoryTracker] = None
+        if 'memory_tracking' in config and config['memory_tracking']:
+            self.memory_tracker = memory.MemoryTracker(
+                self.controllers,
+                config['memory_growth_threshold'] if 'memory_growth_threshold' in config else None,
+                config['memory_limit'] if 'memory_limit' in config else None,
+            )
         self._last_arena: Optional[str] = None
         self._last_menhir_position: Optional[coordinates.Coords] = None
         self._last_initial_positions: Optional[list[coordinates.Coords]] = None
 
     def run(self) -> None:
+        if self.memory_tracker:
+            self.memory_tracker.start()
         for i in trange(self.runs_no, desc="Playing games"):
             verbose_logger.info(f"Starting game number {i + 1}.")
             GameStartReport(i + 1).log(logging.INFO)
             self.run_game(i)
+            if self.memory_tracker:
+                self.memory_tracker.track(i)
+        if self.memory_tracker:
+            self.memory_tracker.stop()
 
     # noinspection PyBroadException
     def run_game(self, game_no: int) -> None:
         arena = random.choice(self.arenas)
         verbose_logger.debug(f"Randomly picked arena: {arena}.")
         RandomArenaPickReport(arena).log(logging.DEBUG)
+        record_actions = self.replay_directory is not None
         if not self.start_balancing or game_no % len(self.controllers) == 0:
             random.shuffle(self.controllers)
             game = games.Game(
                 game_no=game_no,
                 arena_name=arena,
                 to_spawn=self.controllers,
+                record_actions=record_actions,
             )
         else:
             self.controllers = self.controllers[1:] + [self.controllers[0]]
@@ -60,6 +97,7 @@ class Runner:
                 to_spawn=self.controllers,
                 menhir_position=self._last_menhir_position,
                 initial_champion_positions=self._last_initial_positions,
+                record_actions=record_actions,
             )
         self._last_arena = game.arena.name
         self._last_menhir_position = game.arena.menhir_position
@@ -78,6 +116,14 @@ class Runner:
                 verbose_logger.warning(f"Controller {dead_controller.name} throw an unexpected exception: {repr(e)}.")
                 controller.ControllerExceptionReport(dead_controller.name, repr(e)).log(logging.WARN)
             self.scores[dead_controller.name] += score
+        if record_actions:
+            self.save_replay(game)
+
+    def save_replay(self, game: games.Game) -> None:
+        os.makedirs(self.replay_directory, exist_ok=True)
+        replay_path = os.path.join(self.replay_directory, f"{self.run_prefix}__game_{game.game_no}.json")
+        replays.Replay.from_game(game).save(replay_path)
+        verbose_logger.debug(f"Replay of game number {game.game_no + 1} saved to {replay_path}.")
 
     def print_scores(self) -> None:
         verbose_logger.info(f"Final scores.")
@@ -93,6 +139,9 @@ class Runner:
             for func in PROFILE_RESULTS.keys():
                 print_stats(func, **{m: True for m in self.profiling_metrics})
 
+        if self.memory_tracker:
+            self.memory_tracker.print_report()
+
     @staticmethod
     def run_in_memory(game: games.Game) -> None:
         while not game.finished:
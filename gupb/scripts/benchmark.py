@@ -0,0 +1,255 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+import glob
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Iterator, Optional
+
+import click
+from tqdm import tqdm
+
+from gupb.controller import random as random_controller
+from gupb.model import arenas
+from gupb.model import characters
+from gupb.model import games
+from gupb.model import weapons
+from gupb.scripts import arena_generator
+
+BENCHMARK_SEED = 42
+GENERATED_ARENA_NAME = 'generated_benchmark_42'
+GENERATED_ARENA_SIZE = 42
+CHAMPIONS_PER_ARENA = 8
+POSITIONS_PER_ARENA = 64
+LOBBY_SIZE = 4
+BENCHMARK_WEAPONS = [weapons.Knife, weapons.Sword, weapons.Axe, weapons.Bow, weapons.Amulet, weapons.Scroll]
+IMMORTAL_HEALTH = 10 ** 6
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    unit: str
+    median: float
+    mean: float
+    best: float
+    samples: int
+    higher_is_better: bool = False
+
+
+def bundled_arenas() -> list[str]:
+    arena_paths = glob.glob(os.path.join('resources', 'arenas', '*.gupb'))
+    arena_names = [os.path.splitext(os.path.basename(path))[0] for path in arena_paths]
+    return sorted(name for name in arena_names if not name.startswith('generated_'))
+
+
+def prepare_generated_arena() -> str:
+    random.seed(BENCHMARK_SEED)
+    arena = arena_generator.generate_arena(GENERATED_ARENA_SIZE, GENERATED_ARENA_SIZE)
+    arena_generator.save_arena(arena, GENERATED_ARENA_NAME)
+    return GENERATED_ARENA_NAME
+
+
+def time_per_operation(operation: Callable[[], int]) -> float:
+    start = time.perf_counter()
+    operations_no = operation()
+    return (time.perf_counter() - start) / operations_no * 10 ** 6
+
+
+def summarize(name: str, samples: list[float], unit: str = 'us/op', higher_is_better: bool = False) -> BenchmarkResult:
+    return BenchmarkResult(
+        name=name,
+        unit=unit,
+        median=statistics.median(samples),
+        mean=statistics.mean(samples),
+        best=max(samples) if higher_is_better else min(samples),
+        samples=len(samples),
+        higher_is_better=higher_is_better,
+    )
+
+
+def populated_arena(arena_name: str) -> tuple[arenas.Arena, list[characters.Champion]]:
+    arena = arenas.Arena.load(arena_name)
+    arena.spawn_menhir()
+    champions = []
+    for i, coords in enumerate(random.sample(arena.empty_coords(), CHAMPIONS_PER_ARENA)):
+        champion = arena.spawn_champion_at(coords)
+        champion.assign_controller(random_controller.RandomController(f"Benchmark{i}"))
+        champion.health = IMMORTAL_HEALTH
+        champions.append(champion)
+    return arena, champions
+
+
+def benchmark_visible_coords(arena_name: str, repeats: int) -> BenchmarkResult:
+    def operation() -> int:
+        for champion in champions:
+            for facing in characters.Facing:
+                champion.facing = facing
+                arena.visible_coords(champion)
+        return len(champions) * len(characters.Facing)
+
+    random.seed(BENCHMARK_SEED)
+    arena, champions = populated_arena(arena_name)
+    return summarize(f"Arena.visible_coords/{arena_name}", [time_per_operation(operation) for _ in range(repeats)])
+
+
+def benchmark_step(arena_name: str, repeats: int) -> BenchmarkResult:
+    def operation() -> int:
+        for champion in champions:
+            for facing in characters.Facing:
+                champion.facing = facing
+                arena.step(champion, arenas.StepDirection.FORWARD)
+                arena.step(champion, arenas.StepDirection.BACKWARD)
+        return len(champions) * len(characters.Facing) * 2
+
+    random.seed(BENCHMARK_SEED)
+    arena, champions = populated_arena(arena_name)
+    return summarize(f"Arena.step/{arena_name}", [time_per_operation(operation) for _ in range(repeats)])
+
+
+def benchmark_cut_and_instant(arena_name: str, repeats: int) -> Iterator[BenchmarkResult]:
+    def cut() -> int:
+        for weapon in arena_weapons:
+            for coords, facing in positions:
+                if isinstance(weapon, weapons.Bow):
+                    weapon.ready = True
+                weapon.cut(arena, coords, facing)
+        return len(arena_weapons) * len(positions)
+
+    def instant() -> int:
+        tiles_no = len(arena.tiles_with_instant_effects)
+        arena.trigger_instants()
+        return tiles_no
+
+    cut_samples, instant_samples = [], []
+    for _ in range(repeats):
+        random.seed(BENCHMARK_SEED)
+        arena, champions = populated_arena(arena_name)
+        arena_weapons = [weapon() for weapon in BENCHMARK_WEAPONS]
+        empty_coords = arena.empty_coords()
+        positions = [
+            (coords, random.choice(list(characters.Facing)))
+            for coords in random.sample(empty_coords, min(POSITIONS_PER_ARENA, len(empty_coords)))
+        ]
+        cut_samples.append(time_per_operation(cut))
+        instant_samples.append(time_per_operation(instant))
+    yield summarize(f"Weapon.cut/{arena_name}", cut_samples)
+    yield summarize(f"Tile.instant/{arena_name}", instant_samples)
+
+
+def benchmark_increase_mist(arena_name: str, repeats: int) -> BenchmarkResult:
+    def operation() -> int:
+        increases_no = arena.mist_radius
+        while arena.mist_radius:
+            arena.increase_mist()
+        return increases_no
+
+    samples = []
+    for _ in range(repeats):
+        random.seed(BENCHMARK_SEED)
+        arena, _ = populated_arena(arena_name)
+        samples.append(time_per_operation(operation))
+    return summarize(f"Arena.increase_mist/{arena_name}", samples)
+
+
+def benchmark_games(arena_name: str, games_no: int) -> Iterator[BenchmarkResult]:
+    cycle_samples, game_samples = [], []
+    random.seed(BENCHMARK_SEED)
+    controllers = [random_controller.RandomController(f"Benchmark{i}") for i in range(LOBBY_SIZE)]
+    for game_no in range(games_no):
+        game = games.Game(game_no, arena_name, controllers)
+        game_start = time.perf_counter()
+        while not game.finished:
+            cycle_start = time.perf_counter()
+            game.cycle()
+            cycle_samples.append((time.perf_counter() - cycle_start) * 10 ** 6)
+        game_samples.append(1 / (time.perf_counter() - game_start))
+    yield summarize(f"Game.cycle/{arena_name}", cycle_samples)
+    yield summarize(f"games_per_second/{arena_name}", game_samples, unit='games/s', higher_is_better=True)
+
+
+def run_benchmarks(arena_names: list[str], repeats: int, games_no: int) -> list[BenchmarkResult]:
+    results = []
+    for arena_name in tqdm(arena_names, desc="Benchmarking arenas"):
+        results.append(benchmark_visible_coords(arena_name, repeats))
+        results.append(benchmark_step(arena_name, repeats))
+        results.extend(benchmark_cut_and_instant(arena_name, repeats))
+        results.append(benchmark_increase_mist(arena_name, repeats))
+        results.extend(benchmark_games(arena_name, games_no))
+    return results
+
+
+def compare(
+        results: list[BenchmarkResult],
+        baseline: dict[str, dict],
+        threshold: float,
+) -> list[tuple[BenchmarkResult, float, bool]]:
+    comparisons = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+        base_median = baseline[result.name]['median']
+        change = result.median / base_median - 1.0
+        regressed = -change > threshold / (1.0 + threshold) if result.higher_is_better else change > threshold
+        comparisons.append((result, change, regressed))
+    return comparisons
+
+
+def metadata(repeats: int, games_no: int) -> dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': BENCHMARK_SEED,
+        'repeats': repeats,
+        'games': games_no,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def load_baseline(baseline_path: str) -> dict[str, dict]:
+    with open(baseline_path) as file:
+        return {result['name']: result for result in json.load(file)['results']}
+
+
+@click.command()
+@click.option('-o', '--output', type=click.Path(), default=None,
+              help="The path to store benchmark results in JSON.")
+@click.option('-b', '--baseline', type=click.Path(exists=True), default=None,
+              help="The path to previously stored results to compare against.")
+@click.option('-t', '--threshold', default=0.1,
+              help="Relative slowdown over baseline reported as a regression.")
+@click.option('-r', '--repeats', default=5, help="Repeats of every micro-benchmark.")
+@click.option('-g', '--games', 'games_no', default=5, help="Games played on every arena.")
+@click.option('-a', '--arena', 'arena_names', multiple=True,
+              help="Arenas to benchmark, all bundled ones and a generated 42x42 one by default.")
+def main(
+        output: Optional[str],
+        baseline: Optional[str],
+        threshold: float,
+        repeats: int,
+        games_no: int,
+        arena_names: tuple[str, ...],
+) -> None:
+    arena_names = list(arena_names) if arena_names else bundled_arenas() + [prepare_generated_arena()]
+    results = run_benchmarks(arena_names, repeats, games_no)
+    for result in results:
+        print(f"{result.name}: {result.median:.2f} {result.unit} (mean {result.mean:.2f}, n={result.samples}).")
+    if output:
+        with open(output, 'w') as file:
+            json.dump({'metadata': metadata(repeats, games_no), 'results': [asdict(r) for r in results]}, file, indent=2)
+    if baseline:
+        comparisons = compare(results, load_baseline(baseline), threshold)
+        regressions = [(result, change) for result, change, regressed in comparisons if regressed]
+        for result, change, regressed in comparisons:
+            print(f"{'REGRESSION ' if regressed else ''}{result.name}: {change:+.1%} against baseline.")
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed by more than {threshold:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(prog_name='python -m gupb.scripts.benchmark')
@@ -0,0 +1,148 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+import glob
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Optional
+
+import click
+from tqdm import tqdm
+
+from gupb import captures
+from gupb import controller
+from gupb.controller import registry
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class LatencyReport:
+    controller_name: str
+    calls: int
+    reset_ms: float
+    decide_mean_ms: float
+    decide_percentiles_ms: dict[int, float]
+    decide_max_ms: float
+    peak_kib_mean: Optional[float] = None
+    peak_kib_max: Optional[float] = None
+    retained_kib: Optional[float] = None
+
+
+def find_controller(controller_name: str) -> controller.Controller:
+    for possible_controller in registry.CONTROLLERS:
+        if possible_controller.name == controller_name:
+            return possible_controller.load()
+    raise click.BadParameter(f"There is no potential controller named {controller_name}!")
+
+
+def load_corpus(corpus_paths: tuple[str, ...]) -> list[captures.Capture]:
+    paths = []
+    for corpus_path in corpus_paths:
+        if os.path.isdir(corpus_path):
+            paths.extend(sorted(glob.glob(os.path.join(corpus_path, '*.pkl.gz'))))
+        else:
+            paths.append(corpus_path)
+    return [captures.Capture.load(path) for path in tqdm(paths, desc="Loading captures")]
+
+
+def feed(tested_controller: controller.Controller, capture: captures.Capture) -> tuple[float, list[float]]:
+    observation_planes = getattr(tested_controller, "observation_planes", False)
+    reset_start = time.perf_counter()
+    tested_controller.reset(capture.game_no, capture.arena_description)
+    reset_time = time.perf_counter() - reset_start
+    decide_times = []
+    for knowledge in capture.knowledge:
+        knowledge = knowledge if observation_planes else knowledge._replace(observation=None)
+        decide_start = time.perf_counter()
+        tested_controller.decide(knowledge)
+        decide_times.append(time.perf_counter() - decide_start)
+    return reset_time, decide_times
+
+
+def feed_tracing_allocations(tested_controller: controller.Controller, capture: captures.Capture) -> list[int]:
+    observation_planes = getattr(tested_controller, "observation_planes", False)
+    tested_controller.reset(capture.game_no, capture.arena_description)
+    peaks = []
+    for knowledge in capture.knowledge:
+        knowledge = knowledge if observation_planes else knowledge._replace(observation=None)
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tested_controller.decide(knowledge)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - baseline)
+    return peaks
+
+
+def percentile(sorted_samples: list[float], p: int) -> float:
+    index = min(len(sorted_samples) - 1, int(round(p / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def benchmark(
+        tested_controller: controller.Controller,
+        corpus: list[captures.Capture],
+        allocations: bool,
+) -> LatencyReport:
+    reset_times, decide_times = [], []
+    for capture in tqdm(corpus, desc=f"Feeding {tested_controller.name}"):
+        reset_time, capture_decide_times = feed(tested_controller, capture)
+        reset_times.append(reset_time)
+        decide_times.extend(capture_decide_times)
+    decide_times_ms = sorted(t * 1000 for t in decide_times)
+    report = LatencyReport(
+        controller_name=tested_controller.name,
+        calls=len(decide_times_ms),
+        reset_ms=statistics.mean(reset_times) * 1000,
+        decide_mean_ms=statistics.mean(decide_times_ms),
+        decide_percentiles_ms={p: percentile(decide_times_ms, p) for p in PERCENTILES},
+        decide_max_ms=decide_times_ms[-1],
+    )
+    if allocations:
+        tracemalloc.start()
+        retained_start, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for capture in tqdm(corpus, desc=f"Tracing allocations of {tested_controller.name}"):
+            peaks.extend(feed_tracing_allocations(tested_controller, capture))
+        retained_end, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report.peak_kib_mean = statistics.mean(peaks) / 1024
+        report.peak_kib_max = max(peaks) / 1024
+        report.retained_kib = (retained_end - retained_start) / 1024
+    return report
+
+
+def print_report(report: LatencyReport) -> None:
+    percentiles = ', '.join(f"p{p} {ms:.3f}" for p, ms in report.decide_percentiles_ms.items())
+    print(f"{report.controller_name}: {report.calls} decisions, mean {report.decide_mean_ms:.3f} ms, "
+          f"{percentiles}, max {report.decide_max_ms:.3f} ms; reset {report.reset_ms:.3f} ms.")
+    if report.peak_kib_mean is not None:
+        print(f"{report.controller_name}: peak allocations per decision mean {report.peak_kib_mean:.1f} KiB, "
+              f"max {report.peak_kib_max:.1f} KiB; retained after corpus {report.retained_kib:.1f} KiB.")
+
+
+@click.command()
+@click.argument('corpus_paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('-c', '--controller', 'controller_names', multiple=True, required=True,
+              help="The name of a potential controller to benchmark.")
+@click.option('-a', '--allocations', is_flag=True,
+              help="Whether to additionally trace allocations made during decisions.")
+@click.option('-o', '--output', type=click.Path(), default=None,
+              help="The path to store benchmark results in JSON.")
+def main(corpus_paths: tuple[str, ...], controller_names: tuple[str, ...], allocations: bool,
+         output: Optional[str]) -> None:
+    corpus = load_corpus(corpus_paths)
+    reports = []
+    for controller_name in controller_names:
+        report = benchmark(find_controller(controller_name), corpus, allocations)
+        print_report(report)
+        reports.append(report)
+    if output:
+        with open(output, 'w') as file:
+            json.dump([asdict(report) for report in reports], file, indent=2)
+
+
+if __name__ == '__main__':
+    main(prog_name='python -m gupb.scripts.controller_benchmark')
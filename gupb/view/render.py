@@ -1,6 +1,5 @@
 from __future__ import annotations
 import os
-import itertools
 from typing import Any, Optional, TypeVar, Tuple
 
 import pygame
@@ -14,8 +13,6 @@ from gupb.model import games
 from gupb.model import tiles
 from gupb.model import weapons
 
-pygame.init()
-
 Sprite = TypeVar('Sprite')
 
 INIT_TILE_SIZE = 32
@@ -29,7 +26,8 @@ HEALTH_BAR_EMPTY_COLOR = (0, 0, 0)
 
 BLACK = pygame.Color('black')
 WHITE = pygame.Color('white')
-GAME_FONT = pygame.freetype.Font("resources/fonts/whitrabt.ttf", 24)
+GAME_FONT_PATH = os.path.join('resources', 'fonts', 'whitrabt.ttf')
+GAME_FONT_SIZE = 24
 
 
 def load_sprite(group: str, name: str, transparent: pygame.Color = None) -> Sprite:
@@ -42,106 +40,93 @@ def load_sprite(group: str, name: str, transparent: pygame.Color = None) -> Spri
     return sprite
 
 
+SPRITE_FILES: dict[Any, tuple[str, str, Optional[pygame.Color]]] = {
+    tiles.Sea: ('tiles', 'sea', None),
+    tiles.Land: ('tiles', 'land', None),
+    tiles.Forest: ('tiles', 'forest', None),
+    tiles.Wall: ('tiles', 'wall', None),
+    tiles.Menhir: ('tiles', 'menhir', None),
+
+    weapons.Knife: ('weapons', 'knife', BLACK),
+    weapons.Sword: ('weapons', 'sword', BLACK),
+    weapons.Axe: ('weapons', 'axe', BLACK),
+    weapons.Bow: ('weapons', 'bow', BLACK),
+    weapons.Amulet: ('weapons', 'amulet', BLACK),
+    weapons.Scroll: ('weapons', 'scroll', BLACK),
+
+    consumables.Potion: ('consumables', 'potion', BLACK),
+
+    characters.Tabard.BLUE: ('characters', 'champion_blue', BLACK),
+    characters.Tabard.BROWN: ('characters', 'champion_brown', BLACK),
+    characters.Tabard.GREY: ('characters', 'champion_grey', BLACK),
+    characters.Tabard.GREEN: ('characters', 'champion_green', BLACK),
+    characters.Tabard.LIME: ('characters', 'champion_lime', BLACK),
+    characters.Tabard.ORANGE: ('characters', 'champion_orange', BLACK),
+    characters.Tabard.PINK: ('characters', 'champion_pink', BLACK),
+    characters.Tabard.RED: ('characters', 'champion_red', BLACK),
+    characters.Tabard.STRIPPED: ('characters', 'champion_stripped', BLACK),
+    characters.Tabard.TURQUOISE: ('characters', 'champion_turquoise', BLACK),
+    characters.Tabard.VIOLET: ('characters', 'champion_violet', BLACK),
+    characters.Tabard.WHITE: ('characters', 'champion_white', BLACK),
+    characters.Tabard.YELLOW: ('characters', 'champion_yellow', BLACK),
+    characters.Tabard.KERAMZYTOWY_MOCARZ: ('characters', 'keramzytowy_mocarz', BLACK),
+    characters.Tabard.ROOMBA: ('characters', 'roomba', WHITE),
+    characters.Tabard.PIRAT: ('characters', 'pirat', BLACK),
+    characters.Tabard.MINION: ('characters', 'minion', None),
+    characters.Tabard.RUSTLER: ('characters', 'champion_rustler', BLACK),
+    characters.Tabard.GAREK: ('characters', 'garek', BLACK),
+    characters.Tabard.REINFORCEDROGUE: ('characters', 'reinforced_rogue', BLACK),
+    characters.Tabard.NORGUL: ('characters', 'norgul', BLACK),
+    characters.Tabard.KIRBY: ('characters', 'kirby', BLACK),
+    characters.Tabard.KIMDZONGNEAT: ('characters', 'kim_dzong', BLACK),
+    characters.Tabard.CAMPER: ('characters', 'champion_camper', BLACK),
+
+    effects.Mist: ('effects', 'mist', BLACK),
+    effects.WeaponCut: ('effects', 'blood', BLACK),
+    effects.Fire: ('effects', 'fire', WHITE),
+}
+
+
 class SpriteRepository:
+    """Loads every sprite on its first use and keeps it scaled to the current tile size."""
+
     def __init__(self) -> None:
         self.size = (INIT_TILE_SIZE, INIT_TILE_SIZE)
-        self.sprites: dict[Any, Sprite] = {
-            tiles.Sea: load_sprite('tiles', 'sea'),
-            tiles.Land: load_sprite('tiles', 'land'),
-            tiles.Forest: load_sprite('tiles', 'forest'),
-            tiles.Wall: load_sprite('tiles', 'wall'),
-            tiles.Menhir: load_sprite('tiles', 'menhir'),
-
-            weapons.Knife: load_sprite('weapons', 'knife', BLACK),
-            weapons.Sword: load_sprite('weapons', 'sword', BLACK),
-            weapons.Axe: load_sprite('weapons', 'axe', BLACK),
-            weapons.Bow: load_sprite('weapons', 'bow', BLACK),
-            weapons.Amulet: load_sprite('weapons', 'amulet', BLACK),
-            weapons.Scroll: load_sprite('weapons', 'scroll', BLACK),
-
-            consumables.Potion: load_sprite('consumables', 'potion', BLACK),
-
-            characters.Tabard.BLUE: load_sprite('characters', 'champion_blue', BLACK),
-            characters.Tabard.BROWN: load_sprite('characters', 'champion_brown', BLACK),
-            characters.Tabard.GREY: load_sprite('characters', 'champion_grey', BLACK),
-            characters.Tabard.GREEN: load_sprite('characters', 'champion_green', BLACK),
-            characters.Tabard.LIME: load_sprite('characters', 'champion_lime', BLACK),
-            characters.Tabard.ORANGE: load_sprite('characters', 'champion_orange', BLACK),
-            characters.Tabard.PINK: load_sprite('characters', 'champion_pink', BLACK),
-            characters.Tabard.RED: load_sprite('characters', 'champion_red', BLACK),
-            characters.Tabard.STRIPPED: load_sprite('characters', 'champion_stripped', BLACK),
-            characters.Tabard.TURQUOISE: load_sprite('characters', 'champion_turquoise', BLACK),
-            characters.Tabard.VIOLET: load_sprite('characters', 'champion_violet', BLACK),
-            characters.Tabard.WHITE: load_sprite('characters', 'champion_white', BLACK),
-            characters.Tabard.YELLOW: load_sprite('characters', 'champion_yellow', BLACK),
-            characters.Tabard.KERAMZYTOWY_MOCARZ: load_sprite('characters', 'keramzytowy_mocarz', BLACK),
-            characters.Tabard.ROOMBA: load_sprite('characters', 'roomba', WHITE),
-            characters.Tabard.PIRAT: load_sprite('characters', 'pirat', BLACK),
-            characters.Tabard.MINION: load_sprite('characters', 'minion', None),
-            characters.Tabard.RUSTLER: load_sprite('characters', 'champion_rustler', BLACK),
-            characters.Tabard.GAREK: load_sprite('characters', 'garek', BLACK),
-            characters.Tabard.REINFORCEDROGUE: load_sprite('characters', 'reinforced_rogue', BLACK),
-            characters.Tabard.NORGUL: load_sprite('characters', 'norgul', BLACK),
-            characters.Tabard.KIRBY: load_sprite('characters', 'kirby', BLACK),
-            characters.Tabard.KIMDZONGNEAT: load_sprite('characters', 'kim_dzong', BLACK),
-            characters.Tabard.CAMPER: load_sprite('characters', 'champion_camper', BLACK),
-
-            effects.Mist: load_sprite('effects', 'mist', BLACK),
-            effects.WeaponCut: load_sprite('effects', 'blood', BLACK),
-            effects.Fire: load_sprite('effects', 'fire', WHITE),
-        }
         self.rotation_values: dict[characters.Facing, int] = {
             characters.Facing.RIGHT: 0,
             characters.Facing.UP: 90,
             characters.Facing.LEFT: 180,
             characters.Facing.DOWN: 270,
         }
-        self.champion_sprites: dict[tuple[characters.Tabard, characters.Facing], Sprite] = {
-            (tabard, facing): pygame.transform.rotate(self.sprites[tabard], self.rotation_values[facing])
-            for tabard, facing in itertools.product(
-                [
-                    characters.Tabard.BLUE,
-                    characters.Tabard.BROWN,
-                    characters.Tabard.GREY,
-                    characters.Tabard.GREEN,
-                    characters.Tabard.LIME,
-                    characters.Tabard.ORANGE,
-                    characters.Tabard.PINK,
-                    characters.Tabard.RED,
-                    characters.Tabard.STRIPPED,
-                    characters.Tabard.TURQUOISE,
-                    characters.Tabard.VIOLET,
-                    characters.Tabard.WHITE,
-                    characters.Tabard.YELLOW,
-                    characters.Tabard.KERAMZYTOWY_MOCARZ,
-                    characters.Tabard.ROOMBA,
-                    characters.Tabard.PIRAT,
-                    characters.Tabard.MINION,
-                    characters.Tabard.RUSTLER,
-                    characters.Tabard.GAREK,
-                    characters.Tabard.REINFORCEDROGUE,
-                    characters.Tabard.NORGUL,
-                    characters.Tabard.KIRBY,
-                    characters.Tabard.KIMDZONGNEAT,
-                    characters.Tabard.CAMPER,
-                ],
-                [
-                    characters.Facing.RIGHT,
-                    characters.Facing.UP,
-                    characters.Facing.LEFT,
-                    characters.Facing.DOWN,
-                ]
-            )
-        }
+        self.sprites: dict[Any, Sprite] = {}
+        self.champion_sprites: dict[tuple[characters.Tabard, characters.Facing], Sprite] = {}
+
+        self._sprites: dict[Any, Sprite] = {}
+        self._champion_sprites: dict[tuple[characters.Tabard, characters.Facing], Sprite] = {}
 
-        self._sprites = self.sprites.copy()
-        self._champion_sprites = self.champion_sprites.copy()
+    def _original_sprite(self, key: Any) -> Sprite:
+        if key not in self._sprites:
+            self._sprites[key] = load_sprite(*SPRITE_FILES[key])
+        return self._sprites[key]
+
+    def _original_champion_sprite(self, tabard: characters.Tabard, facing: characters.Facing) -> Sprite:
+        if (tabard, facing) not in self._champion_sprites:
+            self._champion_sprites[(tabard, facing)] = pygame.transform.rotate(
+                self._original_sprite(tabard), self.rotation_values[facing]
+            )
+        return self._champion_sprites[(tabard, facing)]
 
     def match_sprite(self, element: Any) -> Sprite:
         if isinstance(element, characters.Champion):
-            return self.champion_sprites[(element.tabard, element.facing)]
+            key = (element.tabard, element.facing)
+            if key not in self.champion_sprites:
+                self.champion_sprites[key] = self.scale_sprite(self._original_champion_sprite(*key), self.size)
+            return self.champion_sprites[key]
         else:
-            return self.sprites[type(element)]
+            key = type(element)
+            if key not in self.sprites:
+                self.sprites[key] = self.scale_sprite(self._original_sprite(key), self.size)
+            return self.sprites[key]
 
     @staticmethod
     def scale_sprite(sprite: Sprite, size: Tuple[int, int]) -> Sprite:
@@ -153,17 +138,16 @@ class SpriteRepository:
         if KEEP_TILE_RATIO:
             self.size = (min(self.size), min(self.size))
 
-        for sprite in self.sprites:
-            self.sprites[sprite] = self.scale_sprite(self._sprites[sprite], self.size)
-
-        for sprite in self.champion_sprites:
-            self.champion_sprites[sprite] = self.scale_sprite(self._champion_sprites[sprite], self.size)
+        self.sprites.clear()
+        self.champion_sprites.clear()
 
         return self.size[0] * arena_size[0], self.size[1] * arena_size[1]
 
 
 class Renderer:
     def __init__(self, ms_per_time_unit: int = 5):
+        pygame.init()
+        self.game_font = pygame.freetype.Font(GAME_FONT_PATH, GAME_FONT_SIZE)
         pygame.display.set_caption('GUPB')
         self.screen = pygame.display.set_mode((500, 500), pygame.RESIZABLE)
         self.sprite_repository = SpriteRepository()
@@ -210,7 +194,7 @@ class Renderer:
     def _render_starting_screen(self):
         wait_for_start_key = True
         while wait_for_start_key:
-            GAME_FONT.render_to(self.screen, (70, 180), "Press X to start..!", (250, 250, 250))
+            self.game_font.render_to(self.screen, (70, 180), "Press X to start..!", (250, 250, 250))
             pygame.display.flip()
 
             for event in pygame.event.get():
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from gupb.controller.kirby import POLICIES_NUM, STATE_SIZE
+from gupb.controller.kirby_neural_networks import ActorNet
+from gupb.controller.kirby_numpy_networks import NumpyActorNet
+
+TOLERANCES = {
+    "float32": 1e-5,
+    "float16": 2e-3,
+    "int8": 5e-2,
+}
+
+
+@pytest.fixture(scope="module")
+def actor() -> ActorNet:
+    torch.manual_seed(0)
+    actor = ActorNet(action_size=POLICIES_NUM, input_size=STATE_SIZE)
+    # non-trivial LayerNorm parameters, so that folding them into the linear layers is exercised
+    with torch.no_grad():
+        for module in actor.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.weight.uniform_(0.5, 1.5)
+                module.bias.uniform_(-0.5, 0.5)
+    return actor.eval()
+
+
+@pytest.mark.parametrize("precision", TOLERANCES)
+def test_numpy_actor_matches_torch(actor: ActorNet, precision: str) -> None:
+    numpy_actor = NumpyActorNet.from_state_dict(actor.state_dict(), precision)
+    features = np.random.default_rng(0).standard_normal((64, STATE_SIZE)).astype(np.float32)
+
+    with torch.no_grad():
+        expected = actor(torch.from_numpy(features)).numpy()
+    actual = numpy_actor(features)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=TOLERANCES[precision], rtol=0)
+    np.testing.assert_allclose(actual.sum(axis=-1), 1, atol=1e-5)
@@ -0,0 +1,67 @@
+import heapq
+import random
+from math import inf
+
+import pytest
+
+from gupb.controller.norgul.navigation import POTION_COST
+from gupb.controller.norgul.planning import PathPlanner
+
+WIDTH, HEIGHT = 12, 9
+ROW = WIDTH + 2
+STEPS = (-ROW, 1, ROW, -1)
+# Cheap squares are frequent, so that they are often adjacent to each other
+COSTS = (POTION_COST, POTION_COST, 1.0, 1.0, 2.0, 11.0, inf)
+
+
+def padded_grid(rng: random.Random) -> tuple[list[float], list[bool]]:
+    costs, inside = [], []
+    for y in range(HEIGHT + 2):
+        for x in range(WIDTH + 2):
+            is_inside = 0 < x <= WIDTH and 0 < y <= HEIGHT
+            costs.append(rng.choice(COSTS) if is_inside else inf)
+            inside.append(is_inside)
+    return costs, inside
+
+
+def dijkstra_to(costs: list[float], inside: list[bool], target: int) -> list[float]:
+    # Distances from every square to the target, where costs[sq] is the cost of entering sq
+    distances = [inf] * len(costs)
+    distances[target] = 0.0
+    heap = [(0.0, target)]
+    while heap:
+        dist, sq = heapq.heappop(heap)
+        if dist > distances[sq]:
+            continue
+        for step in STEPS:
+            predecessor = sq + step
+            new_dist = dist + costs[sq]
+            if inside[predecessor] and new_dist < distances[predecessor]:
+                distances[predecessor] = new_dist
+                heapq.heappush(heap, (new_dist, predecessor))
+    return distances
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_planner_matches_dijkstra_under_cost_changes(seed: int) -> None:
+    rng = random.Random(seed)
+    costs, inside = padded_grid(rng)
+    squares = [sq for sq, is_inside in enumerate(inside) if is_inside]
+    target = rng.choice(squares)
+    planner = PathPlanner(costs, inside, STEPS, target)
+
+    for _ in range(60):
+        for sq in rng.sample(squares, 3):
+            old_cost, costs[sq] = costs[sq], rng.choice(COSTS)
+            planner.update_cost(sq, old_cost)
+
+        expected = dijkstra_to(costs, inside, target)
+        for start in rng.sample(squares, 8):
+            assert planner.distance(start) == pytest.approx(expected[start])
+
+            next_sq = planner.next_step(start)
+            if start == target or expected[start] == inf:
+                assert next_sq is None
+            else:
+                assert next_sq - start in STEPS
+                assert costs[next_sq] + expected[next_sq] == pytest.approx(expected[start])